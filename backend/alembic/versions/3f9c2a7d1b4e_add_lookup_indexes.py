@@ -0,0 +1,71 @@
+"""Add lookup indexes
+
+Revision ID: 3f9c2a7d1b4e
+Revises: 78337ecd6805
+Create Date: 2026-10-18 09:12:44.503118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a7d1b4e'
+down_revision = '78337ecd6805'
+branch_labels = None
+depends_on = None
+
+
+# (name, table, columns, options)
+INDEXES = [
+    ('ix_messages_ChatID_SentAt_MessageID', 'messages', ['ChatID', 'SentAt', 'MessageID'], {}),
+    ('ix_orders_SupplierID_OrderDate_OrderID', 'orders', ['SupplierID', 'OrderDate', 'OrderID'], {}),
+    ('ix_orders_ConsumerID_OrderDate_OrderID', 'orders', ['ConsumerID', 'OrderDate', 'OrderID'], {}),
+    ('ix_order_items_OrderID', 'order_items', ['OrderID'], {}),
+    ('ix_products_SupplierID_ProductID', 'products', ['SupplierID', 'ProductID'], {}),
+    ('ix_products_active_SupplierID_ProductID', 'products', ['SupplierID', 'ProductID'], {
+        'postgresql_where': sa.text('"IsActive"'),
+        'sqlite_where': sa.text('"IsActive"'),
+    }),
+    ('ix_complaints_OrderID', 'complaints', ['OrderID'], {}),
+    ('ix_complaint_logs_ComplaintID', 'complaint_logs', ['ComplaintID'], {}),
+    ('ix_links_SupplierID_ConsumerID', 'links', ['SupplierID', 'ConsumerID'], {'unique': True}),
+    ('ix_links_ConsumerID', 'links', ['ConsumerID'], {}),
+]
+
+
+def upgrade() -> None:
+    # A unique index over duplicates fails, and built concurrently it is
+    # left behind INVALID; refuse up front and say which rows to fix
+    duplicates = op.get_bind().execute(sa.text(
+        'SELECT "SupplierID", "ConsumerID", count(*) FROM links '
+        'GROUP BY "SupplierID", "ConsumerID" HAVING count(*) > 1 ORDER BY 1, 2 LIMIT 20'
+    )).all()
+    if duplicates:
+        pairs = ", ".join(f"supplier {supplier_id} / consumer {consumer_id} ({count} links)"
+                          for supplier_id, consumer_id, count in duplicates)
+        raise RuntimeError(
+            "Cannot create unique index ix_links_SupplierID_ConsumerID: links has duplicate pairs "
+            f"(first 20: {pairs}). Keep one link per pair, moving or deleting the others' chats, then rerun."
+        )
+
+    # Indexes left INVALID by an interrupted concurrent build are rebuilt
+    invalid = set()
+    if op.get_bind().dialect.name == 'postgresql':
+        invalid = set(op.get_bind().execute(sa.text(
+            'SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE NOT i.indisvalid'
+        )).scalars())
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block, so
+    # build each index in autocommit mode without blocking writes
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in INDEXES:
+            if name in invalid:
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
+            op.create_index(name, table, columns, postgresql_concurrently=True, **options)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,29 @@
+"""Add product SKU
+
+Revision ID: 5a2f0e9d6c13
+Revises: c7d4e8a1f305
+Create Date: 2026-10-18 15:21:53.604472
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a2f0e9d6c13'
+down_revision = 'c7d4e8a1f305'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('products', sa.Column('SKU', sa.String(length=100), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index('ix_products_SupplierID_SKU', 'products', ['SupplierID', 'SKU'], unique=True,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_products_SupplierID_SKU', table_name='products', postgresql_concurrently=True)
+    op.drop_column('products', 'SKU')
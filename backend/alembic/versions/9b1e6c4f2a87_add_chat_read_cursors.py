@@ -0,0 +1,61 @@
+"""Add chat read cursors
+
+Revision ID: 9b1e6c4f2a87
+Revises: 3f9c2a7d1b4e
+Create Date: 2026-10-18 11:02:31.227405
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b1e6c4f2a87'
+down_revision = '3f9c2a7d1b4e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('chat_read_cursors',
+    sa.Column('ChatID', sa.Integer(), nullable=False),
+    sa.Column('UserID', sa.Integer(), nullable=False),
+    sa.Column('LastReadMessageID', sa.Integer(), nullable=False),
+    sa.Column('UpdatedAt', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['ChatID'], ['chats.ChatID'], ),
+    sa.ForeignKeyConstraint(['UserID'], ['users.UserID'], ),
+    sa.PrimaryKeyConstraint('ChatID', 'UserID')
+    )
+
+    # Backfill from Message.IsRead: for every user who has posted in a chat,
+    # the watermark is the newest message from someone else marked read.
+    # IsRead is left in place (and still returned by the API) until clients
+    # have moved to the read cursor endpoints; it is no longer consulted.
+    op.execute('''
+        INSERT INTO chat_read_cursors ("ChatID", "UserID", "LastReadMessageID")
+        SELECT p."ChatID", p."UserID", COALESCE(MAX(m."MessageID"), 0)
+        FROM (SELECT DISTINCT "ChatID", "UserID" FROM messages) p
+        LEFT JOIN messages m
+            ON m."ChatID" = p."ChatID" AND m."UserID" <> p."UserID" AND m."IsRead"
+        GROUP BY p."ChatID", p."UserID"
+    ''')
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_messages_ChatID_MessageID', 'messages', ['ChatID', 'MessageID'], postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_messages_ChatID_MessageID', table_name='messages', postgresql_concurrently=True)
+
+    # Restore IsRead for messages at or below the recipient's watermark
+    op.execute('''
+        UPDATE messages SET "IsRead" = TRUE
+        WHERE EXISTS (
+            SELECT 1 FROM chat_read_cursors c
+            WHERE c."ChatID" = messages."ChatID"
+              AND c."UserID" <> messages."UserID"
+              AND c."LastReadMessageID" >= messages."MessageID"
+        )
+    ''')
+    op.drop_table('chat_read_cursors')
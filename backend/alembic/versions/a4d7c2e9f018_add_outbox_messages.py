@@ -0,0 +1,40 @@
+"""Add outbox messages
+
+Revision ID: a4d7c2e9f018
+Revises: e1b8f3c5a942
+Create Date: 2026-10-18 18:12:40.517203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d7c2e9f018'
+down_revision = 'e1b8f3c5a942'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('outbox_messages',
+    sa.Column('MessageID', sa.Integer(), nullable=False),
+    sa.Column('Topic', sa.String(length=100), nullable=False),
+    sa.Column('Payload', sa.JSON(), nullable=False),
+    sa.Column('Status', sa.Enum('PENDING', 'SENT', 'DEAD', name='outboxstatus'), nullable=False),
+    sa.Column('Attempts', sa.Integer(), nullable=False),
+    sa.Column('AvailableAt', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('LastError', sa.Text(), nullable=True),
+    sa.Column('CreatedAt', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('SentAt', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('MessageID')
+    )
+    op.create_index(op.f('ix_outbox_messages_MessageID'), 'outbox_messages', ['MessageID'], unique=False)
+    op.create_index('ix_outbox_messages_Status_AvailableAt', 'outbox_messages', ['Status', 'AvailableAt'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_messages_Status_AvailableAt', table_name='outbox_messages')
+    op.drop_index(op.f('ix_outbox_messages_MessageID'), table_name='outbox_messages')
+    op.drop_table('outbox_messages')
+    sa.Enum(name='outboxstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,33 @@
+"""Add order and complaint versions
+
+Revision ID: b5e9a1d7c326
+Revises: d2f6a8b3c417
+Create Date: 2026-10-18 21:14:52.318804
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e9a1d7c326'
+down_revision = 'd2f6a8b3c417'
+branch_labels = None
+depends_on = None
+
+order_status = postgresql.ENUM('PENDING', 'ACCEPTED', 'REJECTED', 'IN_PROGRESS', 'COMPLETED', 'CANCELLED',
+                               name='orderstatus', create_type=False)
+
+
+def upgrade() -> None:
+    # Constant defaults, so existing rows are filled without a table rewrite
+    op.add_column('orders', sa.Column('Version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('orders', sa.Column('PreviousStatus', order_status, nullable=True))
+    op.add_column('complaints', sa.Column('Version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('complaints', 'Version')
+    op.drop_column('orders', 'PreviousStatus')
+    op.drop_column('orders', 'Version')
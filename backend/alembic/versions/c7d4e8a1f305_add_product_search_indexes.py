@@ -0,0 +1,40 @@
+"""Add product search indexes
+
+Revision ID: c7d4e8a1f305
+Revises: 9b1e6c4f2a87
+Create Date: 2026-10-18 13:40:07.918264
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d4e8a1f305'
+down_revision = '9b1e6c4f2a87'
+branch_labels = None
+depends_on = None
+
+# Must match app.models.product.SEARCH_DOCUMENT_SQL
+SEARCH_DOCUMENT_SQL = """to_tsvector('english'::regconfig, coalesce("Name", '') || ' ' || coalesce("Description", ''))"""
+
+
+def upgrade() -> None:
+    # Full-text search is Postgres-only; other databases use the in-process index
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    with op.get_context().autocommit_block():
+        op.create_index('ix_products_search_document', 'products', [sa.text(SEARCH_DOCUMENT_SQL)],
+                        postgresql_using='gin', postgresql_concurrently=True)
+        op.create_index('ix_products_Name_trgm', 'products', ['Name'],
+                        postgresql_using='gin', postgresql_ops={'Name': 'gin_trgm_ops'},
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_products_Name_trgm', table_name='products', postgresql_concurrently=True)
+        op.drop_index('ix_products_search_document', table_name='products', postgresql_concurrently=True)
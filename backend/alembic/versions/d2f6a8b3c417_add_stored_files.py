@@ -0,0 +1,30 @@
+"""Add stored files
+
+Revision ID: d2f6a8b3c417
+Revises: a4d7c2e9f018
+Create Date: 2026-10-18 19:03:27.904116
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f6a8b3c417'
+down_revision = 'a4d7c2e9f018'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('stored_files',
+    sa.Column('Digest', sa.String(length=64), nullable=False),
+    sa.Column('Size', sa.BigInteger(), nullable=False),
+    sa.Column('ContentType', sa.String(length=255), nullable=False),
+    sa.Column('CreatedAt', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('Digest')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('stored_files')
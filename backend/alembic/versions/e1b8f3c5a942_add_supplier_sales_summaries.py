@@ -0,0 +1,67 @@
+"""Add supplier sales summaries
+
+Revision ID: e1b8f3c5a942
+Revises: 5a2f0e9d6c13
+Create Date: 2026-10-18 17:05:12.381950
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1b8f3c5a942'
+down_revision = '5a2f0e9d6c13'
+branch_labels = None
+depends_on = None
+
+order_status = postgresql.ENUM('PENDING', 'ACCEPTED', 'REJECTED', 'IN_PROGRESS', 'COMPLETED', 'CANCELLED',
+                               name='orderstatus', create_type=False)
+
+
+def upgrade() -> None:
+    op.create_table('supplier_sales_daily',
+    sa.Column('SupplierID', sa.Integer(), nullable=False),
+    sa.Column('Day', sa.Date(), nullable=False),
+    sa.Column('Status', order_status, nullable=False),
+    sa.Column('OrderCount', sa.Integer(), nullable=False),
+    sa.Column('Revenue', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['SupplierID'], ['suppliers.SupplierID'], ),
+    sa.PrimaryKeyConstraint('SupplierID', 'Day', 'Status')
+    )
+    op.create_table('supplier_product_sales_daily',
+    sa.Column('SupplierID', sa.Integer(), nullable=False),
+    sa.Column('Day', sa.Date(), nullable=False),
+    sa.Column('ProductID', sa.Integer(), nullable=False),
+    sa.Column('Status', order_status, nullable=False),
+    sa.Column('Quantity', sa.Integer(), nullable=False),
+    sa.Column('Revenue', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['ProductID'], ['products.ProductID'], ),
+    sa.ForeignKeyConstraint(['SupplierID'], ['suppliers.SupplierID'], ),
+    sa.PrimaryKeyConstraint('SupplierID', 'Day', 'ProductID', 'Status')
+    )
+    # Backfill from existing orders; afterwards the summaries are kept current by the app
+    day = ('("OrderDate" AT TIME ZONE \'UTC\')::date' if op.get_bind().dialect.name == 'postgresql'
+           else 'date("OrderDate")')
+    op.execute(f"""
+        INSERT INTO supplier_sales_daily ("SupplierID", "Day", "Status", "OrderCount", "Revenue")
+        SELECT "SupplierID", {day}, "Status", count(*), coalesce(sum("TotalAmount"), 0)
+        FROM orders
+        WHERE "Status" IS NOT NULL
+        GROUP BY "SupplierID", {day}, "Status"
+    """)
+    op.execute(f"""
+        INSERT INTO supplier_product_sales_daily ("SupplierID", "Day", "ProductID", "Status", "Quantity", "Revenue")
+        SELECT orders."SupplierID", {day}, order_items."ProductID", orders."Status",
+               sum(order_items."Quantity"), sum(order_items."Subtotal")
+        FROM orders
+        JOIN order_items ON order_items."OrderID" = orders."OrderID"
+        WHERE orders."Status" IS NOT NULL
+        GROUP BY orders."SupplierID", {day}, order_items."ProductID", orders."Status"
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('supplier_product_sales_daily')
+    op.drop_table('supplier_sales_daily')
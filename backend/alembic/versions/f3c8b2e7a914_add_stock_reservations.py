@@ -0,0 +1,85 @@
+"""Add stock reservations and stock shards
+
+Revision ID: f3c8b2e7a914
+Revises: b5e9a1d7c326
+Create Date: 2026-10-18 23:02:41.507116
+
+"""
+import logging
+from datetime import timezone
+from alembic import op
+import sqlalchemy as sa
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c8b2e7a914'
+down_revision = 'b5e9a1d7c326'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('products', sa.Column('StockShards', sa.Integer(), server_default='0', nullable=False))
+    op.create_table('product_stock_shards',
+    sa.Column('ProductID', sa.Integer(), nullable=False),
+    sa.Column('Shard', sa.Integer(), nullable=False),
+    sa.Column('Stock', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ProductID'], ['products.ProductID'], ),
+    sa.PrimaryKeyConstraint('ProductID', 'Shard')
+    )
+    op.create_table('stock_reservations',
+    sa.Column('ReservationID', sa.Integer(), nullable=False),
+    sa.Column('OrderID', sa.Integer(), nullable=False),
+    sa.Column('ProductID', sa.Integer(), nullable=False),
+    sa.Column('Shard', sa.Integer(), nullable=True),
+    sa.Column('Quantity', sa.Integer(), nullable=False),
+    sa.Column('Status', sa.Enum('HELD', 'COMMITTED', 'RELEASED', 'EXPIRED', name='reservationstatus'), nullable=False),
+    sa.Column('CreatedAt', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('ExpiresAt', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['OrderID'], ['orders.OrderID'], ),
+    sa.ForeignKeyConstraint(['ProductID'], ['products.ProductID'], ),
+    sa.PrimaryKeyConstraint('ReservationID')
+    )
+    op.create_index(op.f('ix_stock_reservations_OrderID'), 'stock_reservations', ['OrderID'], unique=False)
+    op.create_index(op.f('ix_stock_reservations_ReservationID'), 'stock_reservations', ['ReservationID'], unique=False)
+    op.create_index('ix_stock_reservations_Status_ExpiresAt', 'stock_reservations', ['Status', 'ExpiresAt'], unique=False)
+    # Open orders placed since orders began taking stock already took theirs;
+    # record it so rejecting or cancelling them gives it back. Older orders
+    # never took any and get no reservations, and without
+    # STOCK_DECREMENT_SINCE no order can be trusted to have. Pending holds get
+    # a full TTL from now rather than expiring on the first sweep.
+    since = settings.STOCK_DECREMENT_SINCE
+    if since is None:
+        logging.getLogger('alembic.runtime.migration').warning(
+            'STOCK_DECREMENT_SINCE is not set; open orders get no stock reservations'
+        )
+        return
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if op.get_bind().dialect.name == 'postgresql':
+        expires, status_type = "now() + :ttl * interval '1 second'", '::reservationstatus'
+    else:
+        # SQLite stores UTC without an offset
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        expires, status_type = "datetime('now', '+' || :ttl || ' seconds')", ''
+    op.execute(sa.text(f"""
+        INSERT INTO stock_reservations ("OrderID", "ProductID", "Quantity", "Status", "ExpiresAt")
+        SELECT orders."OrderID", order_items."ProductID", sum(order_items."Quantity"),
+               CASE WHEN orders."Status" = 'PENDING' THEN 'HELD'{status_type} ELSE 'COMMITTED'{status_type} END,
+               CASE WHEN orders."Status" = 'PENDING' THEN {expires} END
+        FROM orders
+        JOIN order_items ON order_items."OrderID" = orders."OrderID"
+        WHERE orders."Status" IN ('PENDING', 'ACCEPTED', 'IN_PROGRESS') AND orders."OrderDate" >= :since
+        GROUP BY orders."OrderID", order_items."ProductID", orders."Status"
+    """).bindparams(sa.bindparam("since", since, type_=sa.DateTime(timezone=True)), ttl=settings.RESERVATION_TTL_SECONDS))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stock_reservations_Status_ExpiresAt', table_name='stock_reservations')
+    op.drop_index(op.f('ix_stock_reservations_ReservationID'), table_name='stock_reservations')
+    op.drop_index(op.f('ix_stock_reservations_OrderID'), table_name='stock_reservations')
+    op.drop_table('stock_reservations')
+    op.drop_table('product_stock_shards')
+    op.drop_column('products', 'StockShards')
+    sa.Enum(name='reservationstatus').drop(op.get_bind(), checkfirst=True)
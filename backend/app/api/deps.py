@@ -0,0 +1,42 @@
+from typing import List, Optional
+from fastapi import Depends, Header, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordBearer
+from app.core.config import settings
+from app.core.token_cache import token_cache
+from app.schemas.user import CurrentUser
+from app.services.read_replicas import parse_last_write, replica_router
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> CurrentUser:
+    """Resolve the authenticated user from the bearer token's claims"""
+    claims = token_cache.verify(token)
+    if claims is None or "user_id" not in claims:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return CurrentUser(user_id=claims["user_id"], email=claims["sub"], role=claims.get("role"))
+
+async def get_read_db(request: Request):
+    """Dependency for a read-only async session, on a replica when one is fresh enough"""
+    sessionmaker = replica_router.sessionmaker_for(parse_last_write(request.headers, request.cookies))
+    async with sessionmaker() as db:
+        yield db
+
+def if_match_versions(if_match: Optional[str] = Header(None)) -> Optional[List[int]]:
+    """Dependency for the versions an update may apply to; None means any"""
+    if if_match is None:
+        if settings.REQUIRE_IF_MATCH:
+            raise HTTPException(status_code=status.HTTP_428_PRECONDITION_REQUIRED, detail="If-Match header required")
+        return None
+    if if_match.strip() == "*":
+        return None
+    # Our ETags are the quoted version; weak or foreign tags match nothing
+    tags = [tag.strip().strip('"') for tag in if_match.split(",")]
+    return [int(tag) for tag in tags if tag.isdigit()]
+
+def version_etag(version: int) -> str:
+    """ETag of a versioned resource, as accepted back by if_match_versions"""
+    return f'"{version}"'
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, users, suppliers, consumers, links, products, orders, chat, complaints
+from app.api.v1.endpoints import auth, users, suppliers, consumers, links, products, orders, chat, complaints, files
 
 api_router = APIRouter()
 
@@ -12,4 +12,5 @@ api_router.include_router(products.router, prefix="/products", tags=["Products"]
 api_router.include_router(orders.router, prefix="/orders", tags=["Orders"])
 api_router.include_router(chat.router, prefix="/chat", tags=["Chat"])
 api_router.include_router(complaints.router, prefix="/complaints", tags=["Complaints"])
+api_router.include_router(files.router, prefix="/files", tags=["Files"])
 
@@ -1,21 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from app.models.base import get_db
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.base import get_async_db
 from app.models.user import User
-from app.schemas.user import UserCreate, UserResponse, UserLogin
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.schemas.user import UserCreate, UserResponse, UserLogin, CurrentUser
+from app.core.security import create_access_token
+from app.core.token_cache import token_cache
+from app.api.deps import get_current_user, oauth2_scheme
+from app.services.password_hasher import password_hasher
 from datetime import timedelta
 from app.core.config import settings
 
 router = APIRouter()
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
     # Check if user already exists
-    existing_user = db.query(User).filter(User.Email == user_data.email).first()
+    result = await db.execute(select(User).where(User.Email == user_data.email))
+    existing_user = result.scalars().first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -23,7 +27,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await password_hasher.hash(user_data.password)
     db_user = User(
         Name=user_data.name,
         Email=user_data.email,
@@ -32,25 +36,45 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         Role=user_data.role
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 @router.post("/login")
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """Login and get access token"""
-    user = db.query(User).filter(User.Email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.Password):
+    result = await db.execute(select(User).where(User.Email == form_data.username))
+    user = result.scalars().first()
+    verified, new_hash = (
+        await password_hasher.verify_and_update(form_data.password, user.Password)
+        if user else (False, None)
+    )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Transparently upgrade hashes created with outdated cost parameters
+    if new_hash:
+        user.Password = new_hash
+        await db.commit()
+    
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.Email, "user_id": user.UserID},
+        data={"sub": user.Email, "user_id": user.UserID, "role": user.Role.value if user.Role else None},
         expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
+
+@router.get("/me", response_model=CurrentUser)
+async def read_current_user(current_user: CurrentUser = Depends(get_current_user)):
+    """Get the authenticated user's token claims"""
+    return current_user
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(token: str = Depends(oauth2_scheme), current_user: CurrentUser = Depends(get_current_user)):
+    """Revoke the current access token"""
+    await token_cache.revoke(token)
@@ -1,56 +1,226 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.models.base import get_db
-from app.models.chat import Chat, Message
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Response, WebSocket, WebSocketDisconnect, status
+from sqlalchemy import case, exists, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_current_user
+from app.core.token_cache import token_cache
+from app.models.base import AsyncSessionLocal, get_async_db
+from app.models.chat import Chat, ChatReadCursor, Message
+from app.models.consumer_staff import ConsumerStaff
 from app.models.link import Link, LinkStatus
-from app.schemas.chat import ChatResponse, MessageCreate, MessageResponse
-from typing import List
+from app.models.supplier_staff import SupplierStaff
+from app.schemas.chat import (
+    ChatResponse, MessageCreate, MessageResponse, ReadCursorUpdate, ReadCursorResponse, UnreadCountResponse
+)
+from app.schemas.user import CurrentUser
+from app.services.broker import broker
+from app.services.link_index import link_index
+from app.utils.loading import Projection
+from app.utils.pagination import paginate
+from app.utils.serialization import RowSerializer
+from app.utils.sql import dialect_insert
+from typing import List, Optional
 
 router = APIRouter()
 
+# List pages are serialized from selected columns
+message_rows = RowSerializer(MessageResponse, Message)
+
+def chat_channel(chat_id: int) -> str:
+    """Broker channel carrying new messages for a chat"""
+    return f"chat:{chat_id}"
+
+async def chat_member(db: AsyncSession, chat_id: int, user_id: int) -> bool:
+    """Whether the user is staff on either side of the chat's approved link"""
+    return bool(await db.scalar(
+        select(Chat.ChatID)
+        .join(Link, Link.LinkID == Chat.LinkID)
+        .where(
+            Chat.ChatID == chat_id,
+            Link.Status == LinkStatus.APPROVED,
+            or_(
+                exists().where(SupplierStaff.UserID == user_id, SupplierStaff.SupplierID == Link.SupplierID),
+                exists().where(ConsumerStaff.UserID == user_id, ConsumerStaff.ConsumerID == Link.ConsumerID)
+            )
+        )
+    ))
+
+# Relationships serialized by ChatResponse
+chat_projection = Projection(Chat, selectin=["messages"])
+
 @router.get("/link/{link_id}", response_model=ChatResponse)
-async def get_or_create_chat(link_id: int, db: Session = Depends(get_db)):
+async def get_or_create_chat(link_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get or create chat for a link"""
-    # Verify link exists and is approved
-    link = db.query(Link).filter(Link.LinkID == link_id).first()
-    if not link:
-        raise HTTPException(status_code=404, detail="Link not found")
-    
-    if link.Status != LinkStatus.APPROVED:
+    # Verify link exists and is approved; approved links are checked in memory
+    if not await link_index.approved_link(db, link_id):
+        if not await db.get(Link, link_id):
+            raise HTTPException(status_code=404, detail="Link not found")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Link must be approved to access chat"
         )
     
     # Get or create chat
-    chat = db.query(Chat).filter(Chat.LinkID == link_id).first()
+    result = await db.execute(chat_projection.select().where(Chat.LinkID == link_id))
+    chat = result.scalars().first()
     if not chat:
-        chat = Chat(LinkID=link_id)
+        chat = Chat(LinkID=link_id, messages=[])
         db.add(chat)
-        db.commit()
-        db.refresh(chat)
+        await db.commit()
+        await db.refresh(chat, attribute_names=["CreatedAt"])
     
     return chat
 
 @router.post("/messages", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
-async def create_message(message: MessageCreate, user_id: int, db: Session = Depends(get_db)):
+async def create_message(
+    message: MessageCreate,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Send a message in a chat"""
+    if not await chat_member(db, message.chat_id, current_user.user_id):
+        if await db.get(Chat, message.chat_id) is None:
+            raise HTTPException(status_code=404, detail="Chat not found")
+        raise HTTPException(status_code=403, detail="Not a member of this chat")
     db_message = Message(
         ChatID=message.chat_id,
-        UserID=user_id,
+        UserID=current_user.user_id,
         Content=message.content,
         MessageType=message.message_type,
         FileURL=message.file_url,
         ProductLinkID=message.product_link_id
     )
     db.add(db_message)
-    db.commit()
-    db.refresh(db_message)
+    await db.commit()
+    await db.refresh(db_message)
+    
+    # Push to everyone connected to the chat's WebSocket
+    payload = MessageResponse.model_validate(db_message).model_dump_json()
+    await broker.publish(chat_channel(db_message.ChatID), payload)
     return db_message
 
 @router.get("/{chat_id}/messages", response_model=List[MessageResponse])
-async def get_messages(chat_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_messages(
+    chat_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get messages for a chat"""
-    messages = db.query(Message).filter(Message.ChatID == chat_id).offset(skip).limit(limit).all()
-    return messages
+    query = message_rows.select().where(Message.ChatID == chat_id)
+    messages = await paginate(db, query, [Message.SentAt, Message.MessageID], response, cursor, skip, limit, rows=True)
+    return message_rows.response(messages, response)
+
+@router.post("/{chat_id}/read", response_model=ReadCursorResponse)
+async def mark_read(
+    chat_id: int,
+    read: ReadCursorUpdate = None,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Mark messages in a chat as read up to a message (default: the latest)"""
+    if read is not None and read.last_message_id is not None:
+        # Only a message of this chat can move the watermark, so clients
+        # cannot mark messages that don't exist yet as read
+        message_chat_id = await db.scalar(select(Message.ChatID).where(Message.MessageID == read.last_message_id))
+        if message_chat_id != chat_id:
+            raise HTTPException(status_code=404, detail="Message not found in this chat")
+        last_read = read.last_message_id
+    else:
+        last_read = (
+            select(func.coalesce(func.max(Message.MessageID), 0))
+            .where(Message.ChatID == chat_id)
+            .scalar_subquery()
+        )
+    
+    # One upsert; the watermark only ever moves forward
+    insert_stmt = dialect_insert(db, ChatReadCursor).values(
+        ChatID=chat_id,
+        UserID=current_user.user_id,
+        LastReadMessageID=last_read
+    )
+    excluded = insert_stmt.excluded.LastReadMessageID
+    result = await db.execute(
+        insert_stmt.on_conflict_do_update(
+            index_elements=[ChatReadCursor.ChatID, ChatReadCursor.UserID],
+            set_={
+                "LastReadMessageID": case(
+                    (excluded > ChatReadCursor.LastReadMessageID, excluded),
+                    else_=ChatReadCursor.LastReadMessageID
+                ),
+                "UpdatedAt": func.now()
+            }
+        ).returning(ChatReadCursor.ChatID, ChatReadCursor.UserID, ChatReadCursor.LastReadMessageID)
+    )
+    cursor = result.one()
+    await db.commit()
+    return cursor
+
+@router.get("/{chat_id}/unread", response_model=UnreadCountResponse)
+async def get_unread_count(
+    chat_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Count messages from other participants after the user's read watermark"""
+    last_read = (
+        select(ChatReadCursor.LastReadMessageID)
+        .where(ChatReadCursor.ChatID == chat_id, ChatReadCursor.UserID == current_user.user_id)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(func.count())
+        .select_from(Message)
+        .where(
+            Message.ChatID == chat_id,
+            Message.MessageID > func.coalesce(last_read, 0),
+            Message.UserID != current_user.user_id
+        )
+    )
+    return UnreadCountResponse(chat_id=chat_id, unread_count=result.scalar_one())
 
+@router.websocket("/{chat_id}/ws")
+async def chat_socket(websocket: WebSocket, chat_id: int, token: str):
+    """Stream new messages in a chat as they are created"""
+    # Browsers cannot set headers on WebSocket requests, so the access
+    # token is passed as a query parameter
+    claims = token_cache.verify(token)
+    if claims is None or claims.get("user_id") is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    async with AsyncSessionLocal() as db:
+        if not await chat_member(db, chat_id, claims["user_id"]):
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+    
+    await websocket.accept()
+    channel = chat_channel(chat_id)
+    subscription = broker.subscribe(channel)
+    
+    async def send():
+        while True:
+            payload = await subscription.queue.get()
+            if payload is None:
+                # Too far behind; the client reconnects and catches up via
+                # GET /{chat_id}/messages
+                await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+                return
+            await websocket.send_text(payload)
+    
+    async def receive():
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+    
+    tasks = [asyncio.create_task(send()), asyncio.create_task(receive())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        broker.unsubscribe(channel, subscription)
@@ -1,15 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.models.base import get_db
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_current_user, get_read_db, if_match_versions, version_etag
+from app.models.base import get_async_db
 from app.models.complaint import Complaint, ComplaintLog, ComplaintStatus
 from app.schemas.complaint import ComplaintCreate, ComplaintResponse, ComplaintUpdate, ComplaintLogResponse
-from typing import List
+from app.schemas.user import CurrentUser
+from app.services import notifications
+from app.utils.loading import Projection
+from app.utils.pagination import paginate
+from typing import List, Optional
 from datetime import datetime
 
 router = APIRouter()
 
+# Relationships serialized by ComplaintResponse
+complaint_projection = Projection(Complaint, selectin=["logs"])
+
 @router.post("/", response_model=ComplaintResponse, status_code=status.HTTP_201_CREATED)
-async def create_complaint(complaint: ComplaintCreate, consumer_staff_id: int, db: Session = Depends(get_db)):
+async def create_complaint(
+    complaint: ComplaintCreate,
+    consumer_staff_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Create a new complaint"""
     db_complaint = Complaint(
         OrderID=complaint.order_id,
@@ -20,82 +34,99 @@ async def create_complaint(complaint: ComplaintCreate, consumer_staff_id: int, d
         Status=ComplaintStatus.OPEN
     )
     db.add(db_complaint)
-    db.flush()
+    await db.flush()
     
     # Create initial log
     log = ComplaintLog(
         ComplaintID=db_complaint.ComplaintID,
-        UserID=consumer_staff_id,
+        UserID=current_user.user_id,
         Action="Created",
         Notes="Complaint created"
     )
     db.add(log)
-    db.commit()
-    db.refresh(db_complaint)
+    await db.commit()
+    await db.refresh(db_complaint)
+    await db.refresh(db_complaint, attribute_names=["logs"])
     return db_complaint
 
 @router.get("/", response_model=List[ComplaintResponse])
 async def get_complaints(
+    response: Response,
     order_id: int = None,
     supplier_id: int = None,
     consumer_id: int = None,
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get complaints with optional filters"""
-    query = db.query(Complaint)
+    query = complaint_projection.select()
     if order_id:
-        query = query.filter(Complaint.OrderID == order_id)
+        query = query.where(Complaint.OrderID == order_id)
     # Add more filters as needed
-    complaints = query.offset(skip).limit(limit).all()
-    return complaints
+    return await paginate(db, query, [Complaint.ComplaintID], response, cursor, skip, limit)
 
 @router.get("/{complaint_id}", response_model=ComplaintResponse)
-async def get_complaint(complaint_id: int, db: Session = Depends(get_db)):
+async def get_complaint(complaint_id: int, response: Response, db: AsyncSession = Depends(get_read_db)):
     """Get complaint by ID"""
-    complaint = db.query(Complaint).filter(Complaint.ComplaintID == complaint_id).first()
+    complaint = await db.get(Complaint, complaint_id, options=complaint_projection.options())
     if not complaint:
         raise HTTPException(status_code=404, detail="Complaint not found")
+    response.headers["ETag"] = version_etag(complaint.Version)
     return complaint
 
 @router.patch("/{complaint_id}", response_model=ComplaintResponse)
 async def update_complaint(
     complaint_id: int,
     complaint_update: ComplaintUpdate,
-    user_id: int,
-    db: Session = Depends(get_db)
+    response: Response,
+    versions: Optional[List[int]] = Depends(if_match_versions),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Update complaint (assign, escalate, resolve)"""
-    db_complaint = db.query(Complaint).filter(Complaint.ComplaintID == complaint_id).first()
-    if not db_complaint:
-        raise HTTPException(status_code=404, detail="Complaint not found")
-    
+    """Update complaint (assign, escalate, resolve); a stale If-Match fails with 412"""
+    values = {"Version": Complaint.Version + 1}
     action = "Updated"
     if complaint_update.status:
-        db_complaint.Status = complaint_update.status
+        values["Status"] = complaint_update.status
         if complaint_update.status == ComplaintStatus.RESOLVED:
-            db_complaint.ResolvedAt = datetime.utcnow()
+            values["ResolvedAt"] = datetime.utcnow()
             action = "Resolved"
         elif complaint_update.status == ComplaintStatus.ESCALATED:
             action = "Escalated"
     
     if complaint_update.priority:
-        db_complaint.Priority = complaint_update.priority
+        values["Priority"] = complaint_update.priority
     
     if complaint_update.supplier_staff_id:
-        db_complaint.SupplierStaffID = complaint_update.supplier_staff_id
+        values["SupplierStaffID"] = complaint_update.supplier_staff_id
         action = "Assigned"
     
+    query = update(Complaint).where(Complaint.ComplaintID == complaint_id)
+    if versions is not None:
+        query = query.where(Complaint.Version.in_(versions))
+    db_complaint = (await db.scalars(query.values(**values).returning(Complaint))).one_or_none()
+    if db_complaint is None:
+        current_version = await db.scalar(select(Complaint.Version).where(Complaint.ComplaintID == complaint_id))
+        if current_version is None:
+            raise HTTPException(status_code=404, detail="Complaint not found")
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Complaint was changed by someone else",
+            headers={"ETag": version_etag(current_version)}
+        )
+    
     # Create log entry
     log = ComplaintLog(
         ComplaintID=complaint_id,
-        UserID=user_id,
+        UserID=current_user.user_id,
         Action=action,
         Notes=f"Complaint {action.lower()}"
     )
     db.add(log)
-    db.commit()
-    db.refresh(db_complaint)
+    notifications.enqueue(db, "complaint.updated", complaint_id=complaint_id, action=action)
+    await db.commit()
+    await db.refresh(db_complaint, attribute_names=["logs"])
+    response.headers["ETag"] = version_etag(db_complaint.Version)
     return db_complaint
-
@@ -1,14 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.models.base import get_db
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_read_db
+from app.models.base import get_async_db
 from app.models.consumer import Consumer
 from app.schemas.consumer import ConsumerCreate, ConsumerResponse
-from typing import List
+from app.services.cache import cache, consumer_key
+from app.utils.pagination import paginate
+from app.utils.serialization import RowSerializer
+from typing import List, Optional
 
 router = APIRouter()
 
+# List pages are serialized from selected columns
+consumer_rows = RowSerializer(ConsumerResponse, Consumer)
+
 @router.post("/", response_model=ConsumerResponse, status_code=status.HTTP_201_CREATED)
-async def create_consumer(consumer: ConsumerCreate, db: Session = Depends(get_db)):
+async def create_consumer(consumer: ConsumerCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new consumer"""
     db_consumer = Consumer(
         CompanyName=consumer.company_name,
@@ -18,21 +25,31 @@ async def create_consumer(consumer: ConsumerCreate, db: Session = Depends(get_db
         Type=consumer.type
     )
     db.add(db_consumer)
-    db.commit()
-    db.refresh(db_consumer)
+    await db.commit()
+    await db.refresh(db_consumer)
+    await cache.invalidate(consumer_key(db_consumer.ConsumerID))
     return db_consumer
 
 @router.get("/", response_model=List[ConsumerResponse])
-async def get_consumers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_consumers(
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_read_db)
+):
     """Get all consumers"""
-    consumers = db.query(Consumer).offset(skip).limit(limit).all()
-    return consumers
+    consumers = await paginate(db, consumer_rows.select(), [Consumer.ConsumerID], response, cursor, skip, limit, rows=True)
+    return consumer_rows.response(consumers, response)
 
 @router.get("/{consumer_id}", response_model=ConsumerResponse)
-async def get_consumer(consumer_id: int, db: Session = Depends(get_db)):
+async def get_consumer(consumer_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get consumer by ID"""
-    consumer = db.query(Consumer).filter(Consumer.ConsumerID == consumer_id).first()
+    async def load_consumer():
+        consumer = await db.get(Consumer, consumer_id)
+        return ConsumerResponse.model_validate(consumer).model_dump(mode="json") if consumer else None
+    
+    consumer = await cache.get_or_load(consumer_key(consumer_id), load_consumer)
     if not consumer:
         raise HTTPException(status_code=404, detail="Consumer not found")
     return consumer
-
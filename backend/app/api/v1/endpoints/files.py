@@ -0,0 +1,119 @@
+import asyncio
+import os
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_current_user
+from app.core.config import settings
+from app.models.base import get_async_db
+from app.models.file import StoredFile
+from app.schemas.file import StoredFileResponse
+from app.schemas.user import CurrentUser
+from app.services import file_storage, image_variants
+from app.services.cache import cache, file_key
+from app.utils.responses import FileRangeResponse
+from typing import Optional
+
+router = APIRouter()
+
+def file_url(digest: str) -> str:
+    return f"/api/v1/files/{digest}"
+
+@router.post("/", response_model=StoredFileResponse, status_code=status.HTTP_201_CREATED)
+async def upload_file(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    content_type: str = Header("application/octet-stream"),
+    content_length: Optional[int] = Header(None),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Upload a file as the raw request body (not multipart)"""
+    # Refuse oversized bodies before reading any of them
+    if content_length is not None and content_length > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="File too large")
+    try:
+        stored = await file_storage.store_stream(db, request.stream(), content_type, settings.MAX_UPLOAD_SIZE)
+    except file_storage.FileTooLarge:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="File too large")
+    await db.commit()
+    if file_storage.is_inline(stored.content_type):
+        background_tasks.add_task(image_variants.variant_store.pregenerate, stored.digest)
+    return StoredFileResponse(
+        digest=stored.digest,
+        size=stored.size,
+        content_type=stored.content_type,
+        url=file_url(stored.digest)
+    )
+
+@router.api_route("/{digest}", methods=["GET", "HEAD"])
+async def download_file(
+    digest: str,
+    size: Optional[str] = Query(None, pattern=f"^({'|'.join(image_variants.VARIANT_SIZES)})$"),
+    range_header: Optional[str] = Header(None, alias="range"),
+    if_range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Serve a file, or a downscaled WebP variant of an image, with ETag and single byte-range support"""
+    if not file_storage.DIGEST_PATTERN.match(digest):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    async def load():
+        stored = await db.get(StoredFile, digest)
+        return stored and {"size": stored.Size, "content_type": stored.ContentType}
+
+    # Content never changes for a digest, so the entry never goes stale
+    meta = await cache.get_or_load(file_key(digest), load)
+    if meta is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    etag = f'"{digest}-{size}"' if size else f'"{digest}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "X-Content-Type-Options": "nosniff"
+    }
+    if if_none_match and (if_none_match.strip() == "*" or etag in if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    path = file_storage.file_path(digest)
+    length = meta["size"]
+    media_type = meta["content_type"]
+    if size is not None:
+        if not file_storage.is_inline(media_type):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Variants are only available for images")
+        try:
+            path = await image_variants.variant_store.get(digest, size)
+        except image_variants.ImageProcessingError:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Image could not be processed")
+        length = (await asyncio.to_thread(os.stat, path)).st_size
+        media_type = image_variants.VARIANT_MEDIA_TYPE
+    elif not file_storage.is_inline(media_type):
+        media_type = "application/octet-stream"
+        headers["Content-Disposition"] = "attachment"
+
+    if settings.FILES_ACCEL_REDIRECT_PREFIX:
+        # The front proxy sends the file itself, including ranges
+        headers["X-Accel-Redirect"] = f"{settings.FILES_ACCEL_REDIRECT_PREFIX}{path.relative_to(file_storage.root()).as_posix()}"
+        return Response(headers=headers, media_type=media_type)
+
+    byte_range = None
+    if if_range is None or if_range.strip() == etag:
+        try:
+            byte_range = file_storage.parse_range(range_header, length)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{length}"
+            raise HTTPException(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, headers=headers)
+
+    if byte_range is None:
+        return FileRangeResponse(str(path), 0, length, headers=headers, media_type=media_type)
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{length}"
+    return FileRangeResponse(
+        str(path),
+        start,
+        end - start + 1,
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        headers=headers,
+        media_type=media_type
+    )
@@ -1,20 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.models.base import get_db
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_read_db
+from app.models.base import get_async_db
 from app.models.link import Link, LinkStatus
 from app.schemas.link import LinkCreate, LinkResponse, LinkUpdate
-from typing import List
+from app.services import notifications
+from app.services.link_index import link_index
+from app.utils.pagination import paginate
+from app.utils.serialization import RowSerializer
+from typing import List, Optional
 
 router = APIRouter()
 
+# List pages are serialized from selected columns
+link_rows = RowSerializer(LinkResponse, Link)
+
 @router.post("/", response_model=LinkResponse, status_code=status.HTTP_201_CREATED)
-async def create_link(link: LinkCreate, db: Session = Depends(get_db)):
+async def create_link(link: LinkCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a link request"""
     # Check if link already exists
-    existing_link = db.query(Link).filter(
+    result = await db.execute(select(Link).where(
         Link.SupplierID == link.supplier_id,
         Link.ConsumerID == link.consumer_id
-    ).first()
+    ))
+    existing_link = result.scalars().first()
     
     if existing_link:
         raise HTTPException(
@@ -28,20 +39,32 @@ async def create_link(link: LinkCreate, db: Session = Depends(get_db)):
         Status=LinkStatus.PENDING
     )
     db.add(db_link)
-    db.commit()
-    db.refresh(db_link)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent request created the pair between the check and the insert
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Link already exists")
+    await db.refresh(db_link)
+    await link_index.publish(db_link)
     return db_link
 
 @router.get("/", response_model=List[LinkResponse])
-async def get_links(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_links(
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_read_db)
+):
     """Get all links"""
-    links = db.query(Link).offset(skip).limit(limit).all()
-    return links
+    links = await paginate(db, link_rows.select(), [Link.LinkID], response, cursor, skip, limit, rows=True)
+    return link_rows.response(links, response)
 
 @router.patch("/{link_id}", response_model=LinkResponse)
-async def update_link(link_id: int, link_update: LinkUpdate, db: Session = Depends(get_db)):
+async def update_link(link_id: int, link_update: LinkUpdate, db: AsyncSession = Depends(get_async_db)):
     """Update link status (approve/reject/remove/block)"""
-    db_link = db.query(Link).filter(Link.LinkID == link_id).first()
+    db_link = await db.get(Link, link_id)
     if not db_link:
         raise HTTPException(status_code=404, detail="Link not found")
     
@@ -49,8 +72,9 @@ async def update_link(link_id: int, link_update: LinkUpdate, db: Session = Depen
     if link_update.status == LinkStatus.APPROVED:
         from datetime import datetime
         db_link.ApprovedAt = datetime.utcnow()
+    notifications.enqueue(db, "link.status_changed", link_id=link_id, status=link_update.status.value)
     
-    db.commit()
-    db.refresh(db_link)
+    await db.commit()
+    await db.refresh(db_link)
+    await link_index.publish(db_link)
     return db_link
-
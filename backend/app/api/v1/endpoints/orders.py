@@ -1,103 +1,179 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.models.base import get_db
-from app.models.order import Order, OrderItem, OrderStatus
-from app.models.product import Product
-from app.schemas.order import OrderCreate, OrderResponse, OrderUpdate
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_read_db, if_match_versions, version_etag
+from app.models.base import get_async_db
+from app.models.order import Order, OrderStatus, statuses_leading_to
+from app.schemas.order import OrderBatchCreate, OrderBatchResponse, OrderCreate, OrderResponse, OrderUpdate
+from app.services import inventory, notifications, order_export, order_intake, sales_stats
+from app.services.read_replicas import parse_last_write, replica_router
+from app.utils.loading import Projection
+from app.utils.pagination import paginate
+from typing import List, Optional
 from datetime import datetime
 
 router = APIRouter()
 
+# Relationships serialized by OrderResponse
+order_projection = Projection(Order, selectin=["order_items"])
+
 @router.post("/", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
-async def create_order(order: OrderCreate, consumer_staff_id: int, db: Session = Depends(get_db)):
+async def create_order(order: OrderCreate, consumer_staff_id: int, db: AsyncSession = Depends(get_async_db)):
     """Create a new order"""
-    # Calculate total and create order items
-    total_amount = 0
-    order_items = []
-    
-    for item in order.items:
-        product = db.query(Product).filter(Product.ProductID == item.product_id).first()
-        if not product:
-            raise HTTPException(status_code=404, detail=f"Product {item.product_id} not found")
-        
-        if product.Stock < item.quantity:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Insufficient stock for product {product.Name}"
-            )
-        
-        subtotal = product.Price * item.quantity
-        total_amount += subtotal
-        
-        order_items.append(OrderItem(
-            ProductID=item.product_id,
-            Quantity=item.quantity,
-            UnitPrice=product.Price,
-            Subtotal=subtotal
-        ))
-    
-    # Create order
-    db_order = Order(
-        SupplierID=order.supplier_id,
-        ConsumerID=order.consumer_id,
-        ConsumerStaffID=consumer_staff_id,
-        TotalAmount=total_amount,
-        DeliveryDate=order.delivery_date,
-        Status=OrderStatus.PENDING
-    )
-    db.add(db_order)
-    db.flush()  # Get OrderID
-    
-    # Add order items
-    for item in order_items:
-        item.OrderID = db_order.OrderID
-        db.add(item)
-    
-    db.commit()
-    db.refresh(db_order)
-    return db_order
+    placement = await order_intake.place_orders(db, [order], consumer_staff_id)
+    if placement.failures:
+        failure = placement.failures[0]
+        raise HTTPException(status_code=failure.status_code, detail=failure.detail)
+    await db.commit()
+    await order_intake.invalidate_stock(placement)
+    return placement.orders[0]
+
+@router.post("/batch", response_model=OrderBatchResponse, status_code=status.HTTP_201_CREATED)
+async def create_orders(
+    batch: OrderBatchCreate,
+    consumer_staff_id: int,
+    partial: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Place several orders, e.g. one per supplier, in one transaction.
+
+    By default the batch is all-or-nothing: if any order fails, none are
+    placed and the first failure is returned as the error. With
+    partial=true the orders that can be placed are, and the rest are
+    listed in `failures`.
+    """
+    placement = await order_intake.place_orders(db, batch.orders, consumer_staff_id, partial=partial)
+    if placement.failures and not partial:
+        failure = placement.failures[0]
+        raise HTTPException(status_code=failure.status_code, detail=f"Order {failure.index}: {failure.detail}")
+    await db.commit()
+    await order_intake.invalidate_stock(placement)
+    return OrderBatchResponse(orders=placement.orders, failures=[vars(failure) for failure in placement.failures])
 
 @router.get("/", response_model=List[OrderResponse])
 async def get_orders(
+    response: Response,
     supplier_id: int = None,
     consumer_id: int = None,
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get orders, optionally filtered by supplier or consumer"""
-    query = db.query(Order)
+    query = order_projection.select()
     if supplier_id:
-        query = query.filter(Order.SupplierID == supplier_id)
+        query = query.where(Order.SupplierID == supplier_id)
     if consumer_id:
-        query = query.filter(Order.ConsumerID == consumer_id)
-    orders = query.offset(skip).limit(limit).all()
-    return orders
+        query = query.where(Order.ConsumerID == consumer_id)
+    return await paginate(db, query, [Order.OrderDate, Order.OrderID], response, cursor, skip, limit)
+
+@router.get("/export")
+async def export_orders(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    supplier_id: int = None,
+    consumer_id: int = None,
+    order_status: Optional[OrderStatus] = Query(None, alias="status"),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
+):
+    """Stream the full order history with items as NDJSON or CSV"""
+    sessionmaker = replica_router.sessionmaker_for(parse_last_write(request.headers, request.cookies))
+    rows = order_export.stream_order_rows(supplier_id, consumer_id, order_status, date_from, date_to, sessionmaker)
+    if format == "csv":
+        return StreamingResponse(
+            order_export.export_csv(rows),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="orders.csv"'}
+        )
+    return StreamingResponse(order_export.export_ndjson(rows), media_type="application/x-ndjson")
 
 @router.get("/{order_id}", response_model=OrderResponse)
-async def get_order(order_id: int, db: Session = Depends(get_db)):
+async def get_order(order_id: int, response: Response, db: AsyncSession = Depends(get_read_db)):
     """Get order by ID"""
-    order = db.query(Order).filter(Order.OrderID == order_id).first()
+    order = await db.get(Order, order_id, options=order_projection.options())
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
+    response.headers["ETag"] = version_etag(order.Version)
     return order
 
+async def update_order_row(db: AsyncSession, order_id: int, versions: Optional[List[int]], values: dict, *conditions) -> Optional[Order]:
+    """UPDATE an order if it still has one of `versions` and meets `conditions`, bumping its version"""
+    query = update(Order).where(Order.OrderID == order_id, *conditions)
+    if versions is not None:
+        query = query.where(Order.Version.in_(versions))
+    return (await db.scalars(query.values(Version=Order.Version + 1, **values).returning(Order))).one_or_none()
+
 @router.patch("/{order_id}", response_model=OrderResponse)
-async def update_order(order_id: int, order_update: OrderUpdate, db: Session = Depends(get_db)):
-    """Update order status"""
-    db_order = db.query(Order).filter(Order.OrderID == order_id).first()
-    if not db_order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    
-    if order_update.status:
-        db_order.Status = order_update.status
+async def update_order(
+    order_id: int,
+    order_update: OrderUpdate,
+    response: Response,
+    versions: Optional[List[int]] = Depends(if_match_versions),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Update order status.
+
+    The If-Match version and the status transition are checked by the
+    UPDATE itself, so concurrent changes fail with 412 instead of being
+    overwritten, and illegal transitions fail with 409. Repeating the
+    current status changes nothing. Accepting commits the order's stock
+    reservations; rejecting or cancelling releases them.
+    """
+    fields = {}
     if order_update.rejection_reason:
-        db_order.RejectionReason = order_update.rejection_reason
+        fields["RejectionReason"] = order_update.rejection_reason
     if order_update.delivery_date:
-        db_order.DeliveryDate = order_update.delivery_date
+        fields["DeliveryDate"] = order_update.delivery_date
+
+    db_order = None
+    if order_update.status:
+        # SET expressions see the row as it was, so this keeps the old status
+        db_order = await update_order_row(
+            db, order_id, versions,
+            {**fields, "PreviousStatus": Order.Status, "Status": order_update.status},
+            Order.Status.in_(statuses_leading_to(order_update.status))
+        )
+    elif fields:
+        db_order = await update_order_row(db, order_id, versions, fields)
+    status_changed = db_order is not None and order_update.status is not None
+
+    if db_order is None:
+        # Nothing matched, or nothing was asked; find out which
+        current = (await db.execute(select(Order.Version, Order.Status).where(Order.OrderID == order_id))).first()
+        if current is None:
+            raise HTTPException(status_code=404, detail="Order not found")
+        if versions is not None and current.Version not in versions:
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="Order was changed by someone else",
+                headers={"ETag": version_etag(current.Version)}
+            )
+        if order_update.status is not None and order_update.status != current.Status:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Cannot change order status from {current.Status.value} to {order_update.status.value}"
+            )
+        # The status stays as it is; only the other fields change
+        if fields:
+            db_order = await update_order_row(db, order_id, versions, fields, Order.Status == current.Status)
+        else:
+            db_order = await db.get(Order, order_id)
+        if db_order is None:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Order was changed by someone else")
     
-    db.commit()
-    db.refresh(db_order)
+    await db.refresh(db_order, attribute_names=["order_items"])
+    restocked = {}
+    if status_changed:
+        try:
+            restocked = await inventory.apply_status(db, db_order)
+        except inventory.InsufficientStock as exc:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"{exc}; the order's reservation expired")
+        await sales_stats.record_status_change(db, db_order, db_order.order_items, db_order.PreviousStatus)
+        notifications.enqueue(db, "order.status_changed", order_id=order_id, status=db_order.Status.value)
+    await db.commit()
+    await inventory.invalidate(restocked)
+    response.headers["ETag"] = version_etag(db_order.Version)
     return db_order
-
@@ -1,17 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.models.base import get_db
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_read_db
+from app.models.base import get_async_db
 from app.models.product import Product
-from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse
-from typing import List
+from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse, ProductStockShardsUpdate, ProductImportResult
+from app.services import inventory, product_import, product_search
+from app.services.cache import cache, product_key, supplier_products_group
+from app.services.link_index import link_index
+from app.utils.pagination import NEXT_CURSOR_HEADER, paginate
+from app.utils.serialization import RowSerializer, json_response
+from typing import List, Optional
 
 router = APIRouter()
 
+# List pages are serialized from selected columns
+product_rows = RowSerializer(ProductResponse, Product)
+
+async def commit_product(db: AsyncSession):
+    """Commit a product write, mapping a duplicate SKU onto 409"""
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="The supplier already has a product with this SKU")
+
 @router.post("/", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
-async def create_product(product: ProductCreate, db: Session = Depends(get_db)):
+async def create_product(product: ProductCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new product"""
     db_product = Product(
         SupplierID=product.supplier_id,
+        SKU=product.sku,
         Name=product.name,
         Description=product.description,
         Price=product.price,
@@ -25,37 +45,117 @@ async def create_product(product: ProductCreate, db: Session = Depends(get_db)):
         DeliveryZones=product.delivery_zones
     )
     db.add(db_product)
-    db.commit()
-    db.refresh(db_product)
+    await commit_product(db)
+    await db.refresh(db_product)
+    product_search.search_index.update(db_product)
+    await cache.bump(supplier_products_group(db_product.SupplierID))
     return db_product
 
+@router.post("/import", response_model=ProductImportResult)
+async def import_products(supplier_id: int, file: UploadFile = File(...), db: AsyncSession = Depends(get_async_db)):
+    """Create or update a supplier's products from a CSV or JSON Lines file, keyed on SKU.
+
+    The upload is read a line at a time, so large catalogs are never held
+    in memory; rows that fail validation are reported and skipped.
+    """
+    filename = (file.filename or "").lower()
+    if filename.endswith(".csv") or file.content_type == "text/csv":
+        fmt = "csv"
+    elif filename.endswith((".jsonl", ".ndjson")) or file.content_type in ("application/x-ndjson", "application/jsonl"):
+        fmt = "jsonl"
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Upload a .csv or .jsonl file"
+        )
+    return await product_import.import_products(db, supplier_id, file.file, fmt)
+
 @router.get("/", response_model=List[ProductResponse])
-async def get_products(supplier_id: int = None, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_products(
+    response: Response,
+    supplier_id: int = None,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get products, optionally filtered by supplier"""
-    query = db.query(Product)
-    if supplier_id:
-        query = query.filter(Product.SupplierID == supplier_id)
-    products = query.offset(skip).limit(limit).all()
+    query = product_rows.select()
+    if not supplier_id:
+        products = await paginate(db, query, [Product.ProductID], response, cursor, skip, limit, rows=True)
+        return product_rows.response(products, response)
+    
+    # Supplier catalogs are read far more often than written, so pages are
+    # cached until the supplier's next product write
+    query = query.where(Product.SupplierID == supplier_id)
+    group = supplier_products_group(supplier_id)
+    
+    async def load_page():
+        page = Response()
+        products = await paginate(db, query, [Product.ProductID], page, cursor, skip, limit, rows=True)
+        return {
+            "items": product_rows.dump(products),
+            "next_cursor": page.headers.get(NEXT_CURSOR_HEADER)
+        }
+    
+    key = f"{group}:{await cache.generation(group)}:{cursor}:{skip}:{limit}"
+    page = await cache.get_or_load(key, load_page)
+    if page["next_cursor"]:
+        response.headers[NEXT_CURSOR_HEADER] = page["next_cursor"]
+    # Cached items are already in response form
+    return json_response(page["items"], response)
+
+@router.get("/search", response_model=List[ProductResponse])
+async def search_catalog(
+    response: Response,
+    q: str = Query(..., min_length=1),
+    consumer_id: int = None,
+    supplier_id: int = None,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Search active products by name and description, best matches first.
+
+    With consumer_id, only suppliers the consumer has an approved link with
+    are searched.
+    """
+    supplier_ids = None
+    if consumer_id:
+        supplier_ids = await link_index.suppliers_of(consumer_id)
+        if supplier_id:
+            supplier_ids &= {supplier_id}
+    elif supplier_id:
+        supplier_ids = {supplier_id}
+    
+    products, next_cursor = await product_search.search_products(db, q, supplier_ids, cursor, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return products
 
 @router.get("/{product_id}", response_model=ProductResponse)
-async def get_product(product_id: int, db: Session = Depends(get_db)):
+async def get_product(product_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get product by ID"""
-    product = db.query(Product).filter(Product.ProductID == product_id).first()
+    async def load_product():
+        product = await db.get(Product, product_id)
+        return ProductResponse.model_validate(product).model_dump(mode="json") if product else None
+    
+    product = await cache.get_or_load(product_key(product_id), load_product)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     return product
 
 @router.patch("/{product_id}", response_model=ProductResponse)
-async def update_product(product_id: int, product_update: ProductUpdate, db: Session = Depends(get_db)):
+async def update_product(product_id: int, product_update: ProductUpdate, db: AsyncSession = Depends(get_async_db)):
     """Update product"""
-    db_product = db.query(Product).filter(Product.ProductID == product_id).first()
+    db_product = await db.get(Product, product_id)
     if not db_product:
         raise HTTPException(status_code=404, detail="Product not found")
     
     update_data = product_update.model_dump(exclude_unset=True)
     # Map snake_case to PascalCase
     field_mapping = {
+        "sku": "SKU",
         "name": "Name",
         "description": "Description",
         "price": "Price",
@@ -73,8 +173,25 @@ async def update_product(product_id: int, product_update: ProductUpdate, db: Ses
     for field, value in update_data.items():
         db_field = field_mapping.get(field, field)
         setattr(db_product, db_field, value)
+    if "stock" in update_data and db_product.StockShards:
+        await db.flush()
+        await inventory.redistribute(db, [product_id])
     
-    db.commit()
-    db.refresh(db_product)
+    await commit_product(db)
+    await db.refresh(db_product)
+    product_search.search_index.update(db_product)
+    await cache.invalidate(product_key(product_id))
+    await cache.bump(supplier_products_group(db_product.SupplierID))
     return db_product
 
+@router.put("/{product_id}/stock-shards", response_model=ProductResponse)
+async def update_stock_shards(product_id: int, shards_update: ProductStockShardsUpdate, db: AsyncSession = Depends(get_async_db)):
+    """Split a hot product's stock over several rows so concurrent orders don't queue on one lock"""
+    db_product = (await db.scalars(select(Product).where(Product.ProductID == product_id).with_for_update())).one_or_none()
+    if not db_product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    await inventory.reshard(db, db_product, shards_update.shards)
+    await db.commit()
+    await cache.invalidate(product_key(product_id))
+    await cache.bump(supplier_products_group(db_product.SupplierID))
+    return db_product
@@ -1,14 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.models.base import get_db
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_read_db
+from app.models.base import get_async_db
+from app.models.order import OrderStatus
+from app.models.sales import SupplierProductSalesDaily, SupplierSalesDaily
 from app.models.supplier import Supplier
+from app.schemas.sales import SalesDailyResponse, TopProductResponse
 from app.schemas.supplier import SupplierCreate, SupplierResponse
-from typing import List
+from app.services.cache import cache, supplier_key
+from app.utils.pagination import paginate
+from app.utils.serialization import RowSerializer
+from typing import List, Optional
+from datetime import date, datetime, timedelta, timezone
 
 router = APIRouter()
 
+# List pages are serialized from selected columns
+supplier_rows = RowSerializer(SupplierResponse, Supplier)
+
 @router.post("/", response_model=SupplierResponse, status_code=status.HTTP_201_CREATED)
-async def create_supplier(supplier: SupplierCreate, db: Session = Depends(get_db)):
+async def create_supplier(supplier: SupplierCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new supplier"""
     db_supplier = Supplier(
         CompanyName=supplier.company_name,
@@ -17,21 +29,87 @@ async def create_supplier(supplier: SupplierCreate, db: Session = Depends(get_db
         Email=supplier.email
     )
     db.add(db_supplier)
-    db.commit()
-    db.refresh(db_supplier)
+    await db.commit()
+    await db.refresh(db_supplier)
+    await cache.invalidate(supplier_key(db_supplier.SupplierID))
     return db_supplier
 
 @router.get("/", response_model=List[SupplierResponse])
-async def get_suppliers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_suppliers(
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_read_db)
+):
     """Get all suppliers"""
-    suppliers = db.query(Supplier).offset(skip).limit(limit).all()
-    return suppliers
+    suppliers = await paginate(db, supplier_rows.select(), [Supplier.SupplierID], response, cursor, skip, limit, rows=True)
+    return supplier_rows.response(suppliers, response)
 
 @router.get("/{supplier_id}", response_model=SupplierResponse)
-async def get_supplier(supplier_id: int, db: Session = Depends(get_db)):
+async def get_supplier(supplier_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get supplier by ID"""
-    supplier = db.query(Supplier).filter(Supplier.SupplierID == supplier_id).first()
+    async def load_supplier():
+        supplier = await db.get(Supplier, supplier_id)
+        return SupplierResponse.model_validate(supplier).model_dump(mode="json") if supplier else None
+    
+    supplier = await cache.get_or_load(supplier_key(supplier_id), load_supplier)
     if not supplier:
         raise HTTPException(status_code=404, detail="Supplier not found")
     return supplier
 
+def _date_range(date_from: Optional[date], date_to: Optional[date]):
+    """Default to the last 30 days, inclusive of today"""
+    date_to = date_to or datetime.now(timezone.utc).date()
+    return date_from or date_to - timedelta(days=29), date_to
+
+@router.get("/{supplier_id}/sales/daily", response_model=List[SalesDailyResponse])
+async def get_daily_sales(
+    supplier_id: int,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Order counts and revenue per day and order status (inclusive date range)"""
+    date_from, date_to = _date_range(date_from, date_to)
+    result = await db.execute(
+        select(SupplierSalesDaily)
+        .where(
+            SupplierSalesDaily.SupplierID == supplier_id,
+            SupplierSalesDaily.Day >= date_from,
+            SupplierSalesDaily.Day <= date_to,
+            SupplierSalesDaily.OrderCount != 0
+        )
+        .order_by(SupplierSalesDaily.Day, SupplierSalesDaily.Status)
+    )
+    return result.scalars().all()
+
+@router.get("/{supplier_id}/sales/top-products", response_model=List[TopProductResponse])
+async def get_top_products(
+    supplier_id: int,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = 10,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Best-selling products by revenue, excluding rejected and cancelled orders"""
+    date_from, date_to = _date_range(date_from, date_to)
+    revenue = func.sum(SupplierProductSalesDaily.Revenue)
+    result = await db.execute(
+        select(
+            SupplierProductSalesDaily.ProductID,
+            func.sum(SupplierProductSalesDaily.Quantity).label("Quantity"),
+            revenue.label("Revenue")
+        )
+        .where(
+            SupplierProductSalesDaily.SupplierID == supplier_id,
+            SupplierProductSalesDaily.Day >= date_from,
+            SupplierProductSalesDaily.Day <= date_to,
+            SupplierProductSalesDaily.Status.not_in([OrderStatus.REJECTED, OrderStatus.CANCELLED])
+        )
+        .group_by(SupplierProductSalesDaily.ProductID)
+        .having(revenue > 0)
+        .order_by(revenue.desc(), SupplierProductSalesDaily.ProductID)
+        .limit(limit)
+    )
+    return result.all()
@@ -1,23 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.models.base import get_db
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_read_db
 from app.models.user import User
 from app.schemas.user import UserResponse
-from typing import List
+from app.utils.pagination import paginate
+from app.utils.serialization import RowSerializer
+from typing import List, Optional
 
 router = APIRouter()
 
+# List pages are serialized from selected columns
+user_rows = RowSerializer(UserResponse, User)
+
 @router.get("/", response_model=List[UserResponse])
-async def get_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_users(
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_read_db)
+):
     """Get all users"""
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
+    users = await paginate(db, user_rows.select(), [User.UserID], response, cursor, skip, limit, rows=True)
+    return user_rows.response(users, response)
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def get_user(user_id: int, db: Session = Depends(get_db)):
+async def get_user(user_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get user by ID"""
-    user = db.query(User).filter(User.UserID == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
-
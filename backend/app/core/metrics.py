@@ -0,0 +1,147 @@
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+MAX_LOGGED_STATEMENTS = 50
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time to handle a request, including streaming the body",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements executed per request",
+    ["method", "route"], buckets=QUERY_COUNT_BUCKETS
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per request",
+    ["method", "route"], buckets=LATENCY_BUCKETS
+)
+QUERY_LATENCY = Histogram("db_query_duration_seconds", "Time to execute one SQL statement", buckets=LATENCY_BUCKETS)
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time waiting for a connection from the pool", buckets=LATENCY_BUCKETS
+)
+POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out of the pool")
+READ_ROUTING = Counter("db_read_sessions_total", "Read-only sessions by the database they used", ["target"])
+REPLICA_LAG = Gauge("db_replica_lag_seconds", "Last measured replication lag; NaN while unreachable", ["replica"])
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Entity cache lookups by result", ["result"])
+CACHE_EVICTIONS = Counter(
+    "cache_evictions_total", "Entries the in-process cache dropped for age or size; Redis reports its own"
+)
+
+@dataclass
+class RequestStats:
+    """SQL activity attributed to the current request"""
+    queries: int = 0
+    db_seconds: float = 0.0
+    statements: Optional[List[Tuple[float, str]]] = field(default=None)  # Kept only when slow logging is on
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long checkouts wait.
+
+    The pool has no event for the start of a checkout, so the wait is
+    measured around the internal getter instead.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+def instrument_engine(engine, track_pool: bool = True):
+    """Record statement timings for an engine and attribute them to the current request"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if track_pool:
+        POOL_CHECKED_OUT.set_function(lambda: getattr(sync_engine.pool, "checkedout", lambda: 0)())
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_started
+        QUERY_LATENCY.observe(elapsed)
+        stats = current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+            if stats.statements is not None and len(stats.statements) < MAX_LOGGED_STATEMENTS:
+                stats.statements.append((elapsed, statement))
+
+class MetricsMiddleware:
+    """Per-route latency and SQL usage for HTTP requests.
+
+    Routes are labelled by their path template (e.g. /api/v1/orders/{order_id})
+    so labels stay bounded; unmatched paths share one label. Requests slower
+    than `slow_request_ms` are logged with their SQL statements.
+    """
+
+    def __init__(self, app: ASGIApp, slow_request_ms: Optional[int] = None):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+        self._route_paths: Dict[object, str] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(statements=[] if self.slow_request_ms else None)
+        token = current_request.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request.reset(token)
+            self._record(scope, status_code, elapsed, stats)
+
+    def _record(self, scope: Scope, status_code: int, elapsed: float, stats: RequestStats):
+        method = scope["method"]
+        route = self._route_path(scope)
+        REQUEST_LATENCY.labels(method, route, str(status_code)).observe(elapsed)
+        REQUEST_QUERIES.labels(method, route).observe(stats.queries)
+        REQUEST_DB_TIME.labels(method, route).observe(stats.db_seconds)
+
+        if self.slow_request_ms and elapsed * 1000 >= self.slow_request_ms:
+            lines = [f"  {seconds * 1000:8.1f} ms  {' '.join(statement.split())}" for seconds, statement in stats.statements]
+            logger.warning(
+                "Slow request %s %s -> %s in %.1f ms (%s queries, %.1f ms in SQL)%s",
+                method, scope["path"], status_code, elapsed * 1000, stats.queries, stats.db_seconds * 1000,
+                "".join("\n" + line for line in lines)
+            )
+
+    def _route_path(self, scope: Scope) -> str:
+        # The router stores the matched endpoint in the shared scope
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "<unmatched>"
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            app = scope.get("app")
+            routes = getattr(app, "routes", [])
+            path = next((route.path for route in routes if getattr(route, "endpoint", None) is endpoint), "<unmatched>")
+            self._route_paths[endpoint] = path
+        return path
@@ -0,0 +1,113 @@
+import hashlib
+import heapq
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from jose import jwt
+from app.core.config import settings
+from app.core.security import decode_access_token
+from app.services.broker import Subscription, broker
+
+logger = logging.getLogger(__name__)
+
+# Broker channel carrying revocations to every worker
+REVOCATION_CHANNEL = "auth:revoke"
+
+class TokenCache:
+    """Bounded cache of verified JWT claims with an in-memory revocation set.
+
+    Entries are keyed by the SHA-256 digest of the token (the raw token is
+    never stored) and are dropped once the token's `exp` passes, so a hit
+    never outlives the signature check it stands in for. The least recently
+    used entry is evicted when the cache is full.
+
+    Revocations are held in memory only. With a shared broker they are
+    published so every worker rejects the token; a worker that misses one
+    (it was down, or fell behind the broker) accepts the token until it
+    expires, as does any worker after a restart.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+        self._revoked: Dict[str, float] = {}
+        self._expiries: List[Tuple[float, str]] = []  # Heap of revocations by expiry, for pruning
+        self._subscription: Optional[Subscription] = None
+
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def verify(self, token: str) -> Optional[dict]:
+        """Return the token's claims if it is valid, unexpired and not revoked"""
+        digest = self._digest(token)
+        now = time.time()
+        if digest in self._revoked:
+            return None
+
+        entry = self._entries.get(digest)
+        if entry is not None:
+            claims, expires_at = entry
+            if expires_at > now:
+                self._entries.move_to_end(digest)
+                return claims
+            del self._entries[digest]
+
+        claims = decode_access_token(token)
+        if claims is None:
+            return None
+        self._entries[digest] = (claims, float(claims.get("exp", now)))
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return claims
+
+    async def revoke(self, token: str):
+        """Reject the token until it expires, on every worker"""
+        digest = self._digest(token)
+        entry = self._entries.get(digest)
+        if entry is not None:
+            expires_at = entry[1]
+        else:
+            expires_at = float(jwt.get_unverified_claims(token).get("exp", 0))
+        self._revoke(digest, expires_at)
+        if broker.shared:
+            await broker.publish(REVOCATION_CHANNEL, json.dumps([digest, expires_at]))
+
+    def _revoke(self, digest: str, expires_at: float):
+        self._entries.pop(digest, None)
+        # Only revocations that have expired are dropped, oldest first
+        now = time.time()
+        while self._expiries and self._expiries[0][0] <= now:
+            _, expired = heapq.heappop(self._expiries)
+            if self._revoked.get(expired, now) <= now:
+                self._revoked.pop(expired, None)
+        self._revoked[digest] = expires_at
+        heapq.heappush(self._expiries, (expires_at, digest))
+
+    async def start(self):
+        """Subscribe to other workers' revocations"""
+        if broker.shared:
+            self._subscription = broker.subscribe(REVOCATION_CHANNEL)
+
+    async def run(self):
+        """Apply other workers' revocations until cancelled"""
+        if self._subscription is None:
+            return
+        try:
+            while True:
+                payload = await self._subscription.queue.get()
+                if payload is None:
+                    logger.warning("Token revocations were missed; those tokens stay valid here until they expire")
+                    broker.unsubscribe(REVOCATION_CHANNEL, self._subscription)
+                    self._subscription = broker.subscribe(REVOCATION_CHANNEL)
+                    continue
+                try:
+                    self._revoke(*json.loads(payload))
+                except Exception:
+                    logger.exception("Applying a token revocation failed")
+        finally:
+            broker.unsubscribe(REVOCATION_CHANNEL, self._subscription)
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE)
@@ -1,18 +1,72 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from app.core.config import settings
-from app.models.base import Base, engine
+from app.core.metrics import MetricsMiddleware, instrument_engine
+from app.core.token_cache import token_cache
+from app.models.base import Base, engine, async_engine
 from app.api.v1 import api_router
+from app.services.broker import broker
+from app.services.cache import cache
+from app.services.image_variants import variant_store
+from app.services.inventory import run_sweeper
+from app.services.link_index import link_index
+from app.services.notifications import create_outbox_worker
+from app.services.password_hasher import password_hasher
+from app.services.read_replicas import LAST_WRITE_HEADER, LastWriteMiddleware, replica_router
+from app.services.sales_stats import run_reconciler
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await broker.start()
+    await link_index.start()
+    await cache.start()
+    await token_cache.start()
+    tasks = [
+        asyncio.create_task(link_index.run()),
+        asyncio.create_task(cache.run()),
+        asyncio.create_task(token_cache.run()),
+        asyncio.create_task(run_reconciler(settings.SALES_RECONCILE_INTERVAL_SECONDS, settings.SALES_RECONCILE_DAYS)),
+        asyncio.create_task(run_sweeper(settings.RESERVATION_SWEEP_SECONDS, settings.RESERVATION_SWEEP_BATCH)),
+    ]
+    outbox_worker = create_outbox_worker()
+    if outbox_worker is not None:
+        tasks.append(asyncio.create_task(outbox_worker.run()))
+    if replica_router.enabled:
+        await asyncio.gather(*(replica.check() for replica in replica_router.replicas))
+        tasks.append(asyncio.create_task(replica_router.run()))
+    yield
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await broker.stop()
+    await cache.backend.close()
+    password_hasher.shutdown()
+    variant_store.shutdown()
+    await async_engine.dispose()
+    await replica_router.dispose()
+
 app = FastAPI(
     title="Supplier Consumer Platform API",
     description="B2B platform for food suppliers and institutional consumers",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Request latency and SQL metrics, exported on /metrics
+instrument_engine(async_engine)
+app.add_middleware(MetricsMiddleware, slow_request_ms=settings.SLOW_REQUEST_MS)
+
+# Read-your-writes marker for replica routing
+if replica_router.enabled:
+    app.add_middleware(LastWriteMiddleware, max_age=settings.READ_YOUR_WRITES_SECONDS)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -20,6 +74,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, LAST_WRITE_HEADER, "ETag"],
 )
 
 # Include API router
@@ -33,3 +88,6 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics")
+async def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -6,8 +6,12 @@ from .consumer_staff import ConsumerStaff
 from .link import Link
 from .product import Product
 from .order import Order, OrderItem
-from .chat import Chat, Message
+from .chat import Chat, Message, ChatReadCursor
 from .complaint import Complaint, ComplaintLog
+from .sales import SupplierSalesDaily, SupplierProductSalesDaily
+from .outbox import OutboxMessage
+from .file import StoredFile
+from .inventory import StockReservation, ProductStockShard
 
 __all__ = [
     "User",
@@ -21,7 +25,14 @@ __all__ = [
     "OrderItem",
     "Chat",
     "Message",
+    "ChatReadCursor",
     "Complaint",
     "ComplaintLog",
+    "SupplierSalesDaily",
+    "SupplierProductSalesDaily",
+    "OutboxMessage",
+    "StoredFile",
+    "StockReservation",
+    "ProductStockShard",
 ]
 
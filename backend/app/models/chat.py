@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Boolean, Text, String
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Boolean, Text, String, Index, exists
+from sqlalchemy.orm import column_property, relationship
 from sqlalchemy.sql import func
 from app.models.base import Base
 
@@ -16,13 +16,17 @@ class Chat(Base):
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        Index("ix_messages_ChatID_SentAt_MessageID", "ChatID", "SentAt", "MessageID"),
+        Index("ix_messages_ChatID_MessageID", "ChatID", "MessageID"),
+    )
 
     MessageID = Column(Integer, primary_key=True, index=True)
     ChatID = Column(Integer, ForeignKey("chats.ChatID"), nullable=False)
     UserID = Column(Integer, ForeignKey("users.UserID"), nullable=False)
     Content = Column(Text)
     SentAt = Column(DateTime(timezone=True), server_default=func.now())
-    IsRead = Column(Boolean, default=False)
+    StoredIsRead = Column("IsRead", Boolean, default=False)  # Deprecated and no longer updated; see IsRead below
     MessageType = Column(String(50), default="text")  # text, file, audio
     FileURL = Column(String(500))  # For file attachments
     ProductLinkID = Column(Integer, nullable=True)  # Reference to product if message contains product link
@@ -31,3 +35,23 @@ class Message(Base):
     chat = relationship("Chat", back_populates="messages")
     user = relationship("User", back_populates="messages")
 
+
+class ChatReadCursor(Base):
+    """Last message each user has read in a chat (read high-watermark)"""
+    __tablename__ = "chat_read_cursors"
+
+    ChatID = Column(Integer, ForeignKey("chats.ChatID"), primary_key=True)
+    UserID = Column(Integer, ForeignKey("users.UserID"), primary_key=True)
+    LastReadMessageID = Column(Integer, nullable=False, default=0)
+    UpdatedAt = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+# Read once another participant's watermark has reached the message, as the
+# deprecated per-message flag meant; derived so it can never go stale
+Message.IsRead = column_property(
+    exists().where(
+        ChatReadCursor.ChatID == Message.ChatID,
+        ChatReadCursor.UserID != Message.UserID,
+        ChatReadCursor.LastReadMessageID >= Message.MessageID
+    )
+)
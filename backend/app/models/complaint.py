@@ -20,7 +20,7 @@ class Complaint(Base):
     __tablename__ = "complaints"
 
     ComplaintID = Column(Integer, primary_key=True, index=True)
-    OrderID = Column(Integer, ForeignKey("orders.OrderID"), nullable=False)
+    OrderID = Column(Integer, ForeignKey("orders.OrderID"), nullable=False, index=True)
     ConsumerStaffID = Column(Integer, ForeignKey("consumer_staff.StaffID"), nullable=False)
     SupplierStaffID = Column(Integer, ForeignKey("supplier_staff.StaffID"), nullable=True)  # Assigned resolver
     Title = Column(String(255), nullable=False)
@@ -29,6 +29,7 @@ class Complaint(Base):
     Priority = Column(Enum(ComplaintPriority), default=ComplaintPriority.MEDIUM)
     CreatedAt = Column(DateTime(timezone=True), server_default=func.now())
     ResolvedAt = Column(DateTime(timezone=True), nullable=True)
+    Version = Column(Integer, nullable=False, default=1, server_default="1")  # Bumped by every update
 
     # Relationships
     order = relationship("Order", back_populates="complaints")
@@ -40,7 +41,7 @@ class ComplaintLog(Base):
     __tablename__ = "complaint_logs"
 
     LogID = Column(Integer, primary_key=True, index=True)
-    ComplaintID = Column(Integer, ForeignKey("complaints.ComplaintID"), nullable=False)
+    ComplaintID = Column(Integer, ForeignKey("complaints.ComplaintID"), nullable=False, index=True)
     UserID = Column(Integer, ForeignKey("users.UserID"), nullable=False)
     Action = Column(String(255), nullable=False)  # e.g., "Created", "Escalated", "Resolved"
     Notes = Column(Text)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, BigInteger, DateTime
+from sqlalchemy.sql import func
+from app.models.base import Base
+
+class StoredFile(Base):
+    """Uploaded file, addressed by the SHA-256 of its content.
+
+    The bytes live on disk under UPLOAD_DIR (see app.services.file_storage);
+    identical uploads share one file and one row.
+    """
+    __tablename__ = "stored_files"
+
+    Digest = Column(String(64), primary_key=True)  # Lowercase hex SHA-256
+    Size = Column(BigInteger, nullable=False)
+    ContentType = Column(String(255), nullable=False)
+    CreatedAt = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Enum, Index
+from sqlalchemy.sql import func
+from app.models.base import Base
+import enum
+
+class ReservationStatus(str, enum.Enum):
+    HELD = "Held"  # Taken from stock for a pending order until ExpiresAt
+    COMMITTED = "Committed"  # The supplier accepted the order
+    RELEASED = "Released"  # Returned to stock when the order was rejected or cancelled
+    EXPIRED = "Expired"  # Returned to stock by the sweeper
+
+class StockReservation(Base):
+    """Stock taken for one product line of an order.
+
+    Product.Stock (or the product's shards) is what is left to promise;
+    reservations record what was taken, so it can be given back.
+    """
+    __tablename__ = "stock_reservations"
+    __table_args__ = (
+        Index("ix_stock_reservations_Status_ExpiresAt", "Status", "ExpiresAt"),
+    )
+
+    ReservationID = Column(Integer, primary_key=True, index=True)
+    OrderID = Column(Integer, ForeignKey("orders.OrderID"), nullable=False, index=True)
+    ProductID = Column(Integer, ForeignKey("products.ProductID"), nullable=False)
+    Shard = Column(Integer, nullable=True)  # Stock shard the quantity came from; None for the products row
+    Quantity = Column(Integer, nullable=False)
+    Status = Column(Enum(ReservationStatus), nullable=False, default=ReservationStatus.HELD)
+    CreatedAt = Column(DateTime(timezone=True), server_default=func.now())
+    ExpiresAt = Column(DateTime(timezone=True), nullable=True)  # Set while HELD
+
+class ProductStockShard(Base):
+    """Part of a hot product's stock, so concurrent orders lock different rows"""
+    __tablename__ = "product_stock_shards"
+
+    ProductID = Column(Integer, ForeignKey("products.ProductID"), primary_key=True)
+    Shard = Column(Integer, primary_key=True)
+    Stock = Column(Integer, nullable=False, default=0)
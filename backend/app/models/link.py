@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -13,6 +13,10 @@ class LinkStatus(str, enum.Enum):
 
 class Link(Base):
     __tablename__ = "links"
+    __table_args__ = (
+        Index("ix_links_SupplierID_ConsumerID", "SupplierID", "ConsumerID", unique=True),
+        Index("ix_links_ConsumerID", "ConsumerID"),
+    )
 
     LinkID = Column(Integer, primary_key=True, index=True)
     SupplierID = Column(Integer, ForeignKey("suppliers.SupplierID"), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Enum, Numeric, String
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Enum, Numeric, String, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -12,8 +12,26 @@ class OrderStatus(str, enum.Enum):
     COMPLETED = "Completed"
     CANCELLED = "Cancelled"
 
+# Status -> statuses it may move to; the last three are final
+ORDER_TRANSITIONS = {
+    OrderStatus.PENDING: {OrderStatus.ACCEPTED, OrderStatus.REJECTED, OrderStatus.CANCELLED},
+    OrderStatus.ACCEPTED: {OrderStatus.IN_PROGRESS, OrderStatus.CANCELLED},
+    OrderStatus.IN_PROGRESS: {OrderStatus.COMPLETED, OrderStatus.CANCELLED},
+    OrderStatus.REJECTED: set(),
+    OrderStatus.COMPLETED: set(),
+    OrderStatus.CANCELLED: set(),
+}
+
+def statuses_leading_to(status: OrderStatus) -> list:
+    """Statuses an order may be in for a change to `status`"""
+    return [current for current, targets in ORDER_TRANSITIONS.items() if status in targets]
+
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_SupplierID_OrderDate_OrderID", "SupplierID", "OrderDate", "OrderID"),
+        Index("ix_orders_ConsumerID_OrderDate_OrderID", "ConsumerID", "OrderDate", "OrderID"),
+    )
 
     OrderID = Column(Integer, primary_key=True, index=True)
     SupplierID = Column(Integer, ForeignKey("suppliers.SupplierID"), nullable=False)
@@ -24,6 +42,8 @@ class Order(Base):
     TotalAmount = Column(Numeric(10, 2), nullable=False)
     DeliveryDate = Column(DateTime(timezone=True), nullable=True)
     RejectionReason = Column(String(500), nullable=True)
+    Version = Column(Integer, nullable=False, default=1, server_default="1")  # Bumped by every update
+    PreviousStatus = Column(Enum(OrderStatus), nullable=True)  # Status before the last status change
 
     # Relationships
     supplier = relationship("Supplier", back_populates="orders")
@@ -36,7 +56,7 @@ class OrderItem(Base):
     __tablename__ = "order_items"
 
     OrderItemID = Column(Integer, primary_key=True, index=True)
-    OrderID = Column(Integer, ForeignKey("orders.OrderID"), nullable=False)
+    OrderID = Column(Integer, ForeignKey("orders.OrderID"), nullable=False, index=True)
     ProductID = Column(Integer, ForeignKey("products.ProductID"), nullable=False)
     Quantity = Column(Integer, nullable=False)
     UnitPrice = Column(Numeric(10, 2), nullable=False)
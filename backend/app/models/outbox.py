@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, DateTime, Enum, Text, JSON, Index
+from sqlalchemy.sql import func
+from app.models.base import Base
+import enum
+
+class OutboxStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    SENT = "SENT"
+    DEAD = "DEAD"  # Gave up after OUTBOX_MAX_ATTEMPTS; kept for inspection
+
+class OutboxMessage(Base):
+    """Notification recorded in the same transaction as the change it announces.
+
+    Delivered asynchronously by app.services.notifications.OutboxWorker.
+    """
+    __tablename__ = "outbox_messages"
+    __table_args__ = (
+        Index("ix_outbox_messages_Status_AvailableAt", "Status", "AvailableAt"),
+    )
+
+    MessageID = Column(Integer, primary_key=True, index=True)
+    Topic = Column(String(100), nullable=False)  # e.g. "order.created"
+    Payload = Column(JSON, nullable=False)
+    Status = Column(Enum(OutboxStatus), nullable=False, default=OutboxStatus.PENDING)
+    Attempts = Column(Integer, nullable=False, default=0)
+    AvailableAt = Column(DateTime(timezone=True), nullable=False, server_default=func.now())  # Not delivered before this
+    LastError = Column(Text)
+    CreatedAt = Column(DateTime(timezone=True), server_default=func.now())
+    SentAt = Column(DateTime(timezone=True), nullable=True)
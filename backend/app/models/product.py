@@ -1,18 +1,42 @@
-from sqlalchemy import Column, Integer, ForeignKey, String, Numeric, Integer as SQLInteger, Boolean, DateTime, Text
+from sqlalchemy import Column, Integer, ForeignKey, String, Numeric, Integer as SQLInteger, Boolean, DateTime, Text, Index, DDL, event, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.models.base import Base
 
+# Full-text document for catalog search on Postgres. The search query uses
+# this exact expression so the planner can match the GIN index below.
+SEARCH_DOCUMENT_SQL = """to_tsvector('english'::regconfig, coalesce("Name", '') || ' ' || coalesce("Description", ''))"""
+
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        Index("ix_products_SupplierID_ProductID", "SupplierID", "ProductID"),
+        # Supplier's own SKU, the key for catalog imports
+        Index("ix_products_SupplierID_SKU", "SupplierID", "SKU", unique=True),
+        # Active catalog per supplier
+        Index(
+            "ix_products_active_SupplierID_ProductID", "SupplierID", "ProductID",
+            postgresql_where=text('"IsActive"'),
+            sqlite_where=text('"IsActive"')
+        ),
+        # Catalog search: full-text and trigram (typo-tolerant) name matching
+        Index("ix_products_search_document", text(SEARCH_DOCUMENT_SQL), postgresql_using="gin").ddl_if(dialect="postgresql"),
+        Index(
+            "ix_products_Name_trgm", "Name",
+            postgresql_using="gin",
+            postgresql_ops={"Name": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
 
     ProductID = Column(Integer, primary_key=True, index=True)
     SupplierID = Column(Integer, ForeignKey("suppliers.SupplierID"), nullable=False)
+    SKU = Column(String(100), nullable=True)  # Supplier's stock keeping unit
     Name = Column(String(255), nullable=False)
     Description = Column(Text)
     Price = Column(Numeric(10, 2), nullable=False)
     Unit = Column(String(50))  # e.g., "kg", "piece", "box"
-    Stock = Column(SQLInteger, default=0)
+    Stock = Column(SQLInteger, default=0)  # Available to order; refreshed from the shards when StockShards > 0
+    StockShards = Column(SQLInteger, nullable=False, default=0, server_default="0")  # Rows in product_stock_shards
     IsActive = Column(Boolean, default=True)
     MinimumOrderQuantity = Column(SQLInteger, default=1)
     ImageURL = Column(String(500))  # URL to product image
@@ -26,3 +50,9 @@ class Product(Base):
     supplier = relationship("Supplier", back_populates="products")
     order_items = relationship("OrderItem", back_populates="product")
 
+
+event.listen(
+    Product.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
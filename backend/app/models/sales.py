@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, ForeignKey, Date, Enum, Numeric
+from app.models.base import Base
+from app.models.order import OrderStatus
+
+class SupplierSalesDaily(Base):
+    """Orders and revenue per supplier, day and order status.
+
+    Maintained incrementally by order intake and status changes, and
+    periodically reconciled against `orders` (see app.services.sales_stats).
+    """
+    __tablename__ = "supplier_sales_daily"
+
+    SupplierID = Column(Integer, ForeignKey("suppliers.SupplierID"), primary_key=True)
+    Day = Column(Date, primary_key=True)
+    Status = Column(Enum(OrderStatus), primary_key=True)
+    OrderCount = Column(Integer, nullable=False, default=0)
+    Revenue = Column(Numeric(14, 2), nullable=False, default=0)
+
+class SupplierProductSalesDaily(Base):
+    """Quantity and revenue per supplier, day, product and order status"""
+    __tablename__ = "supplier_product_sales_daily"
+
+    SupplierID = Column(Integer, ForeignKey("suppliers.SupplierID"), primary_key=True)
+    Day = Column(Date, primary_key=True)
+    ProductID = Column(Integer, ForeignKey("products.ProductID"), primary_key=True)
+    Status = Column(Enum(OrderStatus), primary_key=True)
+    Quantity = Column(Integer, nullable=False, default=0)
+    Revenue = Column(Numeric(14, 2), nullable=False, default=0)
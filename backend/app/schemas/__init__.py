@@ -1,16 +1,19 @@
-from .user import UserCreate, UserResponse, UserLogin
+from .user import UserCreate, UserResponse, UserLogin, CurrentUser
 from .supplier import SupplierCreate, SupplierResponse
 from .consumer import ConsumerCreate, ConsumerResponse
 from .link import LinkCreate, LinkResponse, LinkUpdate
-from .product import ProductCreate, ProductUpdate, ProductResponse
-from .order import OrderCreate, OrderResponse, OrderItemCreate, OrderItemResponse, OrderUpdate
-from .chat import ChatResponse, MessageCreate, MessageResponse
+from .product import ProductCreate, ProductUpdate, ProductResponse, ProductStockShardsUpdate, ProductImportError, ProductImportResult
+from .order import OrderCreate, OrderResponse, OrderItemCreate, OrderItemResponse, OrderUpdate, OrderBatchCreate, OrderBatchFailure, OrderBatchResponse
+from .chat import ChatResponse, MessageCreate, MessageResponse, ReadCursorUpdate, ReadCursorResponse, UnreadCountResponse
 from .complaint import ComplaintCreate, ComplaintResponse, ComplaintUpdate, ComplaintLogResponse
+from .sales import SalesDailyResponse, TopProductResponse
+from .file import StoredFileResponse
 
 __all__ = [
     "UserCreate",
     "UserResponse",
     "UserLogin",
+    "CurrentUser",
     "SupplierCreate",
     "SupplierResponse",
     "ConsumerCreate",
@@ -21,17 +24,29 @@ __all__ = [
     "ProductCreate",
     "ProductUpdate",
     "ProductResponse",
+    "ProductStockShardsUpdate",
+    "ProductImportError",
+    "ProductImportResult",
     "OrderCreate",
     "OrderResponse",
     "OrderItemCreate",
     "OrderItemResponse",
     "OrderUpdate",
+    "OrderBatchCreate",
+    "OrderBatchFailure",
+    "OrderBatchResponse",
     "ChatResponse",
     "MessageCreate",
     "MessageResponse",
+    "ReadCursorUpdate",
+    "ReadCursorResponse",
+    "UnreadCountResponse",
     "ComplaintCreate",
     "ComplaintResponse",
     "ComplaintUpdate",
     "ComplaintLogResponse",
+    "SalesDailyResponse",
+    "TopProductResponse",
+    "StoredFileResponse",
 ]
 
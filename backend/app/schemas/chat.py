@@ -23,6 +23,21 @@ class MessageResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class ReadCursorUpdate(BaseModel):
+    last_message_id: Optional[int] = None  # Defaults to the latest message
+
+class ReadCursorResponse(BaseModel):
+    ChatID: int
+    UserID: int
+    LastReadMessageID: int
+
+    class Config:
+        from_attributes = True
+
+class UnreadCountResponse(BaseModel):
+    chat_id: int
+    unread_count: int
+
 class ChatResponse(BaseModel):
     ChatID: int
     LinkID: int
@@ -36,6 +36,7 @@ class ComplaintResponse(BaseModel):
     Priority: ComplaintPriority
     CreatedAt: datetime
     ResolvedAt: Optional[datetime] = None
+    Version: int
     logs: List[ComplaintLogResponse] = []
 
     class Config:
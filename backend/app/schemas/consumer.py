@@ -1,14 +1,16 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import AliasChoices, BaseModel, EmailStr, Field
 from typing import Optional
 from datetime import datetime
 from app.models.consumer import ConsumerType
 
+# Fields also accept the model's PascalCase attribute names so responses
+# can be validated straight from ORM objects
 class ConsumerBase(BaseModel):
-    company_name: str
-    address: Optional[str] = None
-    phone: Optional[str] = None
-    email: Optional[EmailStr] = None
-    type: ConsumerType = ConsumerType.RESTAURANT
+    company_name: str = Field(validation_alias=AliasChoices("company_name", "CompanyName"))
+    address: Optional[str] = Field(default=None, validation_alias=AliasChoices("address", "Address"))
+    phone: Optional[str] = Field(default=None, validation_alias=AliasChoices("phone", "Phone"))
+    email: Optional[EmailStr] = Field(default=None, validation_alias=AliasChoices("email", "Email"))
+    type: ConsumerType = Field(default=ConsumerType.RESTAURANT, validation_alias=AliasChoices("type", "Type"))
 
 class ConsumerCreate(ConsumerBase):
     pass
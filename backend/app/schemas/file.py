@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+class StoredFileResponse(BaseModel):
+    digest: str
+    size: int
+    content_type: str
+    url: str  # Value for Message.FileURL / Product.ImageURL
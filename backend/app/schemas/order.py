@@ -1,12 +1,13 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 from decimal import Decimal
+from app.core.config import settings
 from app.models.order import OrderStatus
 
 class OrderItemCreate(BaseModel):
     product_id: int
-    quantity: int
+    quantity: int = Field(gt=0)
 
 class OrderItemResponse(BaseModel):
     OrderItemID: int
@@ -21,7 +22,7 @@ class OrderItemResponse(BaseModel):
 class OrderCreate(BaseModel):
     supplier_id: int
     consumer_id: int
-    items: List[OrderItemCreate]
+    items: List[OrderItemCreate] = Field(min_length=1)
     delivery_date: Optional[datetime] = None
 
 class OrderUpdate(BaseModel):
@@ -39,8 +40,21 @@ class OrderResponse(BaseModel):
     TotalAmount: Decimal
     DeliveryDate: Optional[datetime] = None
     RejectionReason: Optional[str] = None
+    Version: int
     order_items: List[OrderItemResponse] = []
 
     class Config:
         from_attributes = True
 
+
+class OrderBatchCreate(BaseModel):
+    orders: List[OrderCreate] = Field(min_length=1, max_length=settings.ORDER_BATCH_MAX_ORDERS)
+
+class OrderBatchFailure(BaseModel):
+    index: int  # Position in the request's orders
+    status_code: int
+    detail: str
+
+class OrderBatchResponse(BaseModel):
+    orders: List[OrderResponse]  # Placed orders, in request order
+    failures: List[OrderBatchFailure] = []
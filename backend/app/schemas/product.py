@@ -1,25 +1,30 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import AliasChoices, BaseModel, Field
+from typing import Optional, List
 from datetime import datetime
 from decimal import Decimal
+from app.core.config import settings
 
+# Fields also accept the model's PascalCase attribute names so responses
+# can be validated straight from ORM objects
 class ProductBase(BaseModel):
-    name: str
-    description: Optional[str] = None
-    price: Decimal
-    unit: Optional[str] = None
-    stock: int = 0
-    minimum_order_quantity: int = 1
-    image_url: Optional[str] = None
-    delivery_available: bool = True
-    pickup_available: bool = True
-    lead_time: Optional[str] = None
-    delivery_zones: Optional[str] = None
+    sku: Optional[str] = Field(default=None, max_length=100, validation_alias=AliasChoices("sku", "SKU"))
+    name: str = Field(validation_alias=AliasChoices("name", "Name"))
+    description: Optional[str] = Field(default=None, validation_alias=AliasChoices("description", "Description"))
+    price: Decimal = Field(validation_alias=AliasChoices("price", "Price"))
+    unit: Optional[str] = Field(default=None, validation_alias=AliasChoices("unit", "Unit"))
+    stock: int = Field(default=0, validation_alias=AliasChoices("stock", "Stock"))
+    minimum_order_quantity: int = Field(default=1, validation_alias=AliasChoices("minimum_order_quantity", "MinimumOrderQuantity"))
+    image_url: Optional[str] = Field(default=None, validation_alias=AliasChoices("image_url", "ImageURL"))
+    delivery_available: bool = Field(default=True, validation_alias=AliasChoices("delivery_available", "DeliveryAvailable"))
+    pickup_available: bool = Field(default=True, validation_alias=AliasChoices("pickup_available", "PickupAvailable"))
+    lead_time: Optional[str] = Field(default=None, validation_alias=AliasChoices("lead_time", "LeadTime"))
+    delivery_zones: Optional[str] = Field(default=None, validation_alias=AliasChoices("delivery_zones", "DeliveryZones"))
 
 class ProductCreate(ProductBase):
     supplier_id: int
 
 class ProductUpdate(BaseModel):
+    sku: Optional[str] = Field(default=None, max_length=100)
     name: Optional[str] = None
     description: Optional[str] = None
     price: Optional[Decimal] = None
@@ -42,3 +47,16 @@ class ProductResponse(ProductBase):
     class Config:
         from_attributes = True
 
+class ProductStockShardsUpdate(BaseModel):
+    shards: int = Field(ge=0, le=settings.STOCK_SHARDS_MAX)  # 0 keeps stock on the product row
+
+
+class ProductImportError(BaseModel):
+    row: int  # 1-based data row (CSV header excluded)
+    errors: List[str]
+
+class ProductImportResult(BaseModel):
+    processed: int
+    upserted: int
+    failed: int
+    errors: List[ProductImportError] = []  # First IMPORT_MAX_REPORTED_ERRORS failures
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from datetime import date
+from decimal import Decimal
+from app.models.order import OrderStatus
+
+class SalesDailyResponse(BaseModel):
+    Day: date
+    Status: OrderStatus
+    OrderCount: int
+    Revenue: Decimal
+
+    class Config:
+        from_attributes = True
+
+class TopProductResponse(BaseModel):
+    ProductID: int
+    Quantity: int
+    Revenue: Decimal
+
+    class Config:
+        from_attributes = True
@@ -1,19 +1,21 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import AliasChoices, BaseModel, EmailStr, Field
 from typing import Optional
 from datetime import datetime
 
+# Fields also accept the model's PascalCase attribute names so responses
+# can be validated straight from ORM objects
 class SupplierBase(BaseModel):
-    company_name: str
-    address: Optional[str] = None
-    phone: Optional[str] = None
-    email: Optional[EmailStr] = None
+    company_name: str = Field(validation_alias=AliasChoices("company_name", "CompanyName"))
+    address: Optional[str] = Field(default=None, validation_alias=AliasChoices("address", "Address"))
+    phone: Optional[str] = Field(default=None, validation_alias=AliasChoices("phone", "Phone"))
+    email: Optional[EmailStr] = Field(default=None, validation_alias=AliasChoices("email", "Email"))
 
 class SupplierCreate(SupplierBase):
     pass
 
 class SupplierResponse(SupplierBase):
     SupplierID: int
-    verification_status: bool
+    verification_status: bool = Field(validation_alias=AliasChoices("verification_status", "VerificationStatus"))
     CreatedAt: datetime
 
     class Config:
@@ -1,12 +1,14 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import AliasChoices, BaseModel, EmailStr, Field
 from typing import Optional
 from datetime import datetime
 from app.models.user import UserRole
 
+# Fields also accept the model's PascalCase attribute names so responses
+# can be validated straight from ORM objects
 class UserBase(BaseModel):
-    name: str
-    email: EmailStr
-    phone: Optional[str] = None
+    name: str = Field(validation_alias=AliasChoices("name", "Name"))
+    email: EmailStr = Field(validation_alias=AliasChoices("email", "Email"))
+    phone: Optional[str] = Field(default=None, validation_alias=AliasChoices("phone", "Phone"))
 
 class UserCreate(UserBase):
     password: str
@@ -16,6 +18,11 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+class CurrentUser(BaseModel):
+    user_id: int
+    email: str
+    role: Optional[UserRole] = None
+
 class UserResponse(UserBase):
     UserID: int
     Role: UserRole
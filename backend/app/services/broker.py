@@ -0,0 +1,207 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Dict, Optional, Set
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class Subscription:
+    """A subscriber's bounded queue of pending payloads.
+
+    If the subscriber falls `queue_size` payloads behind, the queue is
+    cleared and a single None is queued so the consumer can drop the
+    connection and let the client resync, instead of buffering without
+    bound for one slow socket.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def deliver(self, payload: str):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            self.overflow()
+
+    def overflow(self):
+        """Drop pending payloads and tell the consumer to resync"""
+        if self.overflowed:
+            return
+        self.overflowed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+class InProcessBroker:
+    """Fans payloads out to subscribers of a channel within this process"""
+
+    shared = False  # Whether publishes reach the other worker processes
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._channels: Dict[str, Set[Subscription]] = defaultdict(set)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def subscribe(self, channel: str) -> Subscription:
+        subscription = Subscription(self.queue_size)
+        self._channels[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, channel: str, subscription: Subscription):
+        subscribers = self._channels.get(channel)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._channels[channel]
+
+    async def publish(self, channel: str, payload: str):
+        self._fanout(channel, payload)
+
+    def _fanout(self, channel: str, payload: str):
+        for subscription in list(self._channels.get(channel, ())):
+            subscription.deliver(payload)
+
+class PostgresBroker(InProcessBroker):
+    """Relays payloads through Postgres LISTEN/NOTIFY so every worker
+    process delivers them to its own subscribers.
+
+    If the listening connection drops it is reopened with exponential
+    backoff. Notifications sent in the meantime are lost, so every
+    subscriber is then told to resync, as if its queue had overflowed; if
+    this worker could not publish meanwhile, every other worker is told to
+    resync too.
+    """
+
+    shared = True
+    NOTIFY_CHANNEL = "scp_broker"
+    MAX_PAYLOAD = 7900  # NOTIFY payloads are limited to 8000 bytes
+    RECONNECT_MIN_SECONDS = 0.5
+    RECONNECT_MAX_SECONDS = 30
+    HEALTH_CHECK_SECONDS = 10  # Catches connections that died without the socket closing
+
+    def __init__(self, dsn: str, queue_size: int):
+        super().__init__(queue_size)
+        self.dsn = dsn
+        self._connection = None
+        self._lock = asyncio.Lock()  # asyncpg connections run one query at a time
+        self._lost = asyncio.Event()
+        self._supervisor: Optional[asyncio.Task] = None
+        self._missed = False  # Publishes only delivered locally since the connection was lost
+
+    async def start(self):
+        await self._connect()
+        self._supervisor = asyncio.create_task(self._supervise())
+
+    async def stop(self):
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            await asyncio.gather(self._supervisor, return_exceptions=True)
+            self._supervisor = None
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    async def _connect(self):
+        import asyncpg
+
+        connection = await asyncpg.connect(self.dsn)
+        connection.add_termination_listener(lambda _: self._lost.set())
+        await connection.add_listener(self.NOTIFY_CHANNEL, self._on_notify)
+        self._lost.clear()
+        self._connection = connection
+
+    async def _supervise(self):
+        """Check the connection until it is lost, then reconnect and resync subscribers"""
+        while True:
+            try:
+                await asyncio.wait_for(self._lost.wait(), self.HEALTH_CHECK_SECONDS)
+            except asyncio.TimeoutError:
+                try:
+                    async with self._lock:
+                        await self._connection.execute("SELECT 1", timeout=self.HEALTH_CHECK_SECONDS)
+                    continue
+                except Exception:
+                    logger.warning("Broker connection failed its health check")
+
+            connection, self._connection = self._connection, None
+            if connection is not None:
+                connection.terminate()
+            delay = self.RECONNECT_MIN_SECONDS
+            while True:
+                try:
+                    await self._connect()
+                    break
+                except Exception:
+                    logger.exception("Broker reconnect failed, retrying in %.1fs", delay)
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.RECONNECT_MAX_SECONDS)
+            logger.info("Broker reconnected; subscribers resync")
+            if not self._missed:
+                self._resync()
+                continue
+            # The notification reaches this worker's listener as well
+            try:
+                async with self._lock:
+                    await self._connection.execute(
+                        "SELECT pg_notify($1, $2)", self.NOTIFY_CHANNEL, json.dumps({"resync": True})
+                    )
+                self._missed = False
+            except Exception:
+                logger.warning("Could not ask other workers to resync")
+                self._resync()
+                self._lost.set()
+
+    def _resync(self):
+        for subscriptions in list(self._channels.values()):
+            for subscription in list(subscriptions):
+                subscription.overflow()
+
+    async def publish(self, channel: str, payload: str):
+        message = json.dumps({"channel": channel, "payload": payload})
+        if len(message.encode()) > self.MAX_PAYLOAD:
+            logger.warning("Payload for %s too large for NOTIFY, delivering locally only", channel)
+            self._fanout(channel, payload)
+            return
+        async with self._lock:
+            try:
+                if self._connection is None:
+                    raise ConnectionError("not connected")
+                await self._connection.execute("SELECT pg_notify($1, $2)", self.NOTIFY_CHANNEL, message)
+                return
+            except Exception:
+                if self._connection is not None and not self._connection.is_closed():
+                    raise
+        # Other workers miss this one; they are told to resync on reconnect
+        logger.warning("Broker disconnected, delivering %s locally only", channel)
+        self._missed = True
+        self._lost.set()
+        self._fanout(channel, payload)
+
+    def _on_notify(self, connection, pid, notify_channel, message):
+        data = json.loads(message)
+        if data.get("resync"):
+            self._resync()
+            return
+        self._fanout(data["channel"], data["payload"])
+
+def create_broker(backend: Optional[str] = None) -> InProcessBroker:
+    """Build the broker selected by settings.BROKER_BACKEND"""
+    backend = backend or settings.BROKER_BACKEND
+    if backend == "postgres":
+        scheme, _, rest = settings.DATABASE_URL.partition("://")
+        return PostgresBroker(f"postgresql://{rest}", settings.BROKER_QUEUE_SIZE)
+    if backend == "memory":
+        return InProcessBroker(settings.BROKER_QUEUE_SIZE)
+    raise ValueError(f"Unknown broker backend: {backend}")
+
+broker = create_broker()
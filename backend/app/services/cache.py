@@ -0,0 +1,242 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from app.core.config import settings
+from app.core.metrics import CACHE_EVICTIONS, CACHE_LOOKUPS
+from app.services.broker import Subscription, broker
+
+logger = logging.getLogger(__name__)
+
+# Broker channel carrying invalidations to every worker
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+class MemoryBackend:
+    """In-process LRU cache with per-entry TTL"""
+
+    shared = False  # Each worker holds its own entries
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        # Kept outside the LRU so a generation is never evicted and reused
+        self._counters: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            CACHE_EVICTIONS.inc()
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: int):
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            CACHE_EVICTIONS.inc()
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    async def clear(self):
+        self._entries.clear()
+
+    async def close(self):
+        pass
+
+class RedisBackend:
+    """Cache stored in Redis, or anything speaking the Redis protocol"""
+
+    shared = True
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: str, ttl: int):
+        await self._client.set(key, value, ex=ttl)
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self._client.delete(*keys)
+
+    async def counter(self, key: str) -> int:
+        return int(await self._client.get(key) or 0)
+
+    async def incr(self, key: str) -> int:
+        return await self._client.incr(key)
+
+    async def clear(self):
+        pass  # Other workers' invalidations were applied to the server itself
+
+    async def close(self):
+        await self._client.aclose()
+
+class EntityCache:
+    """Read-through cache of JSON-serializable values.
+
+    Concurrent misses on the same key share a single load (single-flight):
+    the first caller runs the loader and the rest await its result; if that
+    caller is cancelled, the others load for themselves. Loaders returning
+    None are not cached, nor are loads of a key invalidated while they ran,
+    since they may have read the old row. Groups of keys that are hard to
+    enumerate (e.g. every page of a list) embed a generation number from
+    `generation()`; `bump()` invalidates the whole group at once.
+
+    With a shared broker, invalidations are also published so every worker
+    applies them: to its own entries with the memory backend, and to its
+    loads in flight with either.
+    """
+
+    def __init__(self, backend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._origin = uuid.uuid4().hex  # Tells this worker's own broadcasts apart
+        self._subscription: Optional[Subscription] = None
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        raw = await self.backend.get(key)
+        if raw is not None:
+            CACHE_LOOKUPS.labels("hit").inc()
+            return json.loads(raw)
+        CACHE_LOOKUPS.labels("miss").inc()
+
+        while (inflight := self._inflight.get(key)) is not None:
+            # Waiting (not awaiting) leaves the load running if this caller
+            # is cancelled, and lets it retry if the loading caller was
+            await asyncio.wait([inflight])
+            if not inflight.cancelled():
+                return inflight.result()
+            raw = await self.backend.get(key)
+            if raw is not None:
+                return json.loads(raw)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+            # Dropped from _inflight by an invalidation while loading
+            if value is not None and self._inflight.get(key) is future:
+                await self.backend.set(key, json.dumps(value), self.ttl)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Followers re-raise it; don't warn when there are none
+            future.exception()
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def invalidate(self, *keys: str):
+        if not keys:
+            return
+        self._forget(keys)
+        await self.backend.delete(*keys)
+        await self._broadcast({"keys": keys})
+
+    async def generation(self, group: str) -> int:
+        return await self.backend.counter(f"{group}:generation")
+
+    async def bump(self, group: str):
+        await self.backend.incr(f"{group}:generation")
+        if not self.backend.shared:
+            await self._broadcast({"group": group})
+
+    def _forget(self, keys):
+        # Loads in flight keep running for their callers, but are no longer
+        # joined or cached
+        for key in keys:
+            self._inflight.pop(key, None)
+
+    async def _broadcast(self, change: dict):
+        if broker.shared:
+            await broker.publish(INVALIDATION_CHANNEL, json.dumps({**change, "origin": self._origin}))
+
+    async def start(self):
+        """Subscribe to other workers' invalidations"""
+        if broker.shared:
+            self._subscription = broker.subscribe(INVALIDATION_CHANNEL)
+
+    async def run(self):
+        """Apply other workers' invalidations until cancelled"""
+        if self._subscription is None:
+            return
+        try:
+            while True:
+                payload = await self._subscription.queue.get()
+                try:
+                    if payload is None:
+                        # Invalidations were missed; start over
+                        broker.unsubscribe(INVALIDATION_CHANNEL, self._subscription)
+                        self._subscription = broker.subscribe(INVALIDATION_CHANNEL)
+                        self._inflight.clear()
+                        await self.backend.clear()
+                        continue
+                    change = json.loads(payload)
+                    if change["origin"] == self._origin:
+                        continue
+                    if "group" in change:
+                        await self.backend.incr(f"{change['group']}:generation")
+                    else:
+                        self._forget(change["keys"])
+                        if not self.backend.shared:
+                            await self.backend.delete(*change["keys"])
+                except Exception:
+                    logger.exception("Applying a cache invalidation failed")
+        finally:
+            broker.unsubscribe(INVALIDATION_CHANNEL, self._subscription)
+
+def product_key(product_id: int) -> str:
+    return f"product:{product_id}"
+
+def supplier_key(supplier_id: int) -> str:
+    return f"supplier:{supplier_id}"
+
+def consumer_key(consumer_id: int) -> str:
+    return f"consumer:{consumer_id}"
+
+def file_key(digest: str) -> str:
+    return f"file:{digest}"
+
+def supplier_products_group(supplier_id: int) -> str:
+    """Group covering every cached page of a supplier's product list"""
+    return f"products:supplier:{supplier_id}"
+
+def create_cache() -> EntityCache:
+    """Build the cache selected by settings.CACHE_BACKEND"""
+    if settings.CACHE_BACKEND == "redis":
+        backend = RedisBackend(settings.CACHE_URL)
+    elif settings.CACHE_BACKEND == "memory":
+        backend = MemoryBackend(settings.CACHE_MAX_ENTRIES)
+    else:
+        raise ValueError(f"Unknown cache backend: {settings.CACHE_BACKEND}")
+    return EntityCache(backend, settings.CACHE_TTL_SECONDS)
+
+cache = create_cache()
@@ -0,0 +1,122 @@
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.file import StoredFile
+from app.utils.sql import dialect_insert
+
+DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+WRITE_BUFFER_SIZE = 1024 * 1024  # Bytes gathered before each write+hash in a worker thread
+# Stored types served inline; the type is whatever the uploader claimed, so
+# anything else (text/html, image/svg+xml, ...) is sent as an opaque download
+INLINE_MEDIA_TYPES = frozenset({"image/jpeg", "image/png", "image/gif", "image/webp"})
+
+class FileTooLarge(Exception):
+    pass
+
+@dataclass
+class StoredUpload:
+    digest: str
+    size: int
+    content_type: str
+
+def root() -> Path:
+    return Path(settings.UPLOAD_DIR)
+
+def is_inline(content_type: str) -> bool:
+    """Whether a stored content type is safe to serve inline"""
+    return content_type.split(";", 1)[0].strip().lower() in INLINE_MEDIA_TYPES
+
+def file_path(digest: str) -> Path:
+    """On-disk location of a file: UPLOAD_DIR/sha256/ab/cd/abcd..."""
+    return root() / "sha256" / digest[:2] / digest[2:4] / digest
+
+async def store_stream(
+    db: AsyncSession,
+    chunks: AsyncIterator[bytes],
+    content_type: str,
+    max_size: int
+) -> StoredUpload:
+    """Write a stream to disk while hashing it, then file it under its digest.
+
+    Raises FileTooLarge as soon as more than `max_size` bytes arrive; the
+    partial file is removed. Content already stored is not written twice.
+    The caller commits.
+    """
+    tmp_dir = root() / "tmp"
+    await asyncio.to_thread(tmp_dir.mkdir, parents=True, exist_ok=True)
+    handle = await asyncio.to_thread(tempfile.NamedTemporaryFile, dir=tmp_dir, delete=False)
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        buffer = bytearray()
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_size:
+                raise FileTooLarge()
+            buffer += chunk
+            if len(buffer) >= WRITE_BUFFER_SIZE:
+                await asyncio.to_thread(_write, handle, hasher, bytes(buffer))
+                buffer.clear()
+        await asyncio.to_thread(_write, handle, hasher, bytes(buffer))
+        await asyncio.to_thread(handle.close)
+
+        digest = hasher.hexdigest()
+        await asyncio.to_thread(_publish, Path(handle.name), file_path(digest))
+    except BaseException:
+        await asyncio.to_thread(_discard, handle)
+        raise
+
+    insert_stmt = dialect_insert(db, StoredFile)
+    await db.execute(insert_stmt.on_conflict_do_nothing(index_elements=[StoredFile.Digest]), [{
+        "Digest": digest,
+        "Size": size,
+        "ContentType": content_type
+    }])
+    return StoredUpload(digest, size, content_type)
+
+def _write(handle, hasher, data: bytes):
+    handle.write(data)
+    hasher.update(data)
+
+def _publish(tmp_path: Path, final_path: Path):
+    if final_path.exists():
+        tmp_path.unlink()  # Same content already stored
+        return
+    final_path.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(tmp_path, final_path)
+
+def _discard(handle):
+    handle.close()
+    try:
+        os.unlink(handle.name)
+    except FileNotFoundError:
+        pass
+
+def parse_range(header: Optional[str], size: int) -> Optional[tuple]:
+    """(start, end) inclusive for a single "bytes=" range, or None to send the whole file.
+
+    Raises ValueError when the range cannot be satisfied. Multi-range
+    requests are answered with the whole file, which RFC 9110 allows.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start, _, end = header[len("bytes="):].strip().partition("-")
+    try:
+        if start:
+            start, end = int(start), int(end) if end else size - 1
+        elif end:
+            start, end = max(size - int(end), 0), size - 1  # Suffix: the last N bytes
+        else:
+            return None
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, size - 1)
@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import math
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+from app.core.config import settings
+from app.services import file_storage
+
+logger = logging.getLogger(__name__)
+
+# Longest edge in pixels for each variant served by ?size=
+VARIANT_SIZES = {"thumb": 160, "small": 480, "medium": 1024}
+VARIANT_MEDIA_TYPE = "image/webp"
+
+class ImageProcessingError(Exception):
+    pass
+
+def render_variant(source_path: str, target_path: str, max_edge: int, quality: int) -> int:
+    """Downscale an image to WebP; runs in a worker process. Returns the file size."""
+    from PIL import Image, ImageOps
+
+    tmp_path = f"{target_path}.{os.getpid()}.tmp"
+    try:
+        with Image.open(source_path) as image:
+            # JPEG can decode straight at a reduced scale, which is most of the
+            # saving. The scale must keep both sides at least as large as
+            # asked, so ask for the fitted size: a square box would make a
+            # 3:2 photo decode at full size for the medium variant.
+            scale = max_edge / max(image.size)
+            image.draft("RGB", (math.ceil(image.width * scale), math.ceil(image.height * scale)))
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+            image.save(tmp_path, "WEBP", quality=quality, method=4)
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        # Re-raised as a plain exception so the caller need not import PIL
+        raise ImageProcessingError(str(exc)) from None
+    os.replace(tmp_path, target_path)
+    return os.path.getsize(target_path)
+
+def variant_path(digest: str, size: str) -> Path:
+    return file_storage.root() / "variants" / digest[:2] / digest / f"{size}.webp"
+
+class VariantStore:
+    """Derived images kept on disk under an LRU size cap.
+
+    Variants are rendered on a process pool the first time they are asked
+    for; concurrent requests for the same variant share one render. The LRU
+    order is kept in memory and seeded from file mtimes at first use, so
+    with several app processes each one trims by its own view of usage.
+    """
+
+    def __init__(self, workers: int, max_bytes: int, quality: int):
+        self.workers = workers
+        self.max_bytes = max_bytes
+        self.quality = quality
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._entries: "OrderedDict[Path, int]" = OrderedDict()
+        self._total = 0
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._inflight: Dict[Path, asyncio.Task] = {}
+
+    async def get(self, digest: str, size: str) -> Path:
+        """Path of a variant, rendering it if needed"""
+        if not self._loaded:
+            async with self._load_lock:
+                if not self._loaded:
+                    await self._load()
+        path = variant_path(digest, size)
+        if path in self._entries:
+            if await asyncio.to_thread(path.exists):
+                self._entries.move_to_end(path)
+                return path
+            self._total -= self._entries.pop(path)  # Removed by another process
+
+        task = self._inflight.get(path)
+        if task is None:
+            task = asyncio.create_task(self._render(digest, size, path))
+            self._inflight[path] = task
+            task.add_done_callback(lambda _: self._inflight.pop(path, None))
+        return await asyncio.shield(task)
+
+    async def pregenerate(self, digest: str):
+        """Render every variant of a newly uploaded image ahead of the first request"""
+        for size in VARIANT_SIZES:
+            try:
+                await self.get(digest, size)
+            except ImageProcessingError as exc:
+                logger.info("Not generating variants for %s: %s", digest, exc)
+                return
+
+    async def _render(self, digest: str, size: str, path: Path) -> Path:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        await asyncio.to_thread(path.parent.mkdir, parents=True, exist_ok=True)
+        loop = asyncio.get_running_loop()
+        written = await loop.run_in_executor(
+            self._executor,
+            render_variant,
+            str(file_storage.file_path(digest)),
+            str(path),
+            VARIANT_SIZES[size],
+            self.quality
+        )
+        self._entries[path] = written
+        self._total += written
+        await self._evict()
+        return path
+
+    async def _evict(self):
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            path, written = self._entries.popitem(last=False)
+            self._total -= written
+            await asyncio.to_thread(path.unlink, missing_ok=True)
+
+    async def _load(self):
+        def scan():
+            found = []
+            for path in (file_storage.root() / "variants").glob("*/*/*.webp"):
+                stat = path.stat()
+                found.append((stat.st_mtime, path, stat.st_size))
+            return sorted(found)
+
+        for _, path, written in await asyncio.to_thread(scan):
+            self._entries[path] = written
+            self._total += written
+        self._loaded = True
+        await self._evict()
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+variant_store = VariantStore(settings.IMAGE_WORKERS, settings.IMAGE_VARIANT_CACHE_BYTES, settings.IMAGE_VARIANT_QUALITY)
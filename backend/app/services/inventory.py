@@ -0,0 +1,345 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import bindparam, case, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.base import AsyncSessionLocal
+from app.models.inventory import ProductStockShard, ReservationStatus, StockReservation
+from app.models.order import Order, OrderStatus
+from app.models.product import Product
+from app.services.cache import cache, product_key, supplier_products_group
+
+logger = logging.getLogger(__name__)
+
+# (shard or None for the products row, quantity) parts stock was taken from
+Parts = List[Tuple[Optional[int], int]]
+
+_shards = ProductStockShard.__table__
+# Executed once per (product, shard) with a signed quantity
+ADJUST_SHARD = _shards.update().where(
+    _shards.c.ProductID == bindparam("product_id"), _shards.c.Shard == bindparam("shard")
+).values(Stock=_shards.c.Stock + bindparam("quantity"))
+
+class InsufficientStock(Exception):
+    def __init__(self, product):
+        super().__init__(f"Insufficient stock for product {product.Name}")
+        self.product = product
+
+async def load_products(db: AsyncSession, product_ids: List[int]) -> dict:
+    """Products by ID with the stock left to order.
+
+    Plain products are locked, in ProductID order so concurrent orders
+    cannot deadlock. Sharded products are read without locking the hot
+    products row; their stock is the sum of the shards.
+    """
+    columns = (Product.ProductID, Product.SupplierID, Product.Name, Product.Price, Product.StockShards)
+    result = await db.execute(
+        select(*columns, Product.Stock)
+        .where(Product.ProductID.in_(product_ids), Product.StockShards == 0)
+        .order_by(Product.ProductID)
+        .with_for_update()
+    )
+    products = {row.ProductID: row for row in result}
+    missing = [product_id for product_id in product_ids if product_id not in products]
+    if missing:
+        shard_stock = (
+            select(func.coalesce(func.sum(ProductStockShard.Stock), 0))
+            .where(ProductStockShard.ProductID == Product.ProductID)
+            .scalar_subquery()
+        )
+        result = await db.execute(select(*columns, shard_stock.label("Stock")).where(Product.ProductID.in_(missing)))
+        products.update((row.ProductID, row) for row in result)
+    return products
+
+async def take(db: AsyncSession, products: dict, requested: Dict[int, int]) -> Dict[int, Parts]:
+    """Decrement stock for each product; returns where each quantity came from.
+
+    Plain products are decremented by one conditional UPDATE. Raises
+    InsufficientStock, after which the caller must roll back.
+    """
+    plain = {product_id: quantity for product_id, quantity in requested.items() if not products[product_id].StockShards}
+    takes = {}
+    if plain:
+        result = await db.execute(
+            update(Product)
+            .where(Product.ProductID.in_(list(plain)), Product.Stock >= case(plain, value=Product.ProductID))
+            .values(Stock=Product.Stock - case(plain, value=Product.ProductID))
+            .returning(Product.ProductID)
+            .execution_options(synchronize_session=False)
+        )
+        decremented = set(result.scalars())
+        for product_id in sorted(plain):
+            if product_id not in decremented:
+                raise InsufficientStock(products[product_id])
+            takes[product_id] = [(None, plain[product_id])]
+    for product_id in sorted(set(requested) - set(plain)):
+        parts = await _take_from_shards(db, product_id, requested[product_id])
+        if parts is None:
+            raise InsufficientStock(products[product_id])
+        takes[product_id] = parts
+    return takes
+
+async def _take_from_shards(db: AsyncSession, product_id: int, quantity: int) -> Optional[Parts]:
+    """Take from one random shard with enough stock that no other order has locked.
+
+    Only when none qualifies does it wait for every shard and spread the
+    quantity over them, largest first.
+    """
+    candidate = (
+        select(ProductStockShard.Shard)
+        .where(ProductStockShard.ProductID == product_id, ProductStockShard.Stock >= quantity)
+        .order_by(func.random())
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    shard = await db.scalar(
+        update(ProductStockShard)
+        .where(
+            ProductStockShard.ProductID == product_id,
+            ProductStockShard.Shard == candidate,
+            ProductStockShard.Stock >= quantity
+        )
+        .values(Stock=ProductStockShard.Stock - quantity)
+        .returning(ProductStockShard.Shard)
+        .execution_options(synchronize_session=False)
+    )
+    if shard is not None:
+        return [(shard, quantity)]
+
+    result = await db.execute(
+        select(ProductStockShard.Shard, ProductStockShard.Stock)
+        .where(ProductStockShard.ProductID == product_id)
+        .order_by(ProductStockShard.Shard)
+        .with_for_update()
+    )
+    shards = sorted(result.all(), key=lambda row: -row.Stock)
+    if sum(row.Stock for row in shards) < quantity:
+        return None
+    parts = []
+    for row in shards:
+        used = min(row.Stock, quantity)
+        if used > 0:
+            parts.append((row.Shard, used))
+            quantity -= used
+    await db.execute(ADJUST_SHARD, [
+        {"product_id": product_id, "shard": shard, "quantity": -used} for shard, used in sorted(parts)
+    ])
+    return parts
+
+def _split(lines: List[Tuple[int, Dict[int, int]]], takes: Dict[int, Parts]) -> Iterator[tuple]:
+    """(order id, product id, shard, quantity) for each order's share of the taken parts"""
+    pools = {product_id: list(parts) for product_id, parts in takes.items()}
+    for order_id, quantities in lines:
+        for product_id, quantity in quantities.items():
+            pool = pools[product_id]
+            while quantity:
+                shard, available = pool[0]
+                used = min(available, quantity)
+                yield order_id, product_id, shard, used
+                quantity -= used
+                if used == available:
+                    pool.pop(0)
+                else:
+                    pool[0] = (shard, available - used)
+
+async def hold(db: AsyncSession, lines: List[Tuple[int, Dict[int, int]]], takes: Dict[int, Parts]):
+    """Record stock from take() as held by orders; `lines` is (order id, quantities by product) in take order"""
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=settings.RESERVATION_TTL_SECONDS)
+    await _record(db, lines, takes, ReservationStatus.HELD, expires_at)
+
+async def _record(db: AsyncSession, lines, takes: Dict[int, Parts], status: ReservationStatus, expires_at: Optional[datetime]):
+    await db.execute(insert(StockReservation), [
+        {
+            "OrderID": order_id,
+            "ProductID": product_id,
+            "Shard": shard,
+            "Quantity": quantity,
+            "Status": status,
+            "ExpiresAt": expires_at
+        }
+        for order_id, product_id, shard, quantity in _split(lines, takes)
+    ])
+
+async def apply_status(db: AsyncSession, order: Order) -> Dict[int, int]:
+    """Commit or release an order's stock for the status change it just made.
+
+    Returns ProductID -> SupplierID of products whose stock moved, for
+    invalidate() after the caller commits. Raises InsufficientStock when an
+    accepted order's hold had expired and the stock has gone since.
+    """
+    if order.Status in (OrderStatus.REJECTED, OrderStatus.CANCELLED):
+        return await _release(db, order.OrderID)
+    if order.PreviousStatus == OrderStatus.PENDING:
+        return await _commit(db, order.OrderID)
+    return {}
+
+async def _commit(db: AsyncSession, order_id: int) -> Dict[int, int]:
+    await db.execute(
+        update(StockReservation)
+        .where(StockReservation.OrderID == order_id, StockReservation.Status == ReservationStatus.HELD)
+        .values(Status=ReservationStatus.COMMITTED, ExpiresAt=None)
+        .execution_options(synchronize_session=False)
+    )
+    # Holds the sweeper expired gave their stock back; take it again
+    result = await db.execute(
+        select(StockReservation.ProductID, func.sum(StockReservation.Quantity))
+        .where(StockReservation.OrderID == order_id, StockReservation.Status == ReservationStatus.EXPIRED)
+        .group_by(StockReservation.ProductID)
+    )
+    requested = dict(result.all())
+    if not requested:
+        return {}
+    products = await load_products(db, sorted(requested))
+    takes = await take(db, products, requested)
+    await _record(db, [(order_id, requested)], takes, ReservationStatus.COMMITTED, None)
+    return {product_id: products[product_id].SupplierID for product_id in requested}
+
+async def _release(db: AsyncSession, order_id: int) -> Dict[int, int]:
+    result = await db.execute(
+        update(StockReservation)
+        .where(
+            StockReservation.OrderID == order_id,
+            StockReservation.Status.in_([ReservationStatus.HELD, ReservationStatus.COMMITTED])
+        )
+        .values(Status=ReservationStatus.RELEASED, ExpiresAt=None)
+        .returning(StockReservation.ProductID, StockReservation.Shard, StockReservation.Quantity)
+        .execution_options(synchronize_session=False)
+    )
+    return await _restock(db, result.all())
+
+async def _restock(db: AsyncSession, returned: list) -> Dict[int, int]:
+    """Add (ProductID, Shard, Quantity) rows back to stock; returns ProductID -> SupplierID.
+
+    Shards are remapped if the product was resharded since the stock was taken.
+    """
+    if not returned:
+        return {}
+    result = await db.execute(
+        select(Product.ProductID, Product.SupplierID, Product.StockShards)
+        .where(Product.ProductID.in_({row.ProductID for row in returned}))
+        .order_by(Product.ProductID)
+        .with_for_update()
+    )
+    products = {row.ProductID: row for row in result}
+    plain = defaultdict(int)
+    sharded = defaultdict(int)
+    for row in returned:
+        shards = products[row.ProductID].StockShards
+        if shards:
+            sharded[(row.ProductID, (row.Shard or 0) % shards)] += row.Quantity
+        else:
+            plain[row.ProductID] += row.Quantity
+    if plain:
+        await db.execute(
+            update(Product)
+            .where(Product.ProductID.in_(list(plain)))
+            .values(Stock=Product.Stock + case(plain, value=Product.ProductID))
+            .execution_options(synchronize_session=False)
+        )
+    if sharded:
+        await db.execute(ADJUST_SHARD, [
+            {"product_id": product_id, "shard": shard, "quantity": quantity}
+            for (product_id, shard), quantity in sorted(sharded.items())
+        ])
+    return {product_id: product.SupplierID for product_id, product in products.items()}
+
+async def invalidate(products: Dict[int, int]):
+    """Drop cached products (ProductID -> SupplierID) whose stock a committed change moved"""
+    if not products:
+        return
+    await cache.invalidate(*[product_key(product_id) for product_id in products])
+    for supplier_id in set(products.values()):
+        await cache.bump(supplier_products_group(supplier_id))
+
+async def reshard(db: AsyncSession, product: Product, shards: int):
+    """Spread a locked product's stock over `shards` rows (0 keeps it on the products row)"""
+    total = product.Stock or 0
+    if product.StockShards:
+        result = await db.execute(
+            select(ProductStockShard.Stock)
+            .where(ProductStockShard.ProductID == product.ProductID)
+            .order_by(ProductStockShard.Shard)
+            .with_for_update()
+        )
+        total = sum(result.scalars())
+        await db.execute(delete(ProductStockShard).where(ProductStockShard.ProductID == product.ProductID))
+    if shards:
+        await db.execute(insert(ProductStockShard), [
+            {"ProductID": product.ProductID, "Shard": shard, "Stock": total // shards + (shard < total % shards)}
+            for shard in range(shards)
+        ])
+    product.Stock = total
+    product.StockShards = shards
+
+async def redistribute(db: AsyncSession, product_ids: List[int]):
+    """Reset the shards of any sharded products among `product_ids` to match a newly written Product.Stock"""
+    share = (
+        select(
+            func.coalesce(Product.Stock, 0) // Product.StockShards
+            + case((ProductStockShard.Shard < func.coalesce(Product.Stock, 0) % Product.StockShards, 1), else_=0)
+        )
+        .where(Product.ProductID == ProductStockShard.ProductID)
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(ProductStockShard)
+        .where(ProductStockShard.ProductID.in_(product_ids))
+        .values(Stock=share)
+        .execution_options(synchronize_session=False)
+    )
+
+async def expire_holds(db: AsyncSession, limit: int) -> int:
+    """Give back the stock of up to `limit` holds past their expiry; commits"""
+    due = (
+        select(StockReservation.ReservationID)
+        .where(StockReservation.Status == ReservationStatus.HELD, StockReservation.ExpiresAt <= datetime.now(timezone.utc))
+        .order_by(StockReservation.ExpiresAt)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        update(StockReservation)
+        .where(StockReservation.ReservationID.in_(due), StockReservation.Status == ReservationStatus.HELD)
+        .values(Status=ReservationStatus.EXPIRED)
+        .returning(StockReservation.ProductID, StockReservation.Shard, StockReservation.Quantity)
+        .execution_options(synchronize_session=False)
+    )
+    expired = result.all()
+    restocked = await _restock(db, expired)
+    await db.commit()
+    await invalidate(restocked)
+    return len(expired)
+
+async def refresh_sharded_stock(db: AsyncSession):
+    """Fold shard totals into Product.Stock, which catalog reads show; commits"""
+    shard_stock = (
+        select(func.coalesce(func.sum(ProductStockShard.Stock), 0))
+        .where(ProductStockShard.ProductID == Product.ProductID)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        update(Product)
+        .where(Product.StockShards > 0, Product.Stock.is_distinct_from(shard_stock))
+        .values(Stock=shard_stock)
+        .returning(Product.ProductID, Product.SupplierID)
+        .execution_options(synchronize_session=False)
+    )
+    changed = dict(result.all())
+    await db.commit()
+    await invalidate(changed)
+
+async def run_sweeper(interval: float, batch_size: int):
+    """Expire stale holds and refresh sharded stock until cancelled"""
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                while await expire_holds(db, batch_size) == batch_size:
+                    pass
+                await refresh_sharded_stock(db)
+        except Exception:
+            logger.exception("Stock reservation sweep failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set, Tuple
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.base import AsyncSessionLocal
+from app.models.link import Link, LinkStatus
+from app.services.broker import Subscription, broker
+
+logger = logging.getLogger(__name__)
+
+# Broker channel carrying link status changes to every worker
+LINK_CHANNEL = "links:status"
+
+Pair = Tuple[int, int]  # (SupplierID, ConsumerID)
+
+class ApprovedLinkIndex:
+    """In-process index of approved supplier-consumer links.
+
+    Loaded once, then kept current by link writes: the writing worker
+    applies its change immediately and publishes it on the broker for the
+    others. A full reload every `refresh_interval` seconds, or when this
+    worker falls behind the broker, repairs anything missed. The in-process
+    broker reaches every worker only because there is just the one.
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._links: Dict[int, Pair] = {}  # Approved LinkID -> pair
+        self._pairs: Set[Pair] = set()
+        self._suppliers: Dict[int, Set[int]] = defaultdict(set)  # ConsumerID -> approved SupplierIDs
+        self._pending: Optional[list] = None  # Changes arriving during a reload
+        self._subscription: Optional[Subscription] = None
+        self._loading: Optional[asyncio.Future] = None  # The reload in flight, shared by concurrent callers
+        self._revocations = 0  # Counts revocations, so a database read that raced one is not indexed
+        self.loaded = False
+
+    async def start(self):
+        """Subscribe to changes, then load, so none are missed in between"""
+        self._subscription = broker.subscribe(LINK_CHANNEL)
+        await self.load()
+
+    async def load(self):
+        """Reload from the database; concurrent callers wait on the same reload"""
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(self._load())
+            self._loading.add_done_callback(lambda _: setattr(self, "_loading", None))
+        await asyncio.shield(self._loading)
+
+    async def _load(self):
+        self._pending = []
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(Link.LinkID, Link.SupplierID, Link.ConsumerID).where(Link.Status == LinkStatus.APPROVED)
+                )
+                rows = result.all()
+        finally:
+            changes, self._pending = self._pending, None
+        self._links, self._pairs, self._suppliers = {}, set(), defaultdict(set)
+        for link_id, supplier_id, consumer_id in rows:
+            self._add(link_id, (supplier_id, consumer_id))
+        for change in changes:
+            self._apply(*change)
+        self._revocations += 1  # The reload may have dropped links too
+        self.loaded = True
+
+    async def approved_pairs(self, db: AsyncSession, pairs: Iterable[Pair]) -> Set[Pair]:
+        """Those of `pairs` with an approved link.
+
+        Pairs missing from the index are confirmed against the database, in
+        case another worker approved them moments ago; pairs that have an
+        approved link never need a query.
+        """
+        if not self.loaded:
+            await self.load()
+        pairs = set(pairs)
+        approved = pairs & self._pairs
+        missing = pairs - approved
+        if missing:
+            revocations = self._revocations
+            result = await db.execute(
+                select(Link.LinkID, Link.SupplierID, Link.ConsumerID).where(
+                    tuple_(Link.SupplierID, Link.ConsumerID).in_(list(missing)),
+                    Link.Status == LinkStatus.APPROVED
+                )
+            )
+            for link_id, supplier_id, consumer_id in result:
+                if self._revocations == revocations:
+                    self._add(link_id, (supplier_id, consumer_id))
+                approved.add((supplier_id, consumer_id))
+        return approved
+
+    async def approved_link(self, db: AsyncSession, link_id: int) -> bool:
+        """Whether the link is approved, confirming misses against the database"""
+        if not self.loaded:
+            await self.load()
+        if link_id in self._links:
+            return True
+        revocations = self._revocations
+        link = await db.get(Link, link_id)
+        if link is None or link.Status != LinkStatus.APPROVED:
+            return False
+        if self._revocations == revocations:
+            self._add(link_id, (link.SupplierID, link.ConsumerID))
+        return True
+
+    async def suppliers_of(self, consumer_id: int) -> Set[int]:
+        """SupplierIDs the consumer has an approved link with"""
+        if not self.loaded:
+            await self.load()
+        return set(self._suppliers.get(consumer_id, ()))
+
+    async def publish(self, link: Link):
+        """Apply a committed link change here and announce it to the other workers"""
+        change = (link.LinkID, link.SupplierID, link.ConsumerID, link.Status == LinkStatus.APPROVED)
+        self._apply(*change)
+        await broker.publish(LINK_CHANNEL, json.dumps(change))
+
+    def _apply(self, link_id: int, supplier_id: int, consumer_id: int, approved: bool):
+        if self._pending is not None:
+            self._pending.append((link_id, supplier_id, consumer_id, approved))
+        if approved:
+            self._add(link_id, (supplier_id, consumer_id))
+            return
+        self._revocations += 1
+        pair = self._links.pop(link_id, None) or (supplier_id, consumer_id)
+        self._pairs.discard(pair)
+        suppliers = self._suppliers.get(pair[1])
+        if suppliers is not None:
+            suppliers.discard(pair[0])
+            if not suppliers:
+                del self._suppliers[pair[1]]
+
+    def _add(self, link_id: int, pair: Pair):
+        self._links[link_id] = pair
+        self._pairs.add(pair)
+        self._suppliers[pair[1]].add(pair[0])
+
+    async def run(self):
+        """Apply other workers' changes and reload periodically until cancelled"""
+        loop = asyncio.get_running_loop()
+        next_reload = loop.time() + self.refresh_interval
+        try:
+            while True:
+                try:
+                    payload = await asyncio.wait_for(self._subscription.queue.get(), max(0, next_reload - loop.time()))
+                except asyncio.TimeoutError:
+                    payload = None
+                if payload is not None:
+                    self._apply(*json.loads(payload))
+                    continue
+                # Reload on schedule, or after overflowing the subscription's queue
+                if self._subscription.overflowed:
+                    broker.unsubscribe(LINK_CHANNEL, self._subscription)
+                    self._subscription = broker.subscribe(LINK_CHANNEL)
+                try:
+                    await self.load()
+                except Exception:
+                    logger.exception("Approved link index reload failed")
+                next_reload = loop.time() + self.refresh_interval
+        finally:
+            broker.unsubscribe(LINK_CHANNEL, self._subscription)
+
+link_index = ApprovedLinkIndex(settings.LINK_INDEX_REFRESH_SECONDS)
@@ -0,0 +1,320 @@
+import asyncio
+import logging
+import smtplib
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from typing import Awaitable, Callable, Dict, List, Optional
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.base import AsyncSessionLocal
+from app.models.complaint import Complaint
+from app.models.consumer import Consumer
+from app.models.consumer_staff import ConsumerStaff
+from app.models.link import Link
+from app.models.order import Order, OrderStatus
+from app.models.outbox import OutboxMessage, OutboxStatus
+from app.models.supplier import Supplier
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+def enqueue(db: AsyncSession, topic: str, **payload):
+    """Record a notification; it is sent only if the caller's transaction commits"""
+    db.add(OutboxMessage(Topic=topic, Payload=payload, Status=OutboxStatus.PENDING, Attempts=0))
+
+# Topic -> coroutine building the emails for a payload. Rendering happens in
+# the worker, so request handlers only pay for one INSERT.
+Renderer = Callable[[AsyncSession, dict], Awaitable[List[EmailMessage]]]
+renderers: Dict[str, Renderer] = {}
+
+def renderer(topic: str):
+    def register(func: Renderer) -> Renderer:
+        renderers[topic] = func
+        return func
+    return register
+
+def build_email(to: Optional[str], subject: str, body: str) -> List[EmailMessage]:
+    """Zero or one message; recipients without an address are skipped"""
+    if not to:
+        return []
+    message = EmailMessage()
+    message["From"] = settings.EMAIL_FROM
+    message["To"] = to
+    message["Subject"] = subject
+    message.set_content(body)
+    return [message]
+
+@renderer("order.created")
+async def render_order_created(db: AsyncSession, payload: dict) -> List[EmailMessage]:
+    row = (await db.execute(
+        select(Order.OrderID, Order.TotalAmount, Supplier.Email, Consumer.CompanyName)
+        .join(Supplier, Supplier.SupplierID == Order.SupplierID)
+        .join(Consumer, Consumer.ConsumerID == Order.ConsumerID)
+        .where(Order.OrderID == payload["order_id"])
+    )).first()
+    if row is None:
+        return []
+    return build_email(
+        row.Email,
+        f"New order #{row.OrderID} from {row.CompanyName}",
+        f"{row.CompanyName} placed order #{row.OrderID} totalling {row.TotalAmount}."
+    )
+
+@renderer("order.status_changed")
+async def render_order_status_changed(db: AsyncSession, payload: dict) -> List[EmailMessage]:
+    row = (await db.execute(
+        select(Order.OrderID, Order.RejectionReason, Consumer.Email)
+        .join(Consumer, Consumer.ConsumerID == Order.ConsumerID)
+        .where(Order.OrderID == payload["order_id"])
+    )).first()
+    if row is None:
+        return []
+    body = f"Order #{row.OrderID} is now {payload['status']}."
+    if payload["status"] == OrderStatus.REJECTED.value and row.RejectionReason:
+        body += f"\n\nReason: {row.RejectionReason}"
+    return build_email(row.Email, f"Order #{row.OrderID} {payload['status'].lower()}", body)
+
+@renderer("link.status_changed")
+async def render_link_status_changed(db: AsyncSession, payload: dict) -> List[EmailMessage]:
+    row = (await db.execute(
+        select(Supplier.CompanyName, Consumer.Email)
+        .select_from(Link)
+        .join(Supplier, Supplier.SupplierID == Link.SupplierID)
+        .join(Consumer, Consumer.ConsumerID == Link.ConsumerID)
+        .where(Link.LinkID == payload["link_id"])
+    )).first()
+    if row is None:
+        return []
+    return build_email(
+        row.Email,
+        f"Link with {row.CompanyName} {payload['status'].lower()}",
+        f"Your link with {row.CompanyName} is now {payload['status']}."
+    )
+
+@renderer("complaint.updated")
+async def render_complaint_updated(db: AsyncSession, payload: dict) -> List[EmailMessage]:
+    row = (await db.execute(
+        select(Complaint.ComplaintID, Complaint.Title, User.Email)
+        .join(ConsumerStaff, ConsumerStaff.StaffID == Complaint.ConsumerStaffID)
+        .join(User, User.UserID == ConsumerStaff.UserID)
+        .where(Complaint.ComplaintID == payload["complaint_id"])
+    )).first()
+    if row is None:
+        return []
+    return build_email(
+        row.Email,
+        f"Complaint #{row.ComplaintID} {payload['action'].lower()}",
+        f"Your complaint \"{row.Title}\" was {payload['action'].lower()}."
+    )
+
+class SMTPPool:
+    """A fixed number of reusable SMTP connections.
+
+    smtplib is blocking, so each send runs in a thread; at most `size`
+    sends are in flight. Connections are opened lazily and dropped after
+    any error, so the next send on that slot reconnects.
+    """
+
+    def __init__(self, host: str, port: int, user: Optional[str], password: Optional[str],
+                 starttls: bool, size: int, timeout: float = 30):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self._idle: asyncio.Queue = asyncio.Queue()
+        for _ in range(size):
+            self._idle.put_nowait(None)
+
+    async def send(self, message: EmailMessage):
+        connection = await self._idle.get()
+        returned = None
+        try:
+            returned = await asyncio.to_thread(self._send, connection, message)
+        finally:
+            self._idle.put_nowait(returned)
+
+    async def close(self):
+        while not self._idle.empty():
+            connection = self._idle.get_nowait()
+            if connection is not None:
+                await asyncio.to_thread(self._close, connection)
+
+    def _send(self, connection: Optional[smtplib.SMTP], message: EmailMessage) -> smtplib.SMTP:
+        if connection is not None:
+            try:
+                connection.send_message(message)
+                return connection
+            except smtplib.SMTPServerDisconnected:
+                pass  # Idle connection timed out server-side; reconnect below
+            except Exception:
+                self._close(connection)
+                raise
+        connection = self._connect()
+        try:
+            connection.send_message(message)
+        except Exception:
+            self._close(connection)
+            raise
+        return connection
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                connection.starttls()
+            if self.user:
+                connection.login(self.user, self.password or "")
+        except Exception:
+            self._close(connection)
+            raise
+        return connection
+
+    @staticmethod
+    def _close(connection: smtplib.SMTP):
+        try:
+            connection.quit()
+        except Exception:
+            connection.close()
+
+class OutboxWorker:
+    """Drains outbox_messages in batches.
+
+    A batch is claimed by pushing its AvailableAt past a lease, using SKIP
+    LOCKED on Postgres so several workers can share the table. Delivery is
+    at-least-once: a worker dying mid-batch leaves the messages to be
+    claimed again when the lease runs out. Failures are retried with
+    exponential backoff, then marked DEAD.
+    """
+
+    def __init__(self, smtp: SMTPPool, batch_size: int, poll_interval: float, max_attempts: int,
+                 retry_seconds: float, lease_seconds: float, retention_days: int):
+        self.smtp = smtp
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.lease_seconds = lease_seconds
+        self.retention_days = retention_days
+
+    async def run(self):
+        last_purge = None
+        try:
+            while True:
+                try:
+                    claimed = await self.drain_once()
+                    now = datetime.now(timezone.utc)
+                    if last_purge is None or now - last_purge > timedelta(hours=1):
+                        await self.purge(now - timedelta(days=self.retention_days))
+                        last_purge = now
+                except Exception:
+                    logger.exception("Outbox delivery failed")
+                    claimed = 0
+                if claimed < self.batch_size:
+                    await asyncio.sleep(self.poll_interval)
+        finally:
+            await self.smtp.close()
+
+    async def drain_once(self) -> int:
+        """Claim, send and settle one batch; returns how many messages were claimed"""
+        async with AsyncSessionLocal() as db:
+            batch = await self._claim(db)
+            if not batch:
+                return 0
+            rendered = []
+            for message in batch:
+                try:
+                    rendered.append(await renderers[message.Topic](db, message.Payload))
+                except Exception as exc:
+                    rendered.append(exc)
+            await db.rollback()  # Rendering is read-only; don't hold its snapshot while sending
+
+        results = await asyncio.gather(
+            *(self._send_all(emails) for emails in rendered),
+            return_exceptions=True
+        )
+        async with AsyncSessionLocal() as db:
+            await self._settle(db, batch, results)
+        return len(batch)
+
+    async def _claim(self, db: AsyncSession) -> list:
+        """(MessageID, Topic, Payload, Attempts) rows of the claimed batch"""
+        now = datetime.now(timezone.utc)
+        result = await db.execute(
+            select(OutboxMessage.MessageID, OutboxMessage.Topic, OutboxMessage.Payload, OutboxMessage.Attempts)
+            .where(OutboxMessage.Status == OutboxStatus.PENDING, OutboxMessage.AvailableAt <= now)
+            .order_by(OutboxMessage.AvailableAt, OutboxMessage.MessageID)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        batch = result.all()
+        if batch:
+            await db.execute(
+                update(OutboxMessage)
+                .where(OutboxMessage.MessageID.in_([message.MessageID for message in batch]))
+                .values(AvailableAt=now + timedelta(seconds=self.lease_seconds))
+                .execution_options(synchronize_session=False)
+            )
+        await db.commit()
+        return batch
+
+    async def _send_all(self, emails):
+        if isinstance(emails, Exception):
+            raise emails
+        for email in emails:
+            await self.smtp.send(email)
+
+    async def _settle(self, db: AsyncSession, batch: list, results: list):
+        now = datetime.now(timezone.utc)
+        sent = [message.MessageID for message, result in zip(batch, results) if not isinstance(result, BaseException)]
+        if sent:
+            await db.execute(
+                update(OutboxMessage)
+                .where(OutboxMessage.MessageID.in_(sent))
+                .values(Status=OutboxStatus.SENT, SentAt=now, LastError=None)
+            )
+        for message, result in zip(batch, results):
+            if not isinstance(result, BaseException):
+                continue
+            attempts = message.Attempts + 1
+            values = {"Attempts": attempts, "LastError": f"{type(result).__name__}: {result}"}
+            if attempts >= self.max_attempts:
+                values["Status"] = OutboxStatus.DEAD
+                logger.error("Outbox message %s dead after %s attempts: %s", message.MessageID, attempts, result)
+            else:
+                values["AvailableAt"] = now + timedelta(seconds=min(self.retry_seconds * 2 ** (attempts - 1), 3600))
+            await db.execute(update(OutboxMessage).where(OutboxMessage.MessageID == message.MessageID).values(**values))
+        await db.commit()
+
+    async def purge(self, before: datetime):
+        """Delete messages sent before `before`; dead ones are kept"""
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(OutboxMessage).where(
+                OutboxMessage.Status == OutboxStatus.SENT,
+                OutboxMessage.SentAt < before
+            ))
+            await db.commit()
+
+def create_outbox_worker() -> Optional[OutboxWorker]:
+    """Worker configured from settings, or None when SMTP_HOST is unset"""
+    if not settings.SMTP_HOST:
+        return None
+    smtp = SMTPPool(
+        settings.SMTP_HOST,
+        settings.SMTP_PORT or 0,
+        settings.SMTP_USER,
+        settings.SMTP_PASSWORD,
+        settings.SMTP_STARTTLS,
+        settings.SMTP_POOL_SIZE
+    )
+    return OutboxWorker(
+        smtp,
+        settings.OUTBOX_BATCH_SIZE,
+        settings.OUTBOX_POLL_SECONDS,
+        settings.OUTBOX_MAX_ATTEMPTS,
+        settings.OUTBOX_RETRY_SECONDS,
+        settings.OUTBOX_LEASE_SECONDS,
+        settings.OUTBOX_RETENTION_DAYS
+    )
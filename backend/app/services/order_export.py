@@ -0,0 +1,84 @@
+import csv
+import io
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.models.base import AsyncSessionLocal
+from app.models.order import Order, OrderItem, OrderStatus
+from app.schemas.order import OrderItemResponse, OrderResponse
+
+EXPORT_BATCH_SIZE = 1000  # Rows fetched per round trip from the server-side cursor
+
+ORDER_COLUMNS = [
+    Order.OrderID, Order.SupplierID, Order.ConsumerID, Order.ConsumerStaffID, Order.OrderDate,
+    Order.Status, Order.TotalAmount, Order.DeliveryDate, Order.RejectionReason, Order.Version,
+]
+ITEM_COLUMNS = [OrderItem.OrderItemID, OrderItem.ProductID, OrderItem.Quantity, OrderItem.UnitPrice, OrderItem.Subtotal]
+CSV_HEADER = [column.key for column in ORDER_COLUMNS + ITEM_COLUMNS]
+
+async def stream_order_rows(
+    supplier_id: Optional[int] = None,
+    consumer_id: Optional[int] = None,
+    order_status: Optional[OrderStatus] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    sessionmaker: async_sessionmaker = AsyncSessionLocal
+) -> AsyncIterator[tuple]:
+    """Yield (order columns..., item columns...) rows ordered by order.
+
+    Rows come from a server-side cursor as plain tuples, so memory use does
+    not depend on how many orders match. The session is owned here because
+    the response keeps streaming after the request handler has returned.
+    """
+    query = select(*ORDER_COLUMNS, *ITEM_COLUMNS).outerjoin(OrderItem, OrderItem.OrderID == Order.OrderID)
+    if supplier_id:
+        query = query.where(Order.SupplierID == supplier_id)
+    if consumer_id:
+        query = query.where(Order.ConsumerID == consumer_id)
+    if order_status:
+        query = query.where(Order.Status == order_status)
+    if date_from:
+        query = query.where(Order.OrderDate >= date_from)
+    if date_to:
+        query = query.where(Order.OrderDate < date_to)
+    query = query.order_by(Order.OrderID, OrderItem.OrderItemID).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+    async with sessionmaker() as db:
+        result = await db.stream(query)
+        async for row in result:
+            yield tuple(row)
+
+async def export_ndjson(rows: AsyncIterator[tuple]) -> AsyncIterator[str]:
+    """One OrderResponse JSON document per line"""
+    order_width = len(ORDER_COLUMNS)
+    current: Optional[dict] = None
+    items: List[OrderItemResponse] = []
+    async for row in rows:
+        if current is None or current["OrderID"] != row[0]:
+            if current is not None:
+                yield OrderResponse(**current, order_items=items).model_dump_json() + "\n"
+            current = dict(zip(CSV_HEADER[:order_width], row[:order_width]))
+            items = []
+        if row[order_width] is not None:
+            items.append(OrderItemResponse(**dict(zip(CSV_HEADER[order_width:], row[order_width:]))))
+    if current is not None:
+        yield OrderResponse(**current, order_items=items).model_dump_json() + "\n"
+
+async def export_csv(rows: AsyncIterator[tuple]) -> AsyncIterator[str]:
+    """One line per order item, order columns repeated; orders without items get one line"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    async for row in rows:
+        writer.writerow(
+            value.value if isinstance(value, OrderStatus)
+            else value.isoformat() if isinstance(value, datetime)
+            else value
+            for value in row
+        )
+        if buffer.tell() >= 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
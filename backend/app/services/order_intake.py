@@ -0,0 +1,149 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List
+from fastapi import HTTPException, status
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from app.models.order import Order, OrderItem, OrderStatus
+from app.schemas.order import OrderCreate
+from app.services import inventory, notifications, sales_stats
+from app.services.cache import cache, product_key, supplier_products_group
+from app.services.link_index import link_index
+
+NOT_LINKED = (status.HTTP_403_FORBIDDEN, "No approved link between consumer and supplier")
+
+@dataclass
+class OrderFailure:
+    """Why one order of a request could not be placed"""
+    index: int
+    status_code: int
+    detail: str
+
+@dataclass
+class Placement:
+    orders: List[Order] = field(default_factory=list)  # In request order
+    failures: List[OrderFailure] = field(default_factory=list)
+    supplier_ids: set = field(default_factory=set)
+    product_ids: set = field(default_factory=set)
+
+async def place_orders(
+    db: AsyncSession,
+    orders: List[OrderCreate],
+    consumer_staff_id: int,
+    partial: bool = False
+) -> Placement:
+    """Place several orders with a fixed number of statements.
+
+    Every product is fetched and locked in one query (hot products with
+    sharded stock are read without locking), stock is checked and
+    allocated in request order, then stock, orders, items and stock
+    reservations are written with one statement each (plus one per product
+    with sharded stock). Without `partial`, any failure places nothing;
+    with it, only the failing orders are skipped. The caller commits, then
+    calls invalidate_stock().
+    """
+    placement = Placement()
+
+    # Ordering needs an approved supplier-consumer link; the index answers
+    # without a query for every pair that has one
+    approved = await link_index.approved_pairs(db, {(order.supplier_id, order.consumer_id) for order in orders})
+    linked = [(order.supplier_id, order.consumer_id) in approved for order in orders]
+    if not all(linked) and not partial:
+        placement.failures.append(OrderFailure(linked.index(False), *NOT_LINKED))
+        return placement
+
+    # Merge repeated lines so each product is locked and decremented once
+    quantities: List[Dict[int, int]] = []
+    for order in orders:
+        merged = defaultdict(int)
+        for item in order.items:
+            merged[item.product_id] += item.quantity
+        quantities.append(merged)
+    product_ids = sorted({product_id for merged in quantities for product_id in merged})
+
+    # Fetch and lock the products; hot products with sharded stock are not locked
+    products = await inventory.load_products(db, product_ids)
+    remaining = {product_id: product.Stock for product_id, product in products.items()}
+
+    accepted = []
+    for index, merged in enumerate(quantities):
+        failure = _check(products, remaining, orders[index].supplier_id, merged) if linked[index] else NOT_LINKED
+        if failure is not None:
+            placement.failures.append(OrderFailure(index, *failure))
+            continue
+        for product_id, quantity in merged.items():
+            remaining[product_id] -= quantity
+        accepted.append(index)
+    if not accepted or (placement.failures and not partial):
+        return placement
+
+    # Take the stock: one conditional UPDATE for plain products (locked, so
+    # it only misses on databases without row locks, when a concurrent write
+    # got there first), one shard row per sharded product
+    requested = defaultdict(int)
+    for index in accepted:
+        for product_id, quantity in quantities[index].items():
+            requested[product_id] += quantity
+    try:
+        takes = await inventory.take(db, products, requested)
+    except inventory.InsufficientStock as exc:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    # Orders, then all of their items, each in one multi-row INSERT
+    db_orders = (await db.scalars(insert(Order).returning(Order, sort_by_parameter_order=True), [
+        {
+            "SupplierID": orders[index].supplier_id,
+            "ConsumerID": orders[index].consumer_id,
+            "ConsumerStaffID": consumer_staff_id,
+            "TotalAmount": sum(products[item.product_id].Price * item.quantity for item in orders[index].items),
+            "DeliveryDate": orders[index].delivery_date,
+            "Status": OrderStatus.PENDING
+        }
+        for index in accepted
+    ])).all()
+    order_items = (await db.scalars(insert(OrderItem).returning(OrderItem, sort_by_parameter_order=True), [
+        {
+            "OrderID": db_order.OrderID,
+            "ProductID": item.product_id,
+            "Quantity": item.quantity,
+            "UnitPrice": products[item.product_id].Price,
+            "Subtotal": products[item.product_id].Price * item.quantity
+        }
+        for db_order, index in zip(db_orders, accepted)
+        for item in orders[index].items
+    ])).all()
+
+    await inventory.hold(db, [(db_order.OrderID, quantities[index]) for db_order, index in zip(db_orders, accepted)], takes)
+
+    items_by_order = defaultdict(list)
+    for order_item in order_items:
+        items_by_order[order_item.OrderID].append(order_item)
+    for db_order in db_orders:
+        set_committed_value(db_order, "order_items", items_by_order[db_order.OrderID])
+        notifications.enqueue(db, "order.created", order_id=db_order.OrderID)
+    await sales_stats.record_new_orders(db, [(db_order, db_order.order_items) for db_order in db_orders])
+
+    placement.orders = db_orders
+    placement.product_ids = set(requested)
+    placement.supplier_ids = {products[product_id].SupplierID for product_id in requested}
+    return placement
+
+def _check(products: dict, remaining: Dict[int, int], supplier_id: int, quantities: Dict[int, int]):
+    """(status code, detail) if an order cannot be placed from the supplier's remaining stock"""
+    for product_id in sorted(quantities):
+        # Another supplier's product is as good as missing: the link only
+        # authorizes ordering from this supplier's catalog
+        if product_id not in products or products[product_id].SupplierID != supplier_id:
+            return status.HTTP_404_NOT_FOUND, f"Product {product_id} not found"
+    for product_id in sorted(quantities):
+        if remaining[product_id] < quantities[product_id]:
+            return status.HTTP_400_BAD_REQUEST, f"Insufficient stock for product {products[product_id].Name}"
+    return None
+
+async def invalidate_stock(placement: Placement):
+    """Drop cached products whose stock the committed placement changed"""
+    await cache.invalidate(*[product_key(product_id) for product_id in placement.product_ids])
+    for supplier_id in placement.supplier_ids:
+        await cache.bump(supplier_products_group(supplier_id))
@@ -0,0 +1,129 @@
+import asyncio
+import csv
+import io
+import json
+from collections import defaultdict
+from itertools import islice
+from typing import BinaryIO, Dict, FrozenSet, Iterator, List, Tuple, Union
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.product import Product
+from app.schemas.product import ProductCreate, ProductImportError, ProductImportResult
+from app.services import inventory, product_search
+from app.services.cache import cache, product_key, supplier_products_group
+from app.utils.sql import dialect_insert
+
+# ProductCreate field -> Product column
+COLUMNS = {
+    "supplier_id": "SupplierID",
+    "sku": "SKU",
+    "name": "Name",
+    "description": "Description",
+    "price": "Price",
+    "unit": "Unit",
+    "stock": "Stock",
+    "minimum_order_quantity": "MinimumOrderQuantity",
+    "image_url": "ImageURL",
+    "delivery_available": "DeliveryAvailable",
+    "pickup_available": "PickupAvailable",
+    "lead_time": "LeadTime",
+    "delivery_zones": "DeliveryZones",
+}
+# Columns identifying the product, never updated by an import
+KEY_COLUMNS = frozenset({"SupplierID", "SKU"})
+
+def iter_rows(file: BinaryIO, fmt: str) -> Iterator[Tuple[int, Union[dict, str]]]:
+    """Yield (row number, raw row or parse error) one line at a time"""
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        for number, row in enumerate(csv.DictReader(text), start=1):
+            # Empty cells are left unset, like absent columns
+            yield number, {key: value for key, value in row.items() if key and value not in ("", None)}
+        return
+
+    number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield number, f"Invalid JSON: {exc}"
+            continue
+        yield number, row if isinstance(row, dict) else "Expected a JSON object"
+
+async def import_products(db: AsyncSession, supplier_id: int, file: BinaryIO, fmt: str) -> ProductImportResult:
+    """Validate and upsert a catalog file in chunks keyed on (SupplierID, SKU).
+
+    Each chunk is committed on its own, so memory stays bounded by the chunk
+    size and a bad chunk does not undo the ones before it. The file is
+    parsed on a worker thread, a chunk's worth of rows at a time, since
+    large uploads are spooled to disk. Existing products only have the
+    columns their row sets updated; new ones get the schema defaults.
+    """
+    result = ProductImportResult(processed=0, upserted=0, failed=0)
+    chunk: Dict[str, Tuple[int, dict, FrozenSet[str]]] = {}
+
+    def fail(number: int, errors: List[str]):
+        result.failed += 1
+        if len(result.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+            result.errors.append(ProductImportError(row=number, errors=errors))
+
+    rows = iter_rows(file, fmt)
+    while batch := await asyncio.to_thread(list, islice(rows, settings.IMPORT_CHUNK_SIZE)):
+        for number, row in batch:
+            result.processed += 1
+            if isinstance(row, str):
+                fail(number, [row])
+                continue
+            try:
+                product = ProductCreate.model_validate({**row, "supplier_id": supplier_id})
+            except ValidationError as exc:
+                fail(number, [f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in exc.errors()])
+                continue
+            if not product.sku:
+                fail(number, ["sku: Field required for import"])
+                continue
+
+            # A SKU repeated within a chunk keeps its last row. Columns the
+            # row left out (or left empty) keep their current values.
+            values = product.model_dump()
+            updated = frozenset(COLUMNS[field] for field in product.model_fields_set) - KEY_COLUMNS
+            chunk[product.sku] = (number, {COLUMNS[field]: values[field] for field in COLUMNS}, updated)
+            if len(chunk) >= settings.IMPORT_CHUNK_SIZE:
+                await _upsert_chunk(db, chunk, result, fail)
+                chunk = {}
+    if chunk:
+        await _upsert_chunk(db, chunk, result, fail)
+
+    await cache.bump(supplier_products_group(supplier_id))
+    product_search.search_index.reset()
+    return result
+
+async def _upsert_chunk(db: AsyncSession, chunk: Dict[str, Tuple[int, dict, FrozenSet[str]]], result: ProductImportResult, fail):
+    # One statement per set of columns to update, usually just one per file
+    by_columns = defaultdict(list)
+    for _, values, updated in chunk.values():
+        by_columns[updated].append(values)
+    try:
+        product_ids = []
+        for updated, rows in by_columns.items():
+            insert_stmt = dialect_insert(db, Product)
+            stmt = insert_stmt.on_conflict_do_update(
+                index_elements=[Product.SupplierID, Product.SKU],
+                set_={column: insert_stmt.excluded[column] for column in sorted(updated)}
+            ).returning(Product.ProductID)
+            product_ids += (await db.execute(stmt, rows)).scalars().all()
+        await inventory.redistribute(db, product_ids)
+        await db.commit()
+    except SQLAlchemyError as exc:
+        await db.rollback()
+        message = str(getattr(exc, "orig", exc))
+        for number, _, _ in chunk.values():
+            fail(number, [f"database: {message}"])
+        return
+    result.upserted += len(product_ids)
+    await cache.invalidate(*[product_key(product_id) for product_id in product_ids])
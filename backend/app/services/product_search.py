@@ -0,0 +1,157 @@
+import difflib
+import math
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import Float, and_, column, func, literal_column, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.product import Product, SEARCH_DOCUMENT_SQL
+from app.utils.pagination import decode_cursor, encode_cursor
+
+TOKEN_PATTERN = re.compile(r"\w+")
+NAME_WEIGHT = 3.0  # Name matches count more than description matches
+FUZZY_WEIGHT = 0.5  # Typo matches count less than exact ones
+FUZZY_CUTOFF = 0.75
+
+# Cursor keys: results are ordered by rank descending, then ProductID
+CURSOR_KEYS = [column("rank", Float), Product.ProductID]
+
+def tokenize(value: Optional[str]) -> List[str]:
+    return [token.lower() for token in TOKEN_PATTERN.findall(value or "")]
+
+class InvertedIndex:
+    """In-process inverted index over active products.
+
+    Used on databases without full-text search (SQLite in tests). Scores
+    are TF-IDF with name terms weighted up; query terms missing from the
+    vocabulary fall back to their closest spellings.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._products: Dict[int, Tuple[int, Set[str]]] = {}
+        self.loaded = False
+
+    async def load(self, db: AsyncSession):
+        result = await db.execute(
+            select(Product.ProductID, Product.SupplierID, Product.Name, Product.Description)
+            .where(Product.IsActive.is_(True))
+        )
+        for row in result:
+            self._add(*row)
+        self.loaded = True
+
+    def update(self, product: Product):
+        """Reindex a product after it is created or changed"""
+        if not self.loaded:
+            return
+        self.remove(product.ProductID)
+        if product.IsActive is not False:
+            self._add(product.ProductID, product.SupplierID, product.Name, product.Description)
+
+    def reset(self):
+        """Drop the index so it is rebuilt on the next search, e.g. after a bulk import"""
+        self._postings.clear()
+        self._products.clear()
+        self.loaded = False
+
+    def remove(self, product_id: int):
+        entry = self._products.pop(product_id, None)
+        if entry is None:
+            return
+        for term in entry[1]:
+            postings = self._postings[term]
+            postings.pop(product_id, None)
+            if not postings:
+                del self._postings[term]
+
+    def _add(self, product_id: int, supplier_id: int, name: str, description: Optional[str]):
+        weights: Dict[str, float] = defaultdict(float)
+        for term in tokenize(description):
+            weights[term] += 1.0
+        for term in tokenize(name):
+            weights[term] += NAME_WEIGHT
+        for term, weight in weights.items():
+            self._postings[term][product_id] = weight
+        self._products[product_id] = (supplier_id, set(weights))
+
+    def search(self, query: str, supplier_ids: Optional[Set[int]] = None) -> List[Tuple[float, int]]:
+        """(score, ProductID) pairs, best first"""
+        scores: Dict[int, float] = defaultdict(float)
+        total = len(self._products) or 1
+        for term in tokenize(query):
+            if term in self._postings:
+                matches = [(term, 1.0)]
+            else:
+                close = difflib.get_close_matches(term, list(self._postings), n=3, cutoff=FUZZY_CUTOFF)
+                matches = [(match, FUZZY_WEIGHT) for match in close]
+            for match, factor in matches:
+                postings = self._postings[match]
+                idf = math.log(1 + total / len(postings))
+                for product_id, weight in postings.items():
+                    if supplier_ids is None or self._products[product_id][0] in supplier_ids:
+                        scores[product_id] += factor * weight * idf
+        return sorted(((score, product_id) for product_id, score in scores.items()), key=lambda hit: (-hit[0], hit[1]))
+
+search_index = InvertedIndex()
+
+async def search_products(
+    db: AsyncSession,
+    query: str,
+    supplier_ids: Optional[Set[int]] = None,
+    cursor: Optional[str] = None,
+    limit: int = 20
+) -> Tuple[List[Product], Optional[str]]:
+    """Ranked search over active products, keyset-paginated on (rank, ProductID).
+
+    `supplier_ids` optionally restricts results to those suppliers. Returns
+    the page and the cursor for the next one.
+    """
+    after = decode_cursor(cursor, CURSOR_KEYS) if cursor else None
+    if db.get_bind().dialect.name == "postgresql":
+        hits = await _search_postgres(db, query, supplier_ids, after, limit + 1)
+    else:
+        hits = await _search_index(db, query, supplier_ids, after, limit + 1)
+
+    next_cursor = None
+    if len(hits) > limit > 0:
+        hits = hits[:limit]
+        next_cursor = encode_cursor([hits[-1][1], hits[-1][0].ProductID])
+    return [product for product, rank in hits], next_cursor
+
+async def _search_postgres(db, query, supplier_ids, after, limit) -> List[Tuple[Product, float]]:
+    document = text(SEARCH_DOCUMENT_SQL)
+    tsquery = func.websearch_to_tsquery(literal_column("'english'::regconfig"), query)
+    # Full-text matches plus trigram matches on the name to tolerate typos
+    ranked = (
+        select(
+            Product.ProductID.label("product_id"),
+            (func.ts_rank(document, tsquery) + func.similarity(Product.Name, query)).label("rank")
+        )
+        .where(Product.IsActive.is_(True), or_(document.op("@@")(tsquery), Product.Name.op("%")(query)))
+    )
+    if supplier_ids is not None:
+        ranked = ranked.where(Product.SupplierID.in_(list(supplier_ids)))
+    ranked = ranked.subquery()
+
+    stmt = select(Product, ranked.c.rank).join(ranked, Product.ProductID == ranked.c.product_id)
+    if after is not None:
+        rank, product_id = after
+        stmt = stmt.where(or_(ranked.c.rank < rank, and_(ranked.c.rank == rank, Product.ProductID > product_id)))
+    result = await db.execute(stmt.order_by(ranked.c.rank.desc(), Product.ProductID).limit(limit))
+    return [(product, rank) for product, rank in result]
+
+async def _search_index(db, query, supplier_ids, after, limit) -> List[Tuple[Product, float]]:
+    if not search_index.loaded:
+        await search_index.load(db)
+    hits = search_index.search(query, supplier_ids)
+    if after is not None:
+        rank, product_id = after
+        hits = [hit for hit in hits if hit[0] < rank or (hit[0] == rank and hit[1] > product_id)]
+    hits = hits[:limit]
+    if not hits:
+        return []
+
+    result = await db.execute(select(Product).where(Product.ProductID.in_([product_id for _, product_id in hits])))
+    products = {product.ProductID: product for product in result.scalars()}
+    return [(products[product_id], rank) for rank, product_id in hits if product_id in products]
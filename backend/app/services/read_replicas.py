@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import time
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.metrics import READ_ROUTING, REPLICA_LAG, instrument_engine
+from app.models.base import AsyncSessionLocal, create_async_pooled_engine, get_async_database_url
+
+logger = logging.getLogger(__name__)
+
+# Set on responses to writes and echoed back by clients (header or cookie)
+LAST_WRITE_HEADER = "X-Last-Write-At"
+LAST_WRITE_COOKIE = "last_write_at"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Seconds the replica's replayed state trails the primary; 0 when it has
+# replayed everything it received, so an idle primary doesn't look like lag
+POSTGRES_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+class Replica:
+    """One read-only database and its last measured lag"""
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.engine = create_async_pooled_engine(get_async_database_url(url))
+        self.sessionmaker = async_sessionmaker(self.engine, autoflush=False, expire_on_commit=False)
+        instrument_engine(self.engine, track_pool=False)
+        self.lag: Optional[float] = None  # None until measured, or after a failed check
+        self.caught_up_at = 0.0  # Wall-clock time the replica is known to reflect
+
+    async def check(self):
+        checked_at = time.time()
+        try:
+            async with self.engine.connect() as conn:
+                if self.engine.dialect.name == "postgresql":
+                    lag = float(await conn.scalar(POSTGRES_LAG_SQL))
+                else:
+                    await conn.execute(text("SELECT 1"))  # Stand-in databases are never behind
+                    lag = 0.0
+        except Exception as exc:
+            if self.lag is not None:
+                logger.warning("Replica %s unavailable: %s", self.name, exc)
+            self.lag = None
+            REPLICA_LAG.labels(self.name).set(float("nan"))
+            return
+        self.lag = lag
+        self.caught_up_at = checked_at - lag
+        REPLICA_LAG.labels(self.name).set(lag)
+
+class ReplicaRouter:
+    """Chooses where a read-only session connects.
+
+    Replicas are used round-robin while their measured lag is under
+    `max_lag`. A client that wrote recently sends back the time of its
+    write, and only replicas known to have caught up past that time serve
+    it; otherwise it reads from the primary, so it always sees its own
+    writes.
+    """
+
+    def __init__(self, urls: List[str], max_lag: float, check_interval: float):
+        self.replicas = [Replica(f"replica{i}", url) for i, url in enumerate(urls)]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._next = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def sessionmaker_for(self, last_write_at: Optional[float] = None) -> async_sessionmaker:
+        candidates = [
+            replica for replica in self.replicas
+            if replica.lag is not None and replica.lag <= self.max_lag
+            and (last_write_at is None or replica.caught_up_at >= last_write_at)
+        ]
+        if not candidates:
+            READ_ROUTING.labels("primary").inc()
+            return AsyncSessionLocal
+        self._next = (self._next + 1) % len(candidates)
+        READ_ROUTING.labels("replica").inc()
+        return candidates[self._next].sessionmaker
+
+    async def run(self):
+        """Measure replica lag until cancelled"""
+        while True:
+            await asyncio.gather(*(replica.check() for replica in self.replicas))
+            await asyncio.sleep(self.check_interval)
+
+    async def dispose(self):
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+def parse_last_write(headers, cookies) -> Optional[float]:
+    """The client's last write time, from the header or the cookie"""
+    value = headers.get(LAST_WRITE_HEADER) or cookies.get(LAST_WRITE_COOKIE)
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+class LastWriteMiddleware:
+    """Stamps successful writes with the time they committed.
+
+    Responses to unsafe methods carry the time in a header and a short-lived
+    cookie; clients that echo either back get read-your-writes routing.
+    """
+
+    def __init__(self, app: ASGIApp, max_age: float):
+        self.app = app
+        self.max_age = int(max_age)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                stamp = f"{time.time():.3f}"
+                headers = MutableHeaders(scope=message)
+                headers.append(LAST_WRITE_HEADER, stamp)
+                headers.append("Set-Cookie", f"{LAST_WRITE_COOKIE}={stamp}; Max-Age={self.max_age}; Path=/; HttpOnly; SameSite=Lax")
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+replica_router = ReplicaRouter(settings.DATABASE_REPLICA_URLS, settings.REPLICA_MAX_LAG_SECONDS, settings.REPLICA_CHECK_SECONDS)
@@ -0,0 +1,186 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from typing import Iterable, List, Tuple
+from sqlalchemy import Date, and_, cast, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.base import AsyncSessionLocal, async_engine
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.sales import SupplierProductSalesDaily, SupplierSalesDaily
+from app.utils.sql import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+# Postgres advisory lock keys (class, object). Object 0 is held by the one
+# worker running reconciliation; each day's rebuild takes (class, day
+# ordinal) exclusively while writers to that day hold it shared.
+ADVISORY_LOCK_CLASS = 0x5A1E5
+RECONCILER_LOCK = 0
+
+def order_day(order_date: datetime) -> date:
+    """Summary day of an order (UTC)"""
+    if order_date.tzinfo is not None:
+        order_date = order_date.astimezone(timezone.utc)
+    return order_date.date()
+
+async def record_new_order(db: AsyncSession, order: Order, items: Iterable[OrderItem]):
+    """Count a newly placed order; call in the transaction that inserts it"""
+    await _apply(db, [(order, items, [(order.Status, 1)])])
+
+async def record_new_orders(db: AsyncSession, placed: Iterable[Tuple[Order, Iterable[OrderItem]]]):
+    """Count several newly placed orders with one upsert per summary table"""
+    await _apply(db, [(order, items, [(order.Status, 1)]) for order, items in placed])
+
+async def record_status_change(db: AsyncSession, order: Order, items: Iterable[OrderItem], old_status: OrderStatus):
+    """Move an order's totals from its previous status to its current one"""
+    if old_status != order.Status:
+        await _apply(db, [(order, items, [(old_status, -1), (order.Status, 1)])])
+
+async def _apply(db: AsyncSession, changes: List[Tuple[Order, Iterable[OrderItem], List[Tuple[OrderStatus, int]]]]):
+    # Deltas are summed per summary row first, so one statement never
+    # touches the same row twice
+    daily = defaultdict(lambda: [0, Decimal(0)])
+    per_product = defaultdict(lambda: [0, Decimal(0)])
+    for order, items, deltas in changes:
+        day = order_day(order.OrderDate)
+        items = list(items)
+        for status, sign in deltas:
+            totals = daily[(order.SupplierID, day, status)]
+            totals[0] += sign
+            totals[1] += sign * order.TotalAmount
+            for item in items:
+                totals = per_product[(order.SupplierID, day, item.ProductID, status)]
+                totals[0] += sign * item.Quantity
+                totals[1] += sign * item.Subtotal
+    if not daily:
+        return
+    if db.get_bind().dialect.name == "postgresql":
+        # A rebuild of one of these days waits for this transaction to
+        # commit, and this waits for one in progress
+        days = sorted({day for _, day, _ in daily})
+        await db.execute(select(*[
+            func.pg_advisory_xact_lock_shared(ADVISORY_LOCK_CLASS, day.toordinal()) for day in days
+        ]))
+
+    # Upserts add the deltas to whatever the rows already hold
+    insert_stmt = dialect_insert(db, SupplierSalesDaily)
+    await db.execute(
+        insert_stmt.on_conflict_do_update(
+            index_elements=[SupplierSalesDaily.SupplierID, SupplierSalesDaily.Day, SupplierSalesDaily.Status],
+            set_={
+                "OrderCount": SupplierSalesDaily.OrderCount + insert_stmt.excluded.OrderCount,
+                "Revenue": SupplierSalesDaily.Revenue + insert_stmt.excluded.Revenue
+            }
+        ),
+        [
+            {"SupplierID": supplier_id, "Day": day, "Status": status, "OrderCount": count, "Revenue": revenue}
+            for (supplier_id, day, status), (count, revenue) in daily.items()
+        ]
+    )
+    if not per_product:
+        return
+
+    insert_stmt = dialect_insert(db, SupplierProductSalesDaily)
+    await db.execute(
+        insert_stmt.on_conflict_do_update(
+            index_elements=[
+                SupplierProductSalesDaily.SupplierID,
+                SupplierProductSalesDaily.Day,
+                SupplierProductSalesDaily.ProductID,
+                SupplierProductSalesDaily.Status
+            ],
+            set_={
+                "Quantity": SupplierProductSalesDaily.Quantity + insert_stmt.excluded.Quantity,
+                "Revenue": SupplierProductSalesDaily.Revenue + insert_stmt.excluded.Revenue
+            }
+        ),
+        [
+            {
+                "SupplierID": supplier_id,
+                "Day": day,
+                "ProductID": product_id,
+                "Status": status,
+                "Quantity": quantity,
+                "Revenue": revenue
+            }
+            for (supplier_id, day, product_id, status), (quantity, revenue) in per_product.items()
+        ]
+    )
+
+def _order_day_sql(db: AsyncSession):
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(func.timezone("UTC", Order.OrderDate), Date)
+    return func.date(Order.OrderDate)
+
+async def reconcile(db: AsyncSession, date_from: date, date_to: date):
+    """Rebuild the summaries for days in [date_from, date_to) from `orders`.
+
+    Each day is rebuilt and committed on its own. On Postgres the rebuild
+    holds that day's advisory lock exclusively, so writers' increments to
+    the day wait for it and then apply on top, and nothing committed around
+    it is lost or counted twice; writers to other days are not held up.
+    """
+    day = date_from
+    while day < date_to:
+        await _rebuild_day(db, day)
+        day += timedelta(days=1)
+
+async def _rebuild_day(db: AsyncSession, day: date):
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(select(func.pg_advisory_xact_lock(ADVISORY_LOCK_CLASS, day.toordinal())))
+
+    order_day = _order_day_sql(db)
+    on_day = and_(
+        Order.OrderDate >= datetime.combine(day, time.min, tzinfo=timezone.utc),
+        Order.OrderDate < datetime.combine(day + timedelta(days=1), time.min, tzinfo=timezone.utc),
+        Order.Status.is_not(None)
+    )
+    await db.execute(delete(SupplierSalesDaily).where(SupplierSalesDaily.Day == day))
+    await db.execute(delete(SupplierProductSalesDaily).where(SupplierProductSalesDaily.Day == day))
+    await db.execute(insert(SupplierSalesDaily.__table__).from_select(
+        ["SupplierID", "Day", "Status", "OrderCount", "Revenue"],
+        select(Order.SupplierID, order_day, Order.Status, func.count(), func.coalesce(func.sum(Order.TotalAmount), 0))
+        .where(on_day)
+        .group_by(Order.SupplierID, order_day, Order.Status)
+    ))
+    await db.execute(insert(SupplierProductSalesDaily.__table__).from_select(
+        ["SupplierID", "Day", "ProductID", "Status", "Quantity", "Revenue"],
+        select(Order.SupplierID, order_day, OrderItem.ProductID, Order.Status, func.sum(OrderItem.Quantity), func.sum(OrderItem.Subtotal))
+        .join(OrderItem, OrderItem.OrderID == Order.OrderID)
+        .where(on_day)
+        .group_by(Order.SupplierID, order_day, OrderItem.ProductID, Order.Status)
+    ))
+    await db.commit()
+
+async def reconcile_recent(days: int) -> bool:
+    """Rebuild the last `days` days unless another worker is already doing so"""
+    today = datetime.now(timezone.utc).date()
+    if async_engine.dialect.name != "postgresql":
+        async with AsyncSessionLocal() as db:
+            await reconcile(db, today - timedelta(days=days), today + timedelta(days=1))
+        return True
+
+    # A session-level lock on a connection of its own, held across the
+    # per-day transactions
+    async with async_engine.connect() as lock_connection:
+        locked = await lock_connection.scalar(select(func.pg_try_advisory_lock(ADVISORY_LOCK_CLASS, RECONCILER_LOCK)))
+        if not locked:
+            return False
+        try:
+            async with AsyncSessionLocal() as db:
+                await reconcile(db, today - timedelta(days=days), today + timedelta(days=1))
+        finally:
+            await lock_connection.execute(select(func.pg_advisory_unlock(ADVISORY_LOCK_CLASS, RECONCILER_LOCK)))
+            await lock_connection.commit()
+    return True
+
+async def run_reconciler(interval: int, days: int):
+    """Periodically rebuild the last `days` days to correct any drift; one worker at a time runs it"""
+    while True:
+        try:
+            await reconcile_recent(days)
+        except Exception:
+            logger.exception("Sales summary reconciliation failed")
+        await asyncio.sleep(interval)
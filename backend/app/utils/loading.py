@@ -0,0 +1,38 @@
+from typing import Iterable, List
+from sqlalchemy import select, Select
+from sqlalchemy.orm import joinedload, selectinload
+
+class Projection:
+    """Declares which relationships a response model needs loaded.
+
+    Relationship paths are attribute names on the model, with dots for
+    nested relationships (e.g. "order_items.product"). Collections should
+    use `selectin` (one extra query per path regardless of row count);
+    many-to-one references can use `joined` to ride along in the main query.
+    """
+
+    def __init__(self, model, selectin: Iterable[str] = (), joined: Iterable[str] = ()):
+        self.model = model
+        self.selectin = tuple(selectin)
+        self.joined = tuple(joined)
+
+    def _load(self, loader, path: str):
+        entity = self.model
+        option = None
+        for name in path.split("."):
+            attr = getattr(entity, name)
+            option = loader(attr) if option is None else getattr(option, loader.__name__)(attr)
+            entity = attr.property.mapper.class_
+        return option
+
+    def options(self) -> List:
+        """Loader options for use with select().options() or session.get()"""
+        return (
+            [self._load(selectinload, path) for path in self.selectin]
+            + [self._load(joinedload, path) for path in self.joined]
+        )
+
+    def select(self) -> Select:
+        """A select() of the model with all declared relationships loaded"""
+        return select(self.model).options(*self.options())
+
@@ -0,0 +1,85 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional, Sequence
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(values: Sequence) -> str:
+    """Encode sort key values into an opaque cursor token"""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    token = base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode())
+    return token.decode().rstrip("=")
+
+def _typed(value, python_type):
+    """A decoded JSON value as `python_type`, or ValueError if it is not one"""
+    if python_type is datetime and isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if isinstance(value, bool):
+        raise ValueError(value)
+    if python_type is float and isinstance(value, int):
+        return float(value)
+    if python_type is not datetime and isinstance(value, python_type):
+        return value
+    raise ValueError(value)
+
+def decode_cursor(cursor: str, keys: Sequence) -> tuple:
+    """Decode a cursor token back into sort key values of the keys' types.
+
+    Cursors come from clients, so anything else, such as a string where a
+    number is expected, is rejected before it reaches a query.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(payload, list) or len(payload) != len(keys):
+            raise ValueError(cursor)
+        return tuple(_typed(value, key.type.python_type) for key, value in zip(keys, payload))
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    keys: Sequence,
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    rows: bool = False
+) -> list:
+    """Run a list query with stable (sort key, primary key) ordering.
+
+    With a cursor the page starts right after the cursor row (keyset mode),
+    otherwise `skip` is applied as before (offset mode). When more rows
+    follow, the cursor for the next page is returned in the X-Next-Cursor
+    header so list bodies keep their existing shape. With `rows`, a
+    column query's Row tuples are returned instead of scalars.
+
+    The cursor holds only the primary key (the last of `keys`); the other
+    sort keys are read back from the cursor row in a subquery, so stored
+    values are compared with stored values. Comparing them with bound
+    datetimes goes wrong on SQLite, where CURRENT_TIMESTAMP lacks the
+    fractional seconds a bound value is rendered with.
+    """
+    query = query.order_by(*keys)
+    if cursor:
+        primary_key = keys[-1]
+        (after,) = decode_cursor(cursor, [primary_key])
+        if len(keys) == 1:
+            query = query.where(primary_key > after)
+        else:
+            cursor_row = select(*keys).where(primary_key == after).correlate(None).scalar_subquery()
+            query = query.where(tuple_(*keys) > cursor_row)
+    else:
+        query = query.offset(skip)
+
+    result = await db.execute(query.limit(limit + 1))
+    items = result.all() if rows else result.scalars().all()
+    if len(items) > limit > 0:
+        items = items[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(items[-1], keys[-1].key)])
+    return items
@@ -0,0 +1,97 @@
+"""Throughput of database-backed reads at rising concurrency.
+
+Each virtual user fetches a seeded order or a supplier's order list, in
+a loop for --duration seconds per concurrency level, while GET /health
+is polled. With blocking database calls on the event loop, /health waits
+behind the queries and a worker can stall outright once its connection
+pool is exhausted; with the async engine requests queue for connections
+without blocking the loop:
+
+    uvicorn app.main:app --workers 1 &
+    python scripts/bench_concurrency.py --concurrency 1 8 32 64 --duration 10
+
+Only endpoints that predate the async engine are used, so the same run
+can be repeated against an older checkout for comparison. IDs come from
+the manifest written by scripts/seed_data.py.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from pathlib import Path
+
+import httpx
+
+API = "/api/v1"
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile"""
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def request(client, manifest, rng):
+    if rng.random() < 0.5:
+        return client.get(f"{API}/orders/{rng.randint(1, manifest['orders'])}")
+    return client.get(f"{API}/orders/", params={"supplier_id": rng.randint(1, manifest["suppliers"]), "limit": 20})
+
+async def virtual_user(client, manifest, rng, latencies, statuses, deadline):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            status = (await request(client, manifest, rng)).status_code
+        except httpx.HTTPError as exc:
+            status = type(exc).__name__
+        statuses[status] += 1
+        if status == 200:
+            latencies.append(time.perf_counter() - started)
+
+async def poll_health(client, latencies, deadline, interval: float):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            await client.get("/health")
+        except httpx.HTTPError:
+            pass
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+
+async def run_level(args, manifest, concurrency: int) -> dict:
+    latencies, health, statuses = [], [], Counter()
+    limits = httpx.Limits(max_connections=concurrency + 1, max_keepalive_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(
+            poll_health(client, health, deadline, 0.05),
+            *(virtual_user(client, manifest, random.Random(args.seed + i), latencies, statuses, deadline)
+              for i in range(concurrency))
+        )
+    return {"latencies": sorted(latencies), "health": sorted(health), "statuses": statuses}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--manifest", type=Path, default=Path("seed_manifest.json"))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    manifest = json.loads(args.manifest.read_text())
+
+    print(f"\n{'users':>6} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7} "
+          f"{'health p50':>11} {'health p95':>11}")
+    for concurrency in args.concurrency:
+        result = asyncio.run(run_level(args, manifest, concurrency))
+        values, health, statuses = result["latencies"], result["health"], result["statuses"]
+        errors = sum(count for status, count in statuses.items() if status != 200)
+        if not values:
+            print(f"{concurrency:>6} {0:>9} {'':>8} {'':>8} {'':>8} {errors:>7}")
+            continue
+        print(f"{concurrency:>6} {len(values):>9} {len(values) / args.duration:>8.1f} "
+              f"{percentile(values, 0.5) * 1000:>8.1f} {percentile(values, 0.95) * 1000:>8.1f} {errors:>7} "
+              f"{percentile(health, 0.5) * 1000:>11.1f} {percentile(health, 0.95) * 1000:>11.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Throughput benchmark for the image variant pipeline.
+
+Generates a batch of synthetic JPEG photos, then renders every variant of
+each on a process pool and reports images per second for each pool size:
+
+    python scripts/bench_image_variants.py --count 10000 --workers 1 2 4 8
+
+Run from the backend directory. Sources are generated once into --dir and
+reused on later runs.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.image_variants import VARIANT_SIZES, render_variant  # noqa: E402
+
+def make_source(path: Path, width: int, height: int, seed: int):
+    from PIL import Image, ImageDraw
+
+    image = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    draw = ImageDraw.Draw(image)
+    for i in range(20):
+        x, y = (seed * 7919 + i * 104729) % width, (seed * 6151 + i * 15485863) % height
+        draw.ellipse((x, y, x + width // 8, y + height // 8), fill=((seed + i * 40) % 256, (i * 90) % 256, 120))
+    image.save(path, "JPEG", quality=90)
+
+def ensure_sources(directory: Path, count: int, width: int, height: int) -> list:
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = [directory / f"source-{i:05d}.jpg" for i in range(count)]
+    missing = [i for i, path in enumerate(paths) if not path.exists()]
+    if missing:
+        print(f"Generating {len(missing)} {width}x{height} source images in {directory}...")
+        with ProcessPoolExecutor() as pool:
+            list(pool.map(make_source, [paths[i] for i in missing], [width] * len(missing),
+                          [height] * len(missing), missing, chunksize=32))
+    return paths
+
+def render_all(source: Path, out_dir: Path, quality: int) -> int:
+    written = 0
+    for size, max_edge in VARIANT_SIZES.items():
+        written += render_variant(str(source), str(out_dir / f"{source.stem}-{size}.webp"), max_edge, quality)
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[os.cpu_count() or 1])
+    parser.add_argument("--width", type=int, default=3000)
+    parser.add_argument("--height", type=int, default=2000)
+    parser.add_argument("--quality", type=int, default=80)
+    parser.add_argument("--dir", type=Path, default=Path(tempfile.gettempdir()) / "scp-image-bench")
+    args = parser.parse_args()
+
+    sources = ensure_sources(args.dir / "sources", args.count, args.width, args.height)
+    source_bytes = sum(path.stat().st_size for path in sources)
+    print(f"{len(sources)} sources, {source_bytes / len(sources) / 1024:.0f} KiB average; "
+          f"variants: {', '.join(f'{name}={edge}px' for name, edge in VARIANT_SIZES.items())}")
+
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory(dir=args.dir) as out_dir:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                started = time.perf_counter()
+                written = sum(pool.map(render_all, sources, [Path(out_dir)] * len(sources),
+                                       [args.quality] * len(sources), chunksize=16))
+                elapsed = time.perf_counter() - started
+        print(f"workers={workers:<3} {len(sources) / elapsed:8.1f} images/s  {elapsed:7.1f}s total  "
+              f"{written / len(sources) / 1024:6.1f} KiB of variants per image")
+
+if __name__ == "__main__":
+    main()
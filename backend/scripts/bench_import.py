@@ -0,0 +1,93 @@
+"""Time and peak memory of a bulk product import.
+
+Writes a synthetic catalog of --rows rows, then imports it twice into one
+supplier: the first pass inserts every product, the second updates them.
+Each pass reports rows per second and how far the process's peak RSS
+grew, which should stay flat as --rows grows since the file is read and
+upserted a chunk at a time:
+
+    python scripts/bench_import.py --rows 100000 --format csv
+
+Run from the backend directory against DATABASE_URL (Postgres or SQLite).
+A new supplier is created for the run unless --supplier-id is given.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.models import *  # noqa: E402,F401,F403 - registers every table
+from app.models.base import AsyncSessionLocal, Base, async_engine, engine  # noqa: E402
+from app.models.supplier import Supplier  # noqa: E402
+from app.services.product_import import import_products  # noqa: E402
+
+FIELDS = ["sku", "name", "description", "price", "unit", "stock", "minimum_order_quantity", "lead_time"]
+
+def catalog_row(number: int, update: bool) -> dict:
+    return {
+        "sku": f"BENCH-{number:07d}",
+        "name": f"Bench product {number}",
+        "description": f"Synthetic product {number} for the import benchmark",
+        "price": f"{1 + number % 997 + (0.5 if update else 0):.2f}",
+        "unit": "kg",
+        "stock": number % 500,
+        "minimum_order_quantity": 1 + number % 5,
+        "lead_time": "2-3 days",
+    }
+
+def write_catalog(path: Path, rows: int, fmt: str, update: bool):
+    with path.open("w", newline="") as file:
+        if fmt == "csv":
+            writer = csv.DictWriter(file, fieldnames=FIELDS)
+            writer.writeheader()
+            for number in range(rows):
+                writer.writerow(catalog_row(number, update))
+        else:
+            for number in range(rows):
+                file.write(json.dumps(catalog_row(number, update)) + "\n")
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+async def run(args):
+    Base.metadata.create_all(bind=engine)
+    async with AsyncSessionLocal() as db:
+        supplier_id = args.supplier_id
+        if supplier_id is None:
+            supplier = Supplier(CompanyName="Import benchmark")
+            db.add(supplier)
+            await db.commit()
+            supplier_id = supplier.SupplierID
+
+        with tempfile.TemporaryDirectory() as directory:
+            print(f"\n{'pass':<8} {'rows':>8} {'failed':>7} {'seconds':>8} {'rows/s':>9} {'peak RSS +MB':>13}")
+            for name, update in (("insert", False), ("update", True)):
+                path = Path(directory) / f"catalog.{args.format}"
+                write_catalog(path, args.rows, args.format, update)
+                before = peak_rss_mb()
+                started = time.perf_counter()
+                with path.open("rb") as file:
+                    result = await import_products(db, supplier_id, file, args.format)
+                elapsed = time.perf_counter() - started
+                print(f"{name:<8} {result.upserted:>8} {result.failed:>7} {elapsed:>8.2f} "
+                      f"{result.upserted / elapsed:>9.0f} {peak_rss_mb() - before:>13.1f}")
+    await async_engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    parser.add_argument("--supplier-id", type=int)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
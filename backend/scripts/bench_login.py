@@ -0,0 +1,93 @@
+"""Measure logins per second, and event loop latency while logins run.
+
+Each virtual user logs a seeded consumer in, in a loop, for --duration
+seconds per concurrency level. Meanwhile GET /health is polled to show
+that bcrypt runs off the event loop: its latency should stay flat while
+logins saturate the hashing pool, and requests beyond
+PASSWORD_HASH_MAX_PENDING should get 503 instead of queueing:
+
+    uvicorn app.main:app --workers 1 &
+    python scripts/bench_login.py --concurrency 1 4 16 64 --duration 10
+
+Users come from the manifest written by scripts/seed_data.py.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from pathlib import Path
+
+import httpx
+
+API = "/api/v1"
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile"""
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+async def virtual_user(client, manifest, rng, latencies, statuses, deadline):
+    while time.perf_counter() < deadline:
+        consumer = rng.randint(1, manifest["consumers"])
+        started = time.perf_counter()
+        try:
+            response = await client.post(f"{API}/auth/login", data={
+                "username": f"consumer{consumer}.0@seed.example", "password": manifest["password"]
+            })
+            status = response.status_code
+        except httpx.HTTPError as exc:
+            status = type(exc).__name__
+        statuses[status] += 1
+        if status == 200:
+            latencies.append(time.perf_counter() - started)
+        elif status == 503:
+            await asyncio.sleep(0.05)
+
+async def poll_health(client, latencies, deadline, interval: float):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await client.get("/health")
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+
+async def run_level(args, manifest, concurrency: int) -> dict:
+    latencies, health, statuses = [], [], Counter()
+    limits = httpx.Limits(max_connections=concurrency + 1, max_keepalive_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(
+            poll_health(client, health, deadline, 0.05),
+            *(virtual_user(client, manifest, random.Random(args.seed + i), latencies, statuses, deadline)
+              for i in range(concurrency))
+        )
+    return {"latencies": sorted(latencies), "health": sorted(health), "statuses": statuses}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--manifest", type=Path, default=Path("seed_manifest.json"))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    manifest = json.loads(args.manifest.read_text())
+
+    print(f"\n{'users':>6} {'logins':>7} {'logins/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'503s':>6} {'other':>6} "
+          f"{'health p50':>11} {'health p95':>11}")
+    for concurrency in args.concurrency:
+        result = asyncio.run(run_level(args, manifest, concurrency))
+        values, health, statuses = result["latencies"], result["health"], result["statuses"]
+        other = sum(count for status, count in statuses.items() if status not in (200, 503))
+        if not values:
+            print(f"{concurrency:>6} {0:>7} {'':>9} {'':>8} {'':>8} {statuses[503]:>6} {other:>6}")
+            continue
+        print(f"{concurrency:>6} {len(values):>7} {len(values) / args.duration:>9.1f} "
+              f"{percentile(values, 0.5) * 1000:>8.1f} {percentile(values, 0.95) * 1000:>8.1f} "
+              f"{statuses[503]:>6} {other:>6} "
+              f"{percentile(health, 0.5) * 1000:>11.1f} {percentile(health, 0.95) * 1000:>11.1f}")
+
+if __name__ == "__main__":
+    main()
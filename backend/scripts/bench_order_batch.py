@@ -0,0 +1,118 @@
+"""Compare placing a basket of orders one call at a time against POST /orders/batch.
+
+A basket is one order to each of up to --suppliers linked suppliers, the
+morning run of a hotel purchasing desk. Each virtual user places baskets in a loop,
+alternating between one POST /orders/ call per order and a single batch
+call. Throughput is orders per second of time spent in each mode:
+
+    uvicorn app.main:app --workers 4 &
+    python scripts/bench_order_batch.py --suppliers 15 --concurrency 8 --duration 30
+
+IDs come from the manifest written by scripts/seed_data.py. Every order
+decrements stock, so seed with enough stock (or reseed) between long runs.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+API = "/api/v1"
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile"""
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def basket(manifest: dict, links_by_consumer: dict, rng: random.Random, suppliers: int):
+    """(consumer_staff_id, orders) for one consumer ordering from `suppliers` suppliers"""
+    consumer_id = rng.choice(sorted(links_by_consumer))
+    # Orders need an approved link, so consumers with fewer links than a
+    # real desk (as in the small presets) place smaller baskets
+    linked = links_by_consumer[consumer_id]
+    per = manifest["products_per_supplier"]
+    orders = []
+    for supplier_id in linked[:suppliers]:
+        products = range((supplier_id - 1) * per + 1, supplier_id * per + 1)
+        orders.append({
+            "supplier_id": supplier_id,
+            "consumer_id": consumer_id,
+            "items": [
+                {"product_id": product_id, "quantity": rng.randint(1, 3)}
+                for product_id in rng.sample(products, min(rng.randint(2, 6), len(products)))
+            ]
+        })
+    return (consumer_id - 1) * manifest["staff_per_company"] + 1, orders
+
+async def place_sequential(client, staff_id: int, orders: list) -> bool:
+    for order in orders:
+        response = await client.post(f"{API}/orders/", params={"consumer_staff_id": staff_id}, json=order)
+        if response.status_code != 201:
+            return False
+    return True
+
+async def place_batch(client, staff_id: int, orders: list) -> bool:
+    response = await client.post(f"{API}/orders/batch", params={"consumer_staff_id": staff_id}, json={"orders": orders})
+    return response.status_code == 201
+
+async def virtual_user(client, manifest, links_by_consumer, args, rng, results, deadline):
+    modes = [("sequential", place_sequential), ("batch", place_batch)]
+    turn = rng.randrange(2)
+    while time.perf_counter() < deadline:
+        name, place = modes[turn % 2]
+        turn += 1
+        staff_id, orders = basket(manifest, links_by_consumer, rng, args.suppliers)
+        started = time.perf_counter()
+        try:
+            ok = await place(client, staff_id, orders)
+        except httpx.HTTPError:
+            ok = False
+        results[name]["latencies" if ok else "failures"].append(time.perf_counter() - started)
+        results[name]["orders"] += len(orders) if ok else 0
+
+async def run(args) -> dict:
+    manifest = json.loads(args.manifest.read_text())
+    links_by_consumer = defaultdict(list)
+    for _, supplier_id, consumer_id, _ in manifest["approved_links"]:
+        links_by_consumer[consumer_id].append(supplier_id)
+
+    results = defaultdict(lambda: {"latencies": [], "failures": [], "orders": 0})
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(*(
+            virtual_user(client, manifest, links_by_consumer, args, random.Random(args.seed + i), results, deadline)
+            for i in range(args.concurrency)
+        ))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--manifest", type=Path, default=Path("seed_manifest.json"))
+    parser.add_argument("--suppliers", type=int, default=15, help="Orders per basket")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(f"\n{'mode':<12} {'baskets':>8} {'failed':>7} {'orders/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for name in ("sequential", "batch"):
+        row = results[name]
+        values = sorted(row["latencies"])
+        if not values:
+            print(f"{name:<12} {0:>8} {len(row['failures']):>7}")
+            continue
+        # Users alternate modes, so scale by the time they spent in this one
+        busy = sum(values + row["failures"]) / args.concurrency
+        print(f"{name:<12} {len(values):>8} {len(row['failures']):>7} {row['orders'] / busy:>9.1f} "
+              f"{percentile(values, 0.5) * 1000:>8.1f} {percentile(values, 0.95) * 1000:>8.1f}")
+
+if __name__ == "__main__":
+    main()
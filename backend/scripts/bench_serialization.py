@@ -0,0 +1,101 @@
+"""Microbenchmark for list endpoint serialization.
+
+For each list endpoint, times one page fetched and rendered the old way
+(ORM objects validated through response_model, rendered by JSONResponse)
+against the row path (selected columns, a precompiled TypeAdapter and
+ORJSONResponse), and checks both produce the same bytes:
+
+    python scripts/bench_serialization.py --limit 100 --iterations 200
+
+Run from the backend directory against a seeded DATABASE_URL
+(see scripts/seed_data.py).
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi import Response  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+from app.api.v1.endpoints.chat import message_rows  # noqa: E402
+from app.api.v1.endpoints.consumers import consumer_rows  # noqa: E402
+from app.api.v1.endpoints.links import link_rows  # noqa: E402
+from app.api.v1.endpoints.products import product_rows  # noqa: E402
+from app.api.v1.endpoints.suppliers import supplier_rows  # noqa: E402
+from app.api.v1.endpoints.users import user_rows  # noqa: E402
+from app.models.base import AsyncSessionLocal, async_engine  # noqa: E402
+from app.models.chat import Message  # noqa: E402
+from app.models.consumer import Consumer  # noqa: E402
+from app.models.link import Link  # noqa: E402
+from app.models.product import Product  # noqa: E402
+from app.models.supplier import Supplier  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.schemas.chat import MessageResponse  # noqa: E402
+from app.schemas.consumer import ConsumerResponse  # noqa: E402
+from app.schemas.link import LinkResponse  # noqa: E402
+from app.schemas.product import ProductResponse  # noqa: E402
+from app.schemas.supplier import SupplierResponse  # noqa: E402
+from app.schemas.user import UserResponse  # noqa: E402
+from app.utils.pagination import paginate  # noqa: E402
+
+# Endpoint -> (model, response schema, row serializer, sort keys)
+ENDPOINTS = {
+    "GET /users": (User, UserResponse, user_rows, [User.UserID]),
+    "GET /suppliers": (Supplier, SupplierResponse, supplier_rows, [Supplier.SupplierID]),
+    "GET /consumers": (Consumer, ConsumerResponse, consumer_rows, [Consumer.ConsumerID]),
+    "GET /links": (Link, LinkResponse, link_rows, [Link.LinkID]),
+    "GET /products": (Product, ProductResponse, product_rows, [Product.ProductID]),
+    "GET /chat/{id}/messages": (Message, MessageResponse, message_rows, [Message.SentAt, Message.MessageID]),
+}
+
+async def orm_page(model, schema, keys, limit: int, field) -> bytes:
+    async with AsyncSessionLocal() as db:
+        items = await paginate(db, select(model), keys, Response(), limit=limit)
+        content = await serialize_response(field=field, response_content=items)
+    return JSONResponse(content).body
+
+async def row_page(model, serializer, keys, limit: int) -> bytes:
+    async with AsyncSessionLocal() as db:
+        rows = await paginate(db, serializer.select(), keys, Response(), limit=limit, rows=True)
+    return serializer.response(rows).body
+
+async def timed(func, iterations: int) -> float:
+    """Milliseconds per call, after one warm-up call"""
+    await func()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await func()
+    return (time.perf_counter() - started) * 1000 / iterations
+
+async def run(limit: int, iterations: int, only: List[str]):
+    print(f"{'endpoint':<26}{'rows':>6}{'orm ms':>10}{'row ms':>10}{'speedup':>9}  identical")
+    for name, (model, schema, serializer, keys) in ENDPOINTS.items():
+        if only and not any(part in name for part in only):
+            continue
+        field = create_response_field(name=f"Response_{schema.__name__}", type_=List[schema])
+        orm = lambda: orm_page(model, schema, keys, limit, field)  # noqa: E731
+        row = lambda: row_page(model, serializer, keys, limit)  # noqa: E731
+        orm_body, row_body = await orm(), await row()
+        rows = len(serializer.adapter.validate_json(row_body))
+        orm_ms = await timed(orm, iterations)
+        row_ms = await timed(row, iterations)
+        print(f"{name:<26}{rows:>6}{orm_ms:>10.2f}{row_ms:>10.2f}{orm_ms / row_ms:>8.1f}x  {orm_body == row_body}")
+    await async_engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=100, help="Rows per page")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--only", nargs="*", default=[], help="Substrings of endpoint names to run")
+    args = parser.parse_args()
+    asyncio.run(run(args.limit, args.iterations, args.only))
+
+if __name__ == "__main__":
+    main()
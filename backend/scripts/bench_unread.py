@@ -0,0 +1,120 @@
+"""Latency of unread counts and read receipts in a long chat.
+
+Fills one chat with --messages messages from two participants, then times
+the chat endpoints in-process (no server needed) with the read watermark
+near the end of the chat, as it is for an active reader:
+
+    python scripts/bench_unread.py --messages 100000 --repeats 200
+
+Run from the backend directory against DATABASE_URL (Postgres or SQLite).
+A new supplier, consumer, link and chat are created for the run.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import *  # noqa: E402,F401,F403 - registers every table
+from app.models.base import AsyncSessionLocal, async_engine  # noqa: E402
+from app.models.chat import Chat, Message  # noqa: E402
+from app.models.consumer import Consumer  # noqa: E402
+from app.models.link import Link, LinkStatus  # noqa: E402
+from app.models.supplier import Supplier  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.utils.pagination import encode_cursor  # noqa: E402
+
+BATCH = 10_000
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile"""
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+async def create_chat(messages: int):
+    """(chat_id, sender, reader, message IDs) for a fresh chat of `messages` messages"""
+    async with AsyncSessionLocal() as db:
+        stamp = time.time_ns()
+        supplier, consumer = Supplier(CompanyName="Unread benchmark"), Consumer(CompanyName="Unread benchmark")
+        sender = User(Name="Sender", Email=f"sender-{stamp}@bench.test", Password="x")
+        reader = User(Name="Reader", Email=f"reader-{stamp}@bench.test", Password="x")
+        db.add_all([supplier, consumer, sender, reader])
+        await db.flush()
+        link = Link(SupplierID=supplier.SupplierID, ConsumerID=consumer.ConsumerID, Status=LinkStatus.APPROVED)
+        db.add(link)
+        await db.flush()
+        chat = Chat(LinkID=link.LinkID)
+        db.add(chat)
+        await db.flush()
+        # Mostly the sender, with the reader's replies mixed in, a minute apart
+        first = datetime.now(timezone.utc) - timedelta(minutes=messages)
+        for start in range(0, messages, BATCH):
+            await db.execute(insert(Message), [
+                {
+                    "ChatID": chat.ChatID,
+                    "UserID": (reader if number % 5 == 0 else sender).UserID,
+                    "Content": f"Message {number}",
+                    "SentAt": first + timedelta(minutes=number),
+                }
+                for number in range(start, min(start + BATCH, messages))
+            ])
+        await db.commit()
+        message_ids = (await db.scalars(
+            select(Message.MessageID).where(Message.ChatID == chat.ChatID).order_by(Message.MessageID)
+        )).all()
+        return chat.ChatID, sender, reader, message_ids
+
+async def time_calls(name: str, repeats: int, call) -> list:
+    latencies = []
+    for i in range(repeats):
+        started = time.perf_counter()
+        response = await call(i)
+        latencies.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            raise SystemExit(f"{name}: HTTP {response.status_code} {response.text}")
+    return sorted(latencies)
+
+async def run(args):
+    print(f"Creating a chat with {args.messages} messages...")
+    chat_id, sender, reader, message_ids = await create_chat(args.messages)
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": reader.Email, "user_id": reader.UserID})}
+    # Active readers are near the end; each receipt moves the watermark forward
+    watermarks = message_ids[-args.repeats - 50:]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        base = f"/api/v1/chat/{chat_id}"
+        results = [
+            ("unread (no receipt)", await time_calls("unread", args.repeats, lambda i: client.get(f"{base}/unread", headers=headers))),
+            ("read receipt", await time_calls("read", args.repeats, lambda i: client.post(
+                f"{base}/read", json={"last_message_id": watermarks[i]}, headers=headers
+            ))),
+            ("unread", await time_calls("unread", args.repeats, lambda i: client.get(f"{base}/unread", headers=headers))),
+            # The newest page, with IsRead derived from the watermarks
+            ("messages page", await time_calls("messages", args.repeats, lambda i: client.get(
+                f"{base}/messages", params={"cursor": encode_cursor([message_ids[-101]]), "limit": 100}
+            ))),
+        ]
+    await async_engine.dispose()
+
+    print(f"\n{'call':<20} {'calls':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for name, latencies in results:
+        print(f"{name:<20} {len(latencies):>6} {percentile(latencies, 0.5) * 1000:>8.2f} "
+              f"{percentile(latencies, 0.95) * 1000:>8.2f} {latencies[-1] * 1000:>8.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Fan-out of chat messages to many WebSocket subscribers of one chat.
+
+Opens --sockets WebSockets on one seeded chat (as its staff, several tabs
+each), then posts --messages messages at --rate per second and measures,
+per delivery, the time from the POST being sent to the message arriving on
+each socket:
+
+    uvicorn app.main:app --workers 1 &
+    python scripts/bench_ws_fanout.py --sockets 10 100 500 --messages 50
+
+Run with several workers and BROKER_BACKEND=postgres to include the
+LISTEN/NOTIFY hop. Users and the chat come from the manifest written by
+scripts/seed_data.py.
+"""
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+import httpx
+import websockets
+
+API = "/api/v1"
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile"""
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+async def login(client, email: str, password: str) -> str:
+    response = await client.post(f"{API}/auth/login", data={"username": email, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+async def listen(socket, sent_at: dict, latencies: list, expected: int, closes: list):
+    received = 0
+    try:
+        while received < expected:
+            message = json.loads(await socket.recv())
+            arrived = time.perf_counter()
+            latencies.append(arrived - sent_at[message["Content"]])
+            received += 1
+    except websockets.ConnectionClosed as exc:
+        closes.append(exc.rcvd.code if exc.rcvd else None)
+
+async def run_level(args, manifest, sockets: int) -> dict:
+    _, supplier_id, consumer_id, chat_id = manifest["approved_links"][0]
+    emails = [f"supplier{supplier_id}.{k}@seed.example" for k in range(manifest["staff_per_company"])]
+    emails += [f"consumer{consumer_id}.{k}@seed.example" for k in range(manifest["staff_per_company"])]
+    ws_base = args.base_url.replace("http", "ws", 1)
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout) as client:
+        tokens = [await login(client, email, manifest["password"]) for email in emails]
+        # Handshakes are opened a batch at a time so a large level measures
+        # delivery rather than the accept backlog
+        started, connections = time.perf_counter(), []
+        for batch in range(0, sockets, args.connect_batch):
+            connections += await asyncio.gather(*(
+                websockets.connect(
+                    f"{ws_base}{API}/chat/{chat_id}/ws?token={tokens[i % len(tokens)]}",
+                    max_queue=None, open_timeout=args.timeout
+                )
+                for i in range(batch, min(batch + args.connect_batch, sockets))
+            ))
+        connect_time = time.perf_counter() - started
+
+        sent_at, latencies, closes = {}, [], []
+        listeners = [
+            asyncio.create_task(listen(socket, sent_at, latencies, args.messages, closes)) for socket in connections
+        ]
+        headers = {"Authorization": f"Bearer {tokens[0]}"}
+        for number in range(args.messages):
+            content = f"fanout {sockets}/{number} {time.time_ns()}"
+            sent_at[content] = time.perf_counter()
+            response = await client.post(
+                f"{API}/chat/messages", json={"chat_id": chat_id, "content": content}, headers=headers
+            )
+            response.raise_for_status()
+            await asyncio.sleep(1 / args.rate)
+        await asyncio.wait(listeners, timeout=args.timeout)
+        for task in listeners:
+            task.cancel()
+        await asyncio.gather(*(socket.close() for socket in connections), return_exceptions=True)
+    return {"latencies": sorted(latencies), "connect": connect_time, "closes": closes}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--manifest", type=Path, default=Path("seed_manifest.json"))
+    parser.add_argument("--sockets", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=10, help="Messages posted per second")
+    parser.add_argument("--connect-batch", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=30)
+    args = parser.parse_args()
+    manifest = json.loads(args.manifest.read_text())
+
+    print(f"\n{'sockets':>8} {'connect s':>10} {'delivered':>10} {'expected':>9} {'closed':>7} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for sockets in args.sockets:
+        result = asyncio.run(run_level(args, manifest, sockets))
+        values = result["latencies"]
+        line = (f"{sockets:>8} {result['connect']:>10.2f} {len(values):>10} {sockets * args.messages:>9} "
+                f"{len(result['closes']):>7}")
+        if values:
+            line += (f" {percentile(values, 0.5) * 1000:>8.1f} {percentile(values, 0.95) * 1000:>8.1f} "
+                     f"{percentile(values, 0.99) * 1000:>8.1f} {values[-1] * 1000:>8.1f}")
+        print(line)
+
+if __name__ == "__main__":
+    main()
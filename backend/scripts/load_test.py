@@ -0,0 +1,375 @@
+"""Replay a realistic request mix against a running API and report latencies.
+
+Every router in api_router gets traffic, weighted roughly by how often the
+web and mobile clients call it. IDs come from the manifest written by
+scripts/seed_data.py, so run that first against the same database:
+
+    uvicorn app.main:app --workers 4 &
+    python scripts/load_test.py --duration 60 --concurrency 32 --compare latest
+
+Prints p50/p95/p99 latency, RPS and error counts per endpoint, and stores
+the run as JSON under --results-dir, tagged with the current git commit.
+--compare diffs against an earlier run (a path, or "latest").
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+API = "/api/v1"
+REGRESSION_THRESHOLD = 1.10  # p95 more than 10% slower than the baseline
+
+class Context:
+    """Seed manifest plus state shared by all virtual users"""
+
+    def __init__(self, manifest: dict, tokens: list):
+        self.m = manifest
+        self.tokens = tokens
+        self.links = manifest["approved_links"]
+        self.suppliers_of = defaultdict(list)  # Consumer -> linked suppliers
+        for _, supplier_id, consumer_id, _ in self.links:
+            self.suppliers_of[consumer_id].append(supplier_id)
+        self.digests = []
+
+    def products_of(self, supplier_id: int) -> range:
+        per = self.m["products_per_supplier"]
+        return range((supplier_id - 1) * per + 1, supplier_id * per + 1)
+
+    def auth(self, rng) -> dict:
+        return {"Authorization": f"Bearer {rng.choice(self.tokens)}"}
+
+# Each scenario returns (endpoint label, request coroutine). Labels are the
+# route templates so results group the same way as /metrics.
+def scenario(weight: float):
+    def register(func):
+        func.weight = weight
+        return func
+    return register
+
+@scenario(3)
+def auth_me(client, ctx, rng):
+    return "GET /auth/me", client.get(f"{API}/auth/me", headers=ctx.auth(rng))
+
+@scenario(0.5)
+def auth_login(client, ctx, rng):
+    c = rng.randint(1, ctx.m["consumers"])
+    return "POST /auth/login", client.post(f"{API}/auth/login", data={
+        "username": f"consumer{c}.0@seed.example", "password": ctx.m["password"]
+    })
+
+@scenario(2)
+def users_get(client, ctx, rng):
+    return "GET /users/{user_id}", client.get(f"{API}/users/{rng.randint(1, ctx.m['users'])}")
+
+@scenario(0.5)
+def users_list(client, ctx, rng):
+    return "GET /users/", client.get(f"{API}/users/", params={"limit": 50})
+
+@scenario(4)
+def suppliers_get(client, ctx, rng):
+    return "GET /suppliers/{supplier_id}", client.get(f"{API}/suppliers/{rng.randint(1, ctx.m['suppliers'])}")
+
+@scenario(1)
+def suppliers_list(client, ctx, rng):
+    return "GET /suppliers/", client.get(f"{API}/suppliers/", params={"limit": 50})
+
+@scenario(2)
+def supplier_sales_daily(client, ctx, rng):
+    return "GET /suppliers/{supplier_id}/sales/daily", client.get(
+        f"{API}/suppliers/{rng.randint(1, ctx.m['suppliers'])}/sales/daily"
+    )
+
+@scenario(1)
+def supplier_top_products(client, ctx, rng):
+    return "GET /suppliers/{supplier_id}/sales/top-products", client.get(
+        f"{API}/suppliers/{rng.randint(1, ctx.m['suppliers'])}/sales/top-products"
+    )
+
+@scenario(3)
+def consumers_get(client, ctx, rng):
+    return "GET /consumers/{consumer_id}", client.get(f"{API}/consumers/{rng.randint(1, ctx.m['consumers'])}")
+
+@scenario(0.5)
+def consumers_list(client, ctx, rng):
+    return "GET /consumers/", client.get(f"{API}/consumers/", params={"limit": 50})
+
+@scenario(1)
+def links_list(client, ctx, rng):
+    return "GET /links/", client.get(f"{API}/links/", params={"limit": 50})
+
+@scenario(10)
+def products_by_supplier(client, ctx, rng):
+    _, supplier_id, _, _ = rng.choice(ctx.links)
+    return "GET /products/", client.get(f"{API}/products/", params={"supplier_id": supplier_id, "limit": 50})
+
+@scenario(10)
+def products_get(client, ctx, rng):
+    return "GET /products/{product_id}", client.get(f"{API}/products/{rng.randint(1, ctx.m['products'])}")
+
+@scenario(5)
+def products_search(client, ctx, rng):
+    _, _, consumer_id, _ = rng.choice(ctx.links)
+    term = rng.choice(["tomato", "chicken", "salmon", "rice", "oil", "butter", "organic", "smoked", "potatos"])
+    return "GET /products/search", client.get(f"{API}/products/search", params={
+        "q": term, "consumer_id": consumer_id, "limit": 20
+    })
+
+@scenario(0.5)
+def products_update(client, ctx, rng):
+    return "PATCH /products/{product_id}", client.patch(
+        f"{API}/products/{rng.randint(1, ctx.m['products'])}", json={"stock": rng.randint(1_000, 100_000)}
+    )
+
+@scenario(5)
+def orders_by_consumer(client, ctx, rng):
+    return "GET /orders/", client.get(f"{API}/orders/", params={
+        "consumer_id": rng.randint(1, ctx.m["consumers"]), "limit": 20
+    })
+
+@scenario(5)
+def orders_get(client, ctx, rng):
+    return "GET /orders/{order_id}", client.get(f"{API}/orders/{rng.randint(1, ctx.m['orders'])}")
+
+@scenario(3)
+def orders_create(client, ctx, rng):
+    _, supplier_id, consumer_id, _ = rng.choice(ctx.links)
+    products = ctx.products_of(supplier_id)
+    items = [
+        {"product_id": product_id, "quantity": rng.randint(1, 5)}
+        for product_id in rng.sample(products, min(rng.randint(1, 4), len(products)))
+    ]
+    staff_id = (consumer_id - 1) * ctx.m["staff_per_company"] + 1
+    return "POST /orders/", client.post(
+        f"{API}/orders/", params={"consumer_staff_id": staff_id},
+        json={"supplier_id": supplier_id, "consumer_id": consumer_id, "items": items}
+    )
+
+@scenario(0.5)
+def orders_create_batch(client, ctx, rng):
+    _, _, consumer_id, _ = rng.choice(ctx.links)
+    orders = [
+        {
+            "supplier_id": supplier_id,
+            "consumer_id": consumer_id,
+            "items": [{"product_id": rng.choice(ctx.products_of(supplier_id)), "quantity": rng.randint(1, 5)}]
+        }
+        for supplier_id in ctx.suppliers_of[consumer_id]
+    ]
+    staff_id = (consumer_id - 1) * ctx.m["staff_per_company"] + 1
+    return "POST /orders/batch", client.post(
+        f"{API}/orders/batch", params={"consumer_staff_id": staff_id}, json={"orders": orders}
+    )
+
+@scenario(1)
+def orders_update(client, ctx, rng):
+    return "PATCH /orders/{order_id}", client.patch(
+        f"{API}/orders/{rng.randint(1, ctx.m['orders'])}", json={"status": rng.choice(["Accepted", "In Progress"])}
+    )
+
+@scenario(6)
+def chat_messages(client, ctx, rng):
+    _, _, _, chat_id = rng.choice(ctx.links)
+    return "GET /chat/{chat_id}/messages", client.get(f"{API}/chat/{chat_id}/messages", params={"limit": 50})
+
+@scenario(3)
+def chat_send(client, ctx, rng):
+    _, _, _, chat_id = rng.choice(ctx.links)
+    return "POST /chat/messages", client.post(
+        f"{API}/chat/messages", headers=ctx.auth(rng), json={"chat_id": chat_id, "content": "Load test message"}
+    )
+
+@scenario(2)
+def chat_unread(client, ctx, rng):
+    _, _, _, chat_id = rng.choice(ctx.links)
+    return "GET /chat/{chat_id}/unread", client.get(f"{API}/chat/{chat_id}/unread", headers=ctx.auth(rng))
+
+@scenario(1)
+def chat_mark_read(client, ctx, rng):
+    _, _, _, chat_id = rng.choice(ctx.links)
+    return "POST /chat/{chat_id}/read", client.post(f"{API}/chat/{chat_id}/read", headers=ctx.auth(rng), json={})
+
+@scenario(1)
+def chat_for_link(client, ctx, rng):
+    link_id, _, _, _ = rng.choice(ctx.links)
+    return "GET /chat/link/{link_id}", client.get(f"{API}/chat/link/{link_id}")
+
+@scenario(2)
+def complaints_get(client, ctx, rng):
+    return "GET /complaints/{complaint_id}", client.get(
+        f"{API}/complaints/{rng.randint(1, max(ctx.m['complaints'], 1))}"
+    )
+
+@scenario(1)
+def complaints_by_order(client, ctx, rng):
+    return "GET /complaints/", client.get(f"{API}/complaints/", params={"order_id": rng.randint(1, ctx.m["orders"])})
+
+@scenario(0.5)
+def files_upload(client, ctx, rng):
+    body = rng.randbytes(rng.choice([4_096, 65_536, 524_288]))
+
+    async def upload():
+        response = await client.post(
+            f"{API}/files/", content=body, headers={**ctx.auth(rng), "Content-Type": "application/octet-stream"}
+        )
+        if response.status_code == 201:
+            ctx.digests.append(response.json()["digest"])
+        return response
+    return "POST /files/", upload()
+
+@scenario(2)
+def files_download(client, ctx, rng):
+    if not ctx.digests:
+        return files_upload(client, ctx, rng)
+    return "GET /files/{digest}", client.get(f"{API}/files/{rng.choice(ctx.digests)}")
+
+SCENARIOS = [value for value in list(globals().values()) if hasattr(value, "weight")]
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, label: str, seconds: float, status: str):
+        self.latencies[label].append(seconds)
+        self.statuses[label][status] += 1
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile"""
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+async def virtual_user(client, ctx, recorder, rng, deadline, measure_from):
+    weights = [scenario.weight for scenario in SCENARIOS]
+    while time.perf_counter() < deadline:
+        scenario = rng.choices(SCENARIOS, weights)[0]
+        label, request = scenario(client, ctx, rng)
+        started = time.perf_counter()
+        try:
+            response = await request
+            status = str(response.status_code)
+        except httpx.HTTPError as exc:
+            status = type(exc).__name__
+        if started >= measure_from:
+            recorder.record(label, time.perf_counter() - started, status)
+
+async def login_all(client, manifest, count) -> list:
+    tokens = []
+    for c in range(1, min(count, manifest["consumers"]) + 1):
+        response = await client.post(f"{API}/auth/login", data={
+            "username": f"consumer{c}.0@seed.example", "password": manifest["password"]
+        })
+        response.raise_for_status()
+        tokens.append(response.json()["access_token"])
+    return tokens
+
+def summarize(recorder: Recorder, duration: float) -> dict:
+    endpoints = {}
+    for label in sorted(recorder.latencies):
+        values = sorted(recorder.latencies[label])
+        statuses = dict(recorder.statuses[label])
+        errors = sum(count for status, count in statuses.items() if not status.isdigit() or status.startswith("5"))
+        endpoints[label] = {
+            "count": len(values),
+            "rps": len(values) / duration,
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p95_ms": percentile(values, 0.95) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+            "errors": errors,
+            "statuses": statuses,
+        }
+    total = sum(len(values) for values in recorder.latencies.values())
+    return {"total_requests": total, "total_rps": total / duration, "endpoints": endpoints}
+
+def print_report(summary: dict, baseline: dict = None):
+    print(f"\n{'endpoint':<48} {'count':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'err':>5}"
+          + ("  p95 vs baseline" if baseline else ""))
+    regressions = []
+    for label, row in summary["endpoints"].items():
+        line = (f"{label:<48} {row['count']:>7} {row['rps']:>8.1f} {row['p50_ms']:>8.1f} "
+                f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['errors']:>5}")
+        previous = (baseline or {}).get("endpoints", {}).get(label)
+        if previous and previous["p95_ms"] > 0:
+            ratio = row["p95_ms"] / previous["p95_ms"]
+            line += f"  {ratio:5.2f}x"
+            if ratio > REGRESSION_THRESHOLD:
+                line += "  REGRESSION"
+                regressions.append(label)
+        print(line)
+    print(f"\nTotal: {summary['total_requests']} requests, {summary['total_rps']:.1f} req/s")
+    return regressions
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def load_baseline(results_dir: Path, compare: str):
+    if compare == "latest":
+        runs = sorted(results_dir.glob("*.json"))
+        return json.loads(runs[-1].read_text()) if runs else None
+    return json.loads(Path(compare).read_text())
+
+async def run(args):
+    manifest = json.loads(args.manifest.read_text())
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        ctx = Context(manifest, await login_all(client, manifest, args.logins))
+        recorder = Recorder()
+        started = time.perf_counter()
+        measure_from = started + args.warmup
+        deadline = measure_from + args.duration
+        await asyncio.gather(*(
+            virtual_user(client, ctx, recorder, random.Random(args.seed + i), deadline, measure_from)
+            for i in range(args.concurrency)
+        ))
+    return summarize(recorder, args.duration)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--manifest", type=Path, default=Path("seed_manifest.json"))
+    parser.add_argument("--duration", type=float, default=60, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="Unmeasured seconds before the measurement")
+    parser.add_argument("--concurrency", type=int, default=32, help="Virtual users, each with one request in flight")
+    parser.add_argument("--logins", type=int, default=20, help="Distinct users whose tokens are shared")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--results-dir", type=Path, default=Path("benchmarks/results"))
+    parser.add_argument("--label", default="", help="Free-form note stored with the run")
+    parser.add_argument("--compare", help='Baseline run to diff against: a path or "latest"')
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.results_dir, args.compare) if args.compare else None
+    summary = asyncio.run(run(args))
+    regressions = print_report(summary, baseline)
+
+    commit = git_commit()
+    result = {
+        "commit": commit,
+        "label": args.label,
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "config": {key: str(value) for key, value in vars(args).items()},
+        "dataset": {key: value for key, value in json.loads(args.manifest.read_text()).items() if key != "approved_links"},
+        "host": {"cpus": os.cpu_count(), "platform": sys.platform},
+        **summary,
+    }
+    args.results_dir.mkdir(parents=True, exist_ok=True)
+    path = args.results_dir / f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{commit[:12]}.json"
+    path.write_text(json.dumps(result, indent=2))
+    print(f"Results written to {path}")
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
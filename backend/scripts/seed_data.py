@@ -0,0 +1,356 @@
+"""Seed a database with a realistic synthetic dataset.
+
+Generates suppliers, consumers, their staff users, links, chats, products,
+orders with items and stock reservations, messages, complaints and
+complaint logs, in FK order and with explicit IDs so rows can reference
+each other without reading back. Everything is derived from --seed, so a
+given preset always produces the same data.
+
+    python scripts/seed_data.py --scale medium --reset
+
+Run from the backend directory against DATABASE_URL (Postgres or SQLite).
+A manifest describing the dataset is written for scripts/load_test.py.
+Every seeded user's password is "password".
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import Integer, create_engine, text  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.security import get_password_hash  # noqa: E402
+from app.models import *  # noqa: E402,F401,F403 - registers every table
+from app.models.base import Base, AsyncSessionLocal  # noqa: E402
+from app.models.complaint import ComplaintPriority, ComplaintStatus  # noqa: E402
+from app.models.consumer import ConsumerType  # noqa: E402
+from app.models.consumer_staff import ConsumerStaffRole  # noqa: E402
+from app.models.inventory import ReservationStatus  # noqa: E402
+from app.models.link import LinkStatus  # noqa: E402
+from app.models.order import OrderStatus  # noqa: E402
+from app.models.supplier_staff import SupplierStaffRole  # noqa: E402
+from app.models.user import UserRole  # noqa: E402
+from app.services import sales_stats  # noqa: E402
+
+PASSWORD = "password"
+STAFF_PER_COMPANY = 2  # Staff (and users) per supplier and per consumer
+# Order status -> status of the stock reservations it still has
+RESERVED = {
+    OrderStatus.PENDING: ReservationStatus.HELD,
+    OrderStatus.ACCEPTED: ReservationStatus.COMMITTED,
+    OrderStatus.IN_PROGRESS: ReservationStatus.COMMITTED,
+}
+
+SCALES = {
+    "small": dict(suppliers=50, consumers=100, products_per_supplier=20, links_per_consumer=3,
+                  orders=5_000, messages=10_000, complaints=200),
+    "medium": dict(suppliers=1_000, consumers=2_000, products_per_supplier=200, links_per_consumer=5,
+                   orders=200_000, messages=500_000, complaints=5_000),
+    "large": dict(suppliers=5_000, consumers=10_000, products_per_supplier=400, links_per_consumer=5,
+                  orders=2_000_000, messages=5_000_000, complaints=50_000),
+}
+
+ADJECTIVES = ["Fresh", "Organic", "Frozen", "Smoked", "Aged", "Premium", "Local", "Wild", "Dried", "Whole"]
+FOODS = ["Tomatoes", "Chicken Breast", "Salmon Fillet", "Basmati Rice", "Mozzarella", "Olive Oil", "Potatoes",
+         "Beef Brisket", "Spinach", "Flour", "Butter", "Eggs", "Lemons", "Garlic", "Shrimp", "Lamb Shoulder",
+         "Parmesan", "Onions", "Mushrooms", "Cream", "Apples", "Carrots", "Honey", "Black Pepper", "Tofu"]
+UNITS = ["kg", "box", "piece", "litre", "crate", "tray"]
+CITIES = ["Almaty", "Astana", "Shymkent", "Karaganda", "Aktobe", "Taraz", "Pavlodar"]
+PHRASES = ["Can you deliver tomorrow morning?", "Price list attached.", "We are out of stock until Friday.",
+           "Please confirm the order.", "Invoice sent.", "Could you do a bulk discount?", "Delivered, thanks!",
+           "Driver is running 20 minutes late.", "Can we switch to weekly deliveries?", "Quality was great."]
+COMPLAINT_TITLES = ["Late delivery", "Damaged packaging", "Wrong item", "Short quantity", "Quality issue"]
+
+def product_price(product_id: int) -> Decimal:
+    """Deterministic price, so order lines need not look products up"""
+    return Decimal(100 + product_id * 7919 % 49900) / 100
+
+class Writer:
+    """Buffers rows per table and inserts them in executemany batches.
+
+    Any full buffer flushes every table in FK order, so child rows are
+    never inserted ahead of the parents still waiting in another buffer.
+    """
+
+    def __init__(self, connection, batch_size: int):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.buffers = {table.name: [] for table in Base.metadata.sorted_tables}
+
+    def add(self, table: str, row: dict):
+        buffer = self.buffers[table]
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        for name, rows in self.buffers.items():
+            if rows:
+                self.connection.execute(Base.metadata.tables[name].insert(), rows)
+                rows.clear()
+        self.connection.commit()
+
+def supplier_staff_id(supplier_id: int, k: int) -> int:
+    return (supplier_id - 1) * STAFF_PER_COMPANY + k + 1
+
+def consumer_staff_id(consumer_id: int, k: int) -> int:
+    return (consumer_id - 1) * STAFF_PER_COMPANY + k + 1
+
+def seed(writer: Writer, rng: random.Random, args, now: datetime) -> dict:
+    S, C, P = args.suppliers, args.consumers, args.products_per_supplier
+    password_hash = get_password_hash(PASSWORD)
+    since = now - timedelta(days=args.days)
+    span = (now - since).total_seconds()
+
+    def when() -> datetime:
+        return since + timedelta(seconds=rng.random() * span)
+
+    def log(message):
+        print(f"[{time.perf_counter() - started:7.1f}s] {message}", flush=True)
+
+    started = time.perf_counter()
+    supplier_users = S * STAFF_PER_COMPANY
+
+    for s in range(1, S + 1):
+        writer.add("suppliers", {
+            "SupplierID": s, "CompanyName": f"{rng.choice(ADJECTIVES)} Foods {s}",
+            "Address": f"{rng.randint(1, 300)} Market St, {rng.choice(CITIES)}",
+            "Phone": f"+7 700 {s:07d}", "Email": f"orders@supplier{s}.seed.example",
+            "VerificationStatus": rng.random() < 0.8, "CreatedAt": since,
+        })
+        for k in range(STAFF_PER_COMPANY):
+            staff_id = supplier_staff_id(s, k)
+            writer.add("users", {
+                "UserID": staff_id, "Name": f"Supplier {s} Staff {k}", "Email": f"supplier{s}.{k}@seed.example",
+                "Password": password_hash, "Role": UserRole.REGULAR, "CreatedAt": since,
+            })
+            writer.add("supplier_staff", {
+                "StaffID": staff_id, "UserID": staff_id, "SupplierID": s,
+                "Role": SupplierStaffRole.OWNER if k == 0 else SupplierStaffRole.SALES, "JoinedAt": since,
+            })
+    for c in range(1, C + 1):
+        writer.add("consumers", {
+            "ConsumerID": c, "CompanyName": f"Restaurant {c}",
+            "Address": f"{rng.randint(1, 300)} Main Ave, {rng.choice(CITIES)}",
+            "Phone": f"+7 701 {c:07d}", "Email": f"kitchen@consumer{c}.seed.example",
+            "Type": rng.choice(list(ConsumerType)), "CreatedAt": since,
+        })
+        for k in range(STAFF_PER_COMPANY):
+            staff_id = consumer_staff_id(c, k)
+            user_id = supplier_users + staff_id
+            writer.add("users", {
+                "UserID": user_id, "Name": f"Consumer {c} Staff {k}", "Email": f"consumer{c}.{k}@seed.example",
+                "Password": password_hash, "Role": UserRole.REGULAR, "CreatedAt": since,
+            })
+            writer.add("consumer_staff", {
+                "StaffID": staff_id, "UserID": user_id, "ConsumerID": c,
+                "Role": ConsumerStaffRole.OWNER if k == 0 else ConsumerStaffRole.STAFF, "JoinedAt": since,
+            })
+    writer.flush()
+    log(f"{S} suppliers, {C} consumers, {supplier_users + C * STAFF_PER_COMPANY} users")
+
+    approved = []  # (LinkID, SupplierID, ConsumerID, ChatID)
+    link_id = 0
+    for c in range(1, C + 1):
+        for s in rng.sample(range(1, S + 1), min(args.links_per_consumer, S)):
+            link_id += 1
+            roll = rng.random()
+            status = LinkStatus.APPROVED if roll < 0.85 else LinkStatus.PENDING if roll < 0.95 else LinkStatus.REJECTED
+            requested = since + timedelta(seconds=rng.random() * span * 0.1)
+            writer.add("links", {
+                "LinkID": link_id, "SupplierID": s, "ConsumerID": c, "Status": status, "RequestedAt": requested,
+                "ApprovedAt": requested + timedelta(hours=rng.randint(1, 48)) if status == LinkStatus.APPROVED else None,
+            })
+            if status == LinkStatus.APPROVED:
+                chat_id = len(approved) + 1
+                writer.add("chats", {"ChatID": chat_id, "LinkID": link_id, "CreatedAt": requested})
+                approved.append((link_id, s, c, chat_id))
+    writer.flush()
+    log(f"{link_id} links, {len(approved)} approved with chats")
+
+    for s in range(1, S + 1):
+        for i in range(P):
+            product_id = (s - 1) * P + i + 1
+            name = f"{ADJECTIVES[(product_id // 7) % len(ADJECTIVES)]} {FOODS[(product_id * 31 + s) % len(FOODS)]}"
+            writer.add("products", {
+                "ProductID": product_id, "SupplierID": s, "SKU": f"S{s}-{i:05d}", "Name": name,
+                "Description": f"{name} from supplier {s}, sold per {UNITS[product_id % len(UNITS)]}.",
+                "Price": product_price(product_id), "Unit": UNITS[product_id % len(UNITS)],
+                "Stock": rng.randint(1_000, 100_000), "IsActive": rng.random() < 0.95,
+                "MinimumOrderQuantity": rng.choice([1, 1, 1, 5, 10]), "DeliveryAvailable": True,
+                "PickupAvailable": rng.random() < 0.5, "LeadTime": rng.choice(["1 day", "2-3 days", "1 week"]),
+                "DeliveryZones": rng.choice(CITIES), "CreatedAt": since,
+            })
+    writer.flush()
+    log(f"{S * P} products")
+
+    # Per-order facts that complaints need later
+    order_supplier = array("i")
+    order_staff = array("i")
+    order_time = array("d")
+    item_id = 0
+    reservation_id = 0
+    for order_id in range(1, args.orders + 1):
+        _, s, c, _ = rng.choice(approved)
+        placed = when()
+        age_days = (now - placed).days
+        if age_days > 7:
+            status = rng.choices([OrderStatus.COMPLETED, OrderStatus.REJECTED, OrderStatus.CANCELLED], [90, 5, 5])[0]
+        else:
+            status = rng.choice(list(OrderStatus))
+        staff_id = consumer_staff_id(c, rng.randrange(STAFF_PER_COMPANY))
+        total = Decimal(0)
+        for product_id in rng.sample(range((s - 1) * P + 1, s * P + 1), min(rng.randint(1, 5), P)):
+            item_id += 1
+            quantity = rng.randint(1, 20)
+            price = product_price(product_id)
+            total += price * quantity
+            writer.add("order_items", {
+                "OrderItemID": item_id, "OrderID": order_id, "ProductID": product_id,
+                "Quantity": quantity, "UnitPrice": price, "Subtotal": price * quantity,
+            })
+            # Open orders hold stock; holds older than the TTL are expired by the app's sweeper
+            if status in RESERVED:
+                reservation_id += 1
+                writer.add("stock_reservations", {
+                    "ReservationID": reservation_id, "OrderID": order_id, "ProductID": product_id,
+                    "Quantity": quantity, "Status": RESERVED[status], "CreatedAt": placed,
+                    "ExpiresAt": (placed + timedelta(seconds=settings.RESERVATION_TTL_SECONDS)
+                                  if status == OrderStatus.PENDING else None),
+                })
+        writer.add("orders", {
+            "OrderID": order_id, "SupplierID": s, "ConsumerID": c, "ConsumerStaffID": staff_id,
+            "OrderDate": placed, "Status": status, "TotalAmount": total,
+            "DeliveryDate": placed + timedelta(days=rng.randint(1, 5)),
+            "RejectionReason": "Out of stock" if status == OrderStatus.REJECTED else None,
+        })
+        order_supplier.append(s)
+        order_staff.append(staff_id)
+        order_time.append(placed.timestamp())
+        if order_id % 100_000 == 0:
+            log(f"  {order_id} orders")
+    writer.flush()
+    log(f"{args.orders} orders, {item_id} order items, {reservation_id} stock reservations")
+
+    for message_id in range(1, args.messages + 1):
+        _, s, c, chat_id = rng.choice(approved)
+        if rng.random() < 0.5:
+            user_id = supplier_staff_id(s, rng.randrange(STAFF_PER_COMPANY))
+        else:
+            user_id = supplier_users + consumer_staff_id(c, rng.randrange(STAFF_PER_COMPANY))
+        writer.add("messages", {
+            "MessageID": message_id, "ChatID": chat_id, "UserID": user_id, "Content": rng.choice(PHRASES),
+            "SentAt": when(), "IsRead": False, "MessageType": "text",
+        })
+        if message_id % 500_000 == 0:
+            log(f"  {message_id} messages")
+    writer.flush()
+    log(f"{args.messages} messages")
+
+    log_id = 0
+    complaint_orders = rng.sample(range(1, args.orders + 1), min(args.complaints, args.orders))
+    for complaint_id, order_id in enumerate(complaint_orders, start=1):
+        opened = datetime.fromtimestamp(order_time[order_id - 1], timezone.utc) + timedelta(hours=rng.randint(2, 72))
+        status = rng.choice(list(ComplaintStatus))
+        resolver = supplier_staff_id(order_supplier[order_id - 1], rng.randrange(STAFF_PER_COMPANY))
+        complainant_user = supplier_users + order_staff[order_id - 1]
+        writer.add("complaints", {
+            "ComplaintID": complaint_id, "OrderID": order_id, "ConsumerStaffID": order_staff[order_id - 1],
+            "SupplierStaffID": resolver if status != ComplaintStatus.OPEN else None,
+            "Title": rng.choice(COMPLAINT_TITLES), "Description": "Reported by the kitchen on delivery.",
+            "Status": status, "Priority": rng.choice(list(ComplaintPriority)), "CreatedAt": opened,
+            "ResolvedAt": opened + timedelta(days=2) if status == ComplaintStatus.RESOLVED else None,
+        })
+        actions = [("Created", complainant_user)] + [("Updated", resolver)] * rng.randint(0, 2)
+        if status == ComplaintStatus.RESOLVED:
+            actions.append(("Resolved", resolver))
+        for step, (action, user_id) in enumerate(actions):
+            log_id += 1
+            writer.add("complaint_logs", {
+                "LogID": log_id, "ComplaintID": complaint_id, "UserID": user_id, "Action": action,
+                "Notes": f"Complaint {action.lower()}", "Timestamp": opened + timedelta(hours=step * 6),
+            })
+    writer.flush()
+    log(f"{len(complaint_orders)} complaints, {log_id} complaint logs")
+
+    return {
+        "seed": args.seed,
+        "generated_at": now.isoformat(),
+        "password": PASSWORD,
+        "staff_per_company": STAFF_PER_COMPANY,
+        "suppliers": S,
+        "consumers": C,
+        "products_per_supplier": P,
+        "products": S * P,
+        "users": supplier_users + C * STAFF_PER_COMPANY,
+        "links": link_id,
+        "chats": len(approved),
+        "orders": args.orders,
+        "order_items": item_id,
+        "stock_reservations": reservation_id,
+        "messages": args.messages,
+        "complaints": len(complaint_orders),
+        "complaint_logs": log_id,
+        # Sample of approved (LinkID, SupplierID, ConsumerID, ChatID) for realistic requests
+        "approved_links": rng.sample(approved, min(len(approved), 10_000)),
+    }
+
+def reset_sequences(connection):
+    """Move Postgres serial sequences past the explicitly inserted IDs"""
+    if connection.dialect.name != "postgresql":
+        return
+    for table in Base.metadata.sorted_tables:
+        columns = list(table.primary_key.columns)
+        if len(columns) != 1 or not isinstance(columns[0].type, Integer):
+            continue  # Composite or non-integer keys have no sequence
+        column = columns[0].name
+        connection.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', '{column}'), "
+            f"COALESCE((SELECT MAX(\"{column}\") FROM {table.name}), 0) + 1, false)"
+        ))
+    connection.commit()
+
+async def rebuild_sales_summaries(since: datetime, until: datetime):
+    async with AsyncSessionLocal() as db:
+        await sales_stats.reconcile(db, since.date(), until.date() + timedelta(days=1))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    for name in SCALES["small"]:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, help="Override the preset")
+    parser.add_argument("--days", type=int, default=365, help="Spread activity over this many past days")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate all tables first")
+    parser.add_argument("--manifest", type=Path, default=Path("seed_manifest.json"))
+    args = parser.parse_args()
+    for name, value in SCALES[args.scale].items():
+        if getattr(args, name) is None:
+            setattr(args, name, value)
+
+    engine = create_engine(settings.DATABASE_URL)
+    if args.reset:
+        Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    now = datetime.now(timezone.utc)
+    with engine.connect() as connection:
+        manifest = seed(Writer(connection, args.batch_size), random.Random(args.seed), args, now)
+        reset_sequences(connection)
+    asyncio.run(rebuild_sales_summaries(now - timedelta(days=args.days), now))
+
+    manifest["database"] = engine.url.render_as_string(hide_password=True)
+    args.manifest.write_text(json.dumps(manifest, indent=2))
+    print(f"Manifest written to {args.manifest}")
+
+if __name__ == "__main__":
+    main()
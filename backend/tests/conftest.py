@@ -0,0 +1,122 @@
+"""Test fixtures: the app against a throwaway SQLite database via aiosqlite.
+
+The environment is set before anything imports app.core.config, so every
+engine, upload directory and cache is the test's own.
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+
+_tmp = tempfile.mkdtemp(prefix="scp-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/test.db"
+os.environ["UPLOAD_DIR"] = os.path.join(_tmp, "uploads")
+os.environ["BROKER_BACKEND"] = "memory"
+os.environ["CACHE_BACKEND"] = "memory"
+os.environ["BCRYPT_ROUNDS"] = "4"
+
+from decimal import Decimal  # noqa: E402
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import *  # noqa: E402,F401,F403 - registers every table
+from app.models.base import AsyncSessionLocal, Base, async_engine, engine  # noqa: E402
+from app.models.consumer import Consumer  # noqa: E402
+from app.models.consumer_staff import ConsumerStaff, ConsumerStaffRole  # noqa: E402
+from app.models.link import Link, LinkStatus  # noqa: E402
+from app.models.product import Product  # noqa: E402
+from app.models.supplier import Supplier  # noqa: E402
+from app.models.supplier_staff import SupplierStaff, SupplierStaffRole  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.cache import MemoryBackend, cache  # noqa: E402
+from app.services.link_index import link_index  # noqa: E402
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture(autouse=True)
+async def database(anyio_backend):
+    """Empty tables, cache and link index for every test"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    cache.backend = MemoryBackend(settings.CACHE_MAX_ENTRIES)
+    link_index.loaded = False
+    yield
+    # Pooled aiosqlite connections belong to this test's event loop
+    await async_engine.dispose()
+
+@pytest.fixture
+async def client():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+@pytest.fixture
+async def db():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+def auth(user) -> dict:
+    """Authorization header for a user, as issued by /auth/login"""
+    token = create_access_token({"sub": user.Email, "user_id": user.UserID, "role": None})
+    return {"Authorization": f"Bearer {token}"}
+
+async def add(db, *rows):
+    """Insert and commit rows, returning them with their IDs"""
+    db.add_all(rows)
+    await db.commit()
+    return rows
+
+class QueryCounter:
+    """Counts statements executed on an engine"""
+
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+
+@contextmanager
+def count_queries():
+    """Count queries the app executes inside the block"""
+    counter = QueryCounter()
+    event.listen(async_engine.sync_engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", counter)
+
+@pytest.fixture
+async def marketplace(db):
+    """Two suppliers with one product each, and a consumer linked to the first only"""
+    supplier_a, supplier_b, consumer = await add(
+        db, Supplier(CompanyName="Supplier A"), Supplier(CompanyName="Supplier B"), Consumer(CompanyName="Consumer")
+    )
+    supplier_user, consumer_user = await add(
+        db,
+        User(Name="Supplier owner", Email="owner@supplier.test", Password="x"),
+        User(Name="Consumer manager", Email="manager@consumer.test", Password="x"),
+    )
+    supplier_staff, consumer_staff, link, *_ = await add(
+        db,
+        SupplierStaff(UserID=supplier_user.UserID, SupplierID=supplier_a.SupplierID, Role=SupplierStaffRole.OWNER),
+        ConsumerStaff(UserID=consumer_user.UserID, ConsumerID=consumer.ConsumerID, Role=ConsumerStaffRole.MANAGER),
+        Link(SupplierID=supplier_a.SupplierID, ConsumerID=consumer.ConsumerID, Status=LinkStatus.APPROVED),
+        Link(SupplierID=supplier_b.SupplierID, ConsumerID=consumer.ConsumerID, Status=LinkStatus.PENDING),
+    )
+    product_a, product_b = await add(
+        db,
+        Product(SupplierID=supplier_a.SupplierID, SKU="A-1", Name="Tomatoes", Price=Decimal("2.50"), Stock=100),
+        Product(SupplierID=supplier_b.SupplierID, SKU="B-1", Name="Salmon", Price=Decimal("12.00"), Stock=100),
+    )
+    return {
+        "supplier_a": supplier_a, "supplier_b": supplier_b, "consumer": consumer,
+        "supplier_user": supplier_user, "consumer_user": consumer_user,
+        "supplier_staff": supplier_staff, "consumer_staff": consumer_staff, "link": link,
+        "product_a": product_a, "product_b": product_b,
+    }
@@ -0,0 +1,91 @@
+import asyncio
+import pytest
+from app.services.broker import broker
+from app.services.cache import EntityCache, MemoryBackend
+
+pytestmark = pytest.mark.anyio
+
+def memory_cache() -> EntityCache:
+    return EntityCache(MemoryBackend(100), ttl=60)
+
+async def test_load_invalidated_while_running_is_not_cached():
+    cache = memory_cache()
+    release = asyncio.Event()
+
+    async def stale_loader():
+        await release.wait()
+        return {"name": "old"}
+
+    load = asyncio.create_task(cache.get_or_load("product:1", stale_loader))
+    await asyncio.sleep(0)
+    # A writer commits and invalidates while the load is reading the old row
+    await cache.invalidate("product:1")
+    release.set()
+    assert await load == {"name": "old"}
+
+    async def fresh_loader():
+        return {"name": "new"}
+
+    assert await cache.get_or_load("product:1", fresh_loader) == {"name": "new"}
+
+async def test_followers_survive_a_cancelled_leader():
+    cache = memory_cache()
+    started, release = asyncio.Event(), asyncio.Event()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        started.set()
+        await release.wait()
+        return {"name": "value"}
+
+    leader = asyncio.create_task(cache.get_or_load("product:1", loader))
+    await started.wait()
+    followers = [asyncio.create_task(cache.get_or_load("product:1", loader)) for _ in range(3)]
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0.01)
+    release.set()
+    assert await asyncio.gather(*followers) == [{"name": "value"}] * 3
+    assert leader.cancelled()
+    # One follower took over the load; the others joined it
+    assert len(calls) == 2
+
+async def test_invalidations_reach_other_workers(monkeypatch):
+    monkeypatch.setattr(type(broker), "shared", True)
+    workers = [memory_cache(), memory_cache()]
+    for cache in workers:
+        await cache.start()
+    tasks = [asyncio.create_task(cache.run()) for cache in workers]
+    try:
+        async def loader():
+            return {"name": "old"}
+
+        for cache in workers:
+            await cache.get_or_load("product:1", loader)
+        generation = await workers[1].generation("products:supplier:1")
+
+        await workers[0].invalidate("product:1")
+        await workers[0].bump("products:supplier:1")
+        await asyncio.sleep(0.01)
+        assert await workers[1].backend.get("product:1") is None
+        assert await workers[1].generation("products:supplier:1") == generation + 1
+        # The sender applies its own change once
+        assert await workers[0].generation("products:supplier:1") == generation + 1
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+async def test_lookups_are_exported_on_metrics(client):
+    cache = memory_cache()
+
+    async def loader():
+        return {"name": "value"}
+
+    await cache.get_or_load("product:1", loader)
+    await cache.get_or_load("product:1", loader)
+    body = (await client.get("/metrics")).text
+    assert 'cache_lookups_total{result="hit"}' in body
+    assert 'cache_lookups_total{result="miss"}' in body
+    assert (await client.get("/cache/stats")).status_code == 404
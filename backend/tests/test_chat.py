@@ -0,0 +1,101 @@
+import pytest
+from app.api.v1.endpoints.chat import chat_member
+from app.models.chat import Chat, Message
+from app.models.user import User
+from tests.conftest import add, auth
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def conversation(db, marketplace):
+    """A chat with three messages from the supplier, and another chat's message"""
+    m = marketplace
+    chat, other_chat = await add(db, Chat(LinkID=m["link"].LinkID), Chat(LinkID=m["link"].LinkID + 1))
+    messages = await add(db, *[
+        Message(ChatID=chat.ChatID, UserID=m["supplier_user"].UserID, Content=f"Message {number}")
+        for number in range(3)
+    ])
+    (foreign,) = await add(db, Message(ChatID=other_chat.ChatID, UserID=m["supplier_user"].UserID, Content="Elsewhere"))
+    return chat, messages, foreign
+
+async def unread(client, chat, user):
+    response = await client.get(f"/api/v1/chat/{chat.ChatID}/unread", headers=auth(user))
+    assert response.status_code == 200, response.text
+    return response.json()["unread_count"]
+
+async def test_mark_read_up_to_a_message(client, marketplace, conversation):
+    chat, messages, _ = conversation
+    consumer = marketplace["consumer_user"]
+    assert await unread(client, chat, consumer) == 3
+
+    response = await client.post(
+        f"/api/v1/chat/{chat.ChatID}/read", json={"last_message_id": messages[1].MessageID}, headers=auth(consumer)
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["LastReadMessageID"] == messages[1].MessageID
+    assert await unread(client, chat, consumer) == 1
+
+    response = await client.post(f"/api/v1/chat/{chat.ChatID}/read", headers=auth(consumer))
+    assert response.json()["LastReadMessageID"] == messages[2].MessageID
+    assert await unread(client, chat, consumer) == 0
+
+@pytest.mark.parametrize("which", ["other chat", "missing"])
+async def test_mark_read_rejects_messages_outside_the_chat(client, marketplace, conversation, which):
+    chat, messages, foreign = conversation
+    consumer = marketplace["consumer_user"]
+    message_id = foreign.MessageID if which == "other chat" else foreign.MessageID + 1000
+    response = await client.post(
+        f"/api/v1/chat/{chat.ChatID}/read", json={"last_message_id": message_id}, headers=auth(consumer)
+    )
+    assert response.status_code == 404
+    # Later messages still count as unread
+    assert await unread(client, chat, consumer) == 3
+
+async def test_is_read_follows_the_recipients_watermark(client, marketplace, conversation):
+    chat, messages, _ = conversation
+    consumer, supplier = marketplace["consumer_user"], marketplace["supplier_user"]
+    # The sender reading their own messages does not make them read
+    await client.post(f"/api/v1/chat/{chat.ChatID}/read", headers=auth(supplier))
+    await client.post(
+        f"/api/v1/chat/{chat.ChatID}/read", json={"last_message_id": messages[0].MessageID}, headers=auth(consumer)
+    )
+    response = await client.get(f"/api/v1/chat/{chat.ChatID}/messages")
+    assert response.status_code == 200, response.text
+    assert [message["IsRead"] for message in response.json()] == [True, False, False]
+
+async def test_only_staff_of_an_approved_link_join_its_chat(db, marketplace, conversation):
+    m = marketplace
+    chat, _, foreign = conversation
+    (outsider,) = await add(db, User(Name="Outsider", Email="outsider@elsewhere.test", Password="x"))
+    assert await chat_member(db, chat.ChatID, m["supplier_user"].UserID)
+    assert await chat_member(db, chat.ChatID, m["consumer_user"].UserID)
+    assert not await chat_member(db, chat.ChatID, outsider.UserID)
+    # The other chat belongs to supplier B's pending link
+    assert not await chat_member(db, foreign.ChatID, m["consumer_user"].UserID)
+    assert not await chat_member(db, chat.ChatID + 1000, m["consumer_user"].UserID)
+
+async def test_members_post_messages(client, marketplace, conversation):
+    chat, _, _ = conversation
+    response = await client.post(
+        "/api/v1/chat/messages", json={"chat_id": chat.ChatID, "content": "Hi"}, headers=auth(marketplace["consumer_user"])
+    )
+    assert response.status_code == 201, response.text
+    assert response.json()["UserID"] == marketplace["consumer_user"].UserID
+
+async def test_outsiders_cannot_post(client, db, marketplace, conversation):
+    chat, messages, _ = conversation
+    (outsider,) = await add(db, User(Name="Outsider", Email="outsider@elsewhere.test", Password="x"))
+    response = await client.post(
+        "/api/v1/chat/messages", json={"chat_id": chat.ChatID, "content": "Spam"}, headers=auth(outsider)
+    )
+    assert response.status_code == 403
+    response = await client.get(f"/api/v1/chat/{chat.ChatID}/messages")
+    assert len(response.json()) == len(messages)
+
+async def test_posting_to_an_unknown_chat(client, marketplace, conversation):
+    chat, _, _ = conversation
+    response = await client.post(
+        "/api/v1/chat/messages", json={"chat_id": chat.ChatID + 1000, "content": "Hello?"},
+        headers=auth(marketplace["consumer_user"])
+    )
+    assert response.status_code == 404
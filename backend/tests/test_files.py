@@ -0,0 +1,40 @@
+import io
+import pytest
+from PIL import Image
+from tests.conftest import auth
+
+pytestmark = pytest.mark.anyio
+
+def png() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 4), (200, 30, 30)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+async def upload(client, user, body: bytes, content_type: str) -> str:
+    response = await client.post(
+        "/api/v1/files/", content=body, headers={**auth(user), "Content-Type": content_type}
+    )
+    assert response.status_code == 201, response.text
+    return response.json()["url"]
+
+async def test_image_is_served_inline(client, marketplace):
+    url = await upload(client, marketplace["consumer_user"], png(), "image/png")
+    response = await client.get(url)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["x-content-type-options"] == "nosniff"
+    assert "content-disposition" not in response.headers
+
+@pytest.mark.parametrize("content_type", ["text/html", "image/svg+xml", "application/javascript"])
+async def test_other_types_are_downloads(client, marketplace, content_type):
+    body = b"<svg xmlns='http://www.w3.org/2000/svg'><script>alert(document.cookie)</script></svg>"
+    url = await upload(client, marketplace["consumer_user"], body, content_type)
+    response = await client.get(url)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert response.headers["content-disposition"] == "attachment"
+    assert response.headers["x-content-type-options"] == "nosniff"
+    assert response.content == body
+
+    response = await client.get(url, params={"size": "thumb"})
+    assert response.status_code == 400
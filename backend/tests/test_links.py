@@ -0,0 +1,28 @@
+import asyncio
+import httpx
+import pytest
+from app.main import app
+from app.models.supplier import Supplier
+from tests.conftest import add
+
+pytestmark = pytest.mark.anyio
+
+async def test_concurrent_link_requests_conflict(db, marketplace):
+    (supplier,) = await add(db, Supplier(CompanyName="Supplier C"))
+    body = {"supplier_id": supplier.SupplierID, "consumer_id": marketplace["consumer"].ConsumerID}
+
+    # All requests pass the existence check before any has inserted
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    clients = [httpx.AsyncClient(transport=transport, base_url="http://test") for _ in range(10)]
+    try:
+        responses = await asyncio.gather(*(client.post("/api/v1/links/", json=body) for client in clients))
+    finally:
+        await asyncio.gather(*(client.aclose() for client in clients))
+    assert sorted(response.status_code for response in responses) == [201] + [400] * 9
+
+async def test_existing_link_conflicts(client, marketplace):
+    m = marketplace
+    response = await client.post("/api/v1/links/", json={
+        "supplier_id": m["supplier_a"].SupplierID, "consumer_id": m["consumer"].ConsumerID
+    })
+    assert response.status_code == 400
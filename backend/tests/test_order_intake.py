@@ -0,0 +1,105 @@
+import pytest
+from sqlalchemy import select
+from app.models.link import Link, LinkStatus
+from app.services.link_index import link_index
+
+pytestmark = pytest.mark.anyio
+
+def order(supplier, consumer, *items):
+    return {
+        "supplier_id": supplier.SupplierID,
+        "consumer_id": consumer.ConsumerID,
+        "items": [{"product_id": product.ProductID, "quantity": quantity} for product, quantity in items],
+    }
+
+async def stock(db, product):
+    await db.refresh(product)
+    return product.Stock
+
+async def test_order_from_linked_supplier(client, db, marketplace):
+    m = marketplace
+    response = await client.post(
+        "/api/v1/orders/", params={"consumer_staff_id": m["consumer_staff"].StaffID},
+        json=order(m["supplier_a"], m["consumer"], (m["product_a"], 3))
+    )
+    assert response.status_code == 201, response.text
+    assert response.json()["SupplierID"] == m["supplier_a"].SupplierID
+    assert await stock(db, m["product_a"]) == 97
+
+async def test_unlinked_supplier_is_forbidden(client, db, marketplace):
+    m = marketplace
+    response = await client.post(
+        "/api/v1/orders/", params={"consumer_staff_id": m["consumer_staff"].StaffID},
+        json=order(m["supplier_b"], m["consumer"], (m["product_b"], 3))
+    )
+    assert response.status_code == 403
+    assert await stock(db, m["product_b"]) == 100
+
+async def test_other_suppliers_product_is_rejected(client, db, marketplace):
+    """A link to supplier A must not let the consumer take supplier B's stock"""
+    m = marketplace
+    response = await client.post(
+        "/api/v1/orders/", params={"consumer_staff_id": m["consumer_staff"].StaffID},
+        json=order(m["supplier_a"], m["consumer"], (m["product_a"], 1), (m["product_b"], 3))
+    )
+    assert response.status_code == 404
+    assert await stock(db, m["product_a"]) == 100
+    assert await stock(db, m["product_b"]) == 100
+
+async def test_other_suppliers_product_in_partial_batch(client, db, marketplace):
+    m = marketplace
+    response = await client.post(
+        "/api/v1/orders/batch", params={"consumer_staff_id": m["consumer_staff"].StaffID, "partial": "true"},
+        json={"orders": [
+            order(m["supplier_a"], m["consumer"], (m["product_b"], 3)),
+            order(m["supplier_a"], m["consumer"], (m["product_a"], 2)),
+        ]}
+    )
+    assert response.status_code == 201, response.text
+    body = response.json()
+    assert [failure["index"] for failure in body["failures"]] == [0]
+    assert body["failures"][0]["status_code"] == 404
+    assert len(body["orders"]) == 1
+    assert await stock(db, m["product_a"]) == 98
+    assert await stock(db, m["product_b"]) == 100
+
+async def test_insufficient_stock(client, db, marketplace):
+    m = marketplace
+    response = await client.post(
+        "/api/v1/orders/", params={"consumer_staff_id": m["consumer_staff"].StaffID},
+        json=order(m["supplier_a"], m["consumer"], (m["product_a"], 101))
+    )
+    assert response.status_code == 400
+    assert await stock(db, m["product_a"]) == 100
+
+async def test_revocation_applies_at_once(client, db, marketplace):
+    m = marketplace
+    place = lambda: client.post(
+        "/api/v1/orders/", params={"consumer_staff_id": m["consumer_staff"].StaffID},
+        json=order(m["supplier_a"], m["consumer"], (m["product_a"], 1))
+    )
+    assert (await place()).status_code == 201
+    response = await client.patch(f"/api/v1/links/{m['link'].LinkID}", json={"status": "Rejected"})
+    assert response.status_code == 200, response.text
+    assert (await place()).status_code == 403
+    assert await link_index.suppliers_of(m["consumer"].ConsumerID) == set()
+
+async def test_read_racing_a_revocation_is_not_indexed(db, marketplace, monkeypatch):
+    m = marketplace
+    await link_index.load()
+    # Approved by another worker whose publish has not arrived yet
+    link = (await db.scalars(select(Link).where(Link.SupplierID == m["supplier_b"].SupplierID))).one()
+    link.Status = LinkStatus.APPROVED
+    await db.commit()
+    pair = (link.SupplierID, link.ConsumerID)
+    execute = db.execute
+
+    async def read_then_revoke(*args, **kwargs):
+        result = await execute(*args, **kwargs)
+        # The link is revoked while this read's result is on its way
+        link_index._apply(link.LinkID, *pair, False)
+        return result
+
+    monkeypatch.setattr(db, "execute", read_then_revoke)
+    assert await link_index.approved_pairs(db, [pair]) == {pair}
+    assert link.SupplierID not in await link_index.suppliers_of(link.ConsumerID)
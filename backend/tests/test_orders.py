@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy import select
+from app.models.order import Order, OrderStatus
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def placed(client, marketplace):
+    m = marketplace
+    response = await client.post(
+        "/api/v1/orders/", params={"consumer_staff_id": m["consumer_staff"].StaffID},
+        json={
+            "supplier_id": m["supplier_a"].SupplierID, "consumer_id": m["consumer"].ConsumerID,
+            "items": [{"product_id": m["product_a"].ProductID, "quantity": 2}],
+        }
+    )
+    assert response.status_code == 201, response.text
+    return response.json()["OrderID"]
+
+async def stored(db, order_id):
+    return (await db.scalars(
+        select(Order).where(Order.OrderID == order_id).execution_options(populate_existing=True)
+    )).one()
+
+async def test_repeating_the_status_changes_nothing(client, db, placed):
+    url = f"/api/v1/orders/{placed}"
+    accepted = await client.patch(url, json={"status": "Accepted"})
+    assert accepted.status_code == 200, accepted.text
+    assert accepted.json()["Version"] == 2
+
+    again = await client.patch(url, json={"status": "Accepted"}, headers={"If-Match": accepted.headers["ETag"]})
+    assert again.status_code == 200, again.text
+    assert again.json()["Version"] == 2
+    assert again.headers["ETag"] == accepted.headers["ETag"]
+    order = await stored(db, placed)
+    assert (order.Status, order.PreviousStatus, order.Version) == (OrderStatus.ACCEPTED, OrderStatus.PENDING, 2)
+
+async def test_repeated_status_still_sets_other_fields(client, db, placed):
+    response = await client.patch(f"/api/v1/orders/{placed}", json={"status": "Pending", "rejection_reason": "Noted"})
+    assert response.status_code == 200, response.text
+    order = await stored(db, placed)
+    assert (order.Status, order.PreviousStatus, order.RejectionReason) == (OrderStatus.PENDING, None, "Noted")
+
+async def test_fields_without_status(client, placed):
+    response = await client.patch(f"/api/v1/orders/{placed}", json={"delivery_date": "2026-11-01T09:00:00Z"})
+    assert response.status_code == 200, response.text
+    assert response.json()["Version"] == 2
+
+async def test_illegal_transition_conflicts(client, placed):
+    url = f"/api/v1/orders/{placed}"
+    assert (await client.patch(url, json={"status": "Rejected"})).status_code == 200
+    response = await client.patch(url, json={"status": "Accepted"})
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Cannot change order status from Rejected to Accepted"
@@ -0,0 +1,70 @@
+import base64
+import json
+import pytest
+from app.models.chat import Chat, Message
+from app.models.order import Order, OrderStatus
+from tests.conftest import add
+
+pytestmark = pytest.mark.anyio
+
+async def page_through(client, url, limit, **params):
+    """IDs of every row of a list, fetched `limit` at a time by cursor"""
+    ids, cursor = [], None
+    while True:
+        response = await client.get(url, params={**params, "limit": limit, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert len(page) <= limit
+        ids += [row["OrderID" if "OrderID" in row else "MessageID"] for row in page]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return ids
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 100])
+async def test_orders_page_through_equal_timestamps(client, db, marketplace, limit):
+    m = marketplace
+    # Inserted in one statement, so every OrderDate is the same CURRENT_TIMESTAMP
+    orders = await add(db, *[
+        Order(
+            SupplierID=m["supplier_a"].SupplierID, ConsumerID=m["consumer"].ConsumerID,
+            ConsumerStaffID=m["consumer_staff"].StaffID, TotalAmount=1, Status=OrderStatus.PENDING
+        )
+        for _ in range(7)
+    ])
+    ids = await page_through(client, "/api/v1/orders/", limit, supplier_id=m["supplier_a"].SupplierID)
+    assert ids == [order.OrderID for order in orders]
+
+@pytest.mark.parametrize("limit", [1, 4])
+async def test_messages_page_through_equal_timestamps(client, db, marketplace, limit):
+    m = marketplace
+    (chat,) = await add(db, Chat(LinkID=m["link"].LinkID))
+    messages = await add(db, *[
+        Message(ChatID=chat.ChatID, UserID=m["consumer_user"].UserID, Content=f"Message {number}")
+        for number in range(9)
+    ])
+    ids = await page_through(client, f"/api/v1/chat/{chat.ChatID}/messages", limit)
+    assert ids == [message.MessageID for message in messages]
+
+async def test_invalid_cursor(client, marketplace):
+    response = await client.get("/api/v1/orders/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+def token(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+@pytest.mark.parametrize("url, params, values", [
+    ("/api/v1/orders/", {}, [{"OrderID": 1}]),
+    ("/api/v1/orders/", {}, ["1"]),
+    ("/api/v1/orders/", {}, [True]),
+    ("/api/v1/products/", {"supplier_id": 1}, [{}]),
+    ("/api/v1/products/", {"supplier_id": 1}, [1.5]),
+    ("/api/v1/products/search", {"q": "widget"}, ["high", 1]),
+    ("/api/v1/products/search", {"q": "widget"}, [0.5, None]),
+])
+async def test_cursor_values_of_the_wrong_type(client, marketplace, url, params, values):
+    response = await client.get(url, params={**params, "cursor": token(values)})
+    assert response.status_code == 400
+
+async def test_integer_rank_in_search_cursor(client, marketplace):
+    response = await client.get("/api/v1/products/search", params={"q": "widget", "cursor": token([1, 1])})
+    assert response.status_code == 200
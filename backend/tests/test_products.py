@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import select
+from app.models.product import Product
+
+pytestmark = pytest.mark.anyio
+
+async def products_by_sku(db, supplier):
+    result = await db.scalars(
+        select(Product).where(Product.SupplierID == supplier.SupplierID).execution_options(populate_existing=True)
+    )
+    return {product.SKU: product for product in result}
+
+async def test_create_product_keeps_sku(client, marketplace):
+    supplier = marketplace["supplier_a"]
+    response = await client.post("/api/v1/products/", json={
+        "supplier_id": supplier.SupplierID, "sku": "A-2", "name": "Basil", "price": "1.20"
+    })
+    assert response.status_code == 201, response.text
+    assert response.json()["sku"] == "A-2"
+
+    response = await client.post("/api/v1/products/", json={
+        "supplier_id": supplier.SupplierID, "sku": "A-2", "name": "Basil again", "price": "1.30"
+    })
+    assert response.status_code == 409
+
+async def test_import_updates_only_columns_in_the_file(client, db, marketplace):
+    supplier = marketplace["supplier_a"]
+    existing = marketplace["product_a"]
+    existing.Description, existing.MinimumOrderQuantity = "Vine ripened", 5
+    await db.commit()
+
+    rows = "\n".join([
+        '{"sku": "A-1", "name": "Tomatoes", "price": "2.75"}',
+        '{"sku": "A-9", "name": "Peppers", "price": "3.10"}',
+        '{"sku": "A-10", "name": "Onions"}',
+    ])
+    response = await client.post(
+        "/api/v1/products/import", params={"supplier_id": supplier.SupplierID},
+        files={"file": ("catalog.jsonl", rows.encode(), "application/x-ndjson")}
+    )
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["processed"], result["upserted"], result["failed"]) == (3, 2, 1)
+    assert result["errors"][0]["row"] == 3
+
+    products = await products_by_sku(db, supplier)
+    updated = products["A-1"]
+    assert str(updated.Price) == "2.75"
+    # Columns the file does not mention keep their values
+    assert (updated.Stock, updated.MinimumOrderQuantity, updated.Description) == (100, 5, "Vine ripened")
+    created = products["A-9"]
+    assert (created.Stock, created.MinimumOrderQuantity, created.Description) == (0, 1, None)
+
+async def test_csv_import_empty_cells_keep_values(client, db, marketplace):
+    supplier = marketplace["supplier_a"]
+    rows = "sku,name,price,stock,description\nA-1,Tomatoes,2.60,,Heirloom\nA-3,Garlic,4.00,25,\n"
+    response = await client.post(
+        "/api/v1/products/import", params={"supplier_id": supplier.SupplierID},
+        files={"file": ("catalog.csv", rows.encode(), "text/csv")}
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["upserted"] == 2
+
+    products = await products_by_sku(db, supplier)
+    assert (products["A-1"].Stock, products["A-1"].Description) == (100, "Heirloom")
+    assert (products["A-3"].Stock, products["A-3"].Description) == (25, None)
@@ -0,0 +1,63 @@
+"""List endpoints must run the same number of queries whatever the page size.
+
+Relationships are loaded per page (selectin), never per row, so a page of
+fifty costs what a page of one does.
+"""
+import pytest
+from app.models.chat import Chat, Message
+from app.models.complaint import Complaint, ComplaintLog
+from app.models.order import Order, OrderItem, OrderStatus
+from tests.conftest import add, count_queries
+
+pytestmark = pytest.mark.anyio
+
+ROWS = 60
+
+@pytest.fixture
+async def lists(db, marketplace):
+    """Enough orders, complaints and messages, each with related rows, to fill pages of fifty"""
+    m = marketplace
+    orders = await add(db, *[
+        Order(
+            SupplierID=m["supplier_a"].SupplierID, ConsumerID=m["consumer"].ConsumerID,
+            ConsumerStaffID=m["consumer_staff"].StaffID, TotalAmount=10, Status=OrderStatus.PENDING
+        )
+        for _ in range(ROWS)
+    ])
+    await add(db, *[
+        OrderItem(OrderID=order.OrderID, ProductID=m["product_a"].ProductID, Quantity=1, UnitPrice=10, Subtotal=10)
+        for order in orders
+    ])
+    complaints = await add(db, *[
+        Complaint(
+            OrderID=order.OrderID, ConsumerStaffID=m["consumer_staff"].StaffID,
+            Title="Damaged", Description="Arrived damaged"
+        )
+        for order in orders
+    ])
+    await add(db, *[
+        ComplaintLog(ComplaintID=complaint.ComplaintID, UserID=m["consumer_user"].UserID, Action="Created")
+        for complaint in complaints
+    ])
+    (chat,) = await add(db, Chat(LinkID=m["link"].LinkID))
+    await add(db, *[
+        Message(ChatID=chat.ChatID, UserID=m["consumer_user"].UserID, Content=f"Message {number}")
+        for number in range(ROWS)
+    ])
+    return {
+        "orders": ("/api/v1/orders/", {"supplier_id": m["supplier_a"].SupplierID}),
+        "complaints": ("/api/v1/complaints/", {}),
+        "chat messages": (f"/api/v1/chat/{chat.ChatID}/messages", {}),
+    }
+
+async def queries_for(client, url, params, limit) -> int:
+    with count_queries() as counter:
+        response = await client.get(url, params={**params, "limit": limit})
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == limit
+    return counter.count
+
+@pytest.mark.parametrize("case", ["orders", "complaints", "chat messages"])
+async def test_query_count_does_not_grow_with_page_size(client, lists, case):
+    url, params = lists[case]
+    assert await queries_for(client, url, params, 1) == await queries_for(client, url, params, 50)
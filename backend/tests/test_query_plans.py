@@ -0,0 +1,105 @@
+"""EXPLAIN regression suite: hot endpoints must not scan whole tables.
+
+Every statement an endpoint runs is captured and explained on the test
+database. On SQLite a plan step "SCAN <table>" without an index fails the
+test; on Postgres, with sequential scans disabled, so do "Seq Scan" nodes
+(the planner only picks one then when no index applies).
+"""
+import json
+import pytest
+from sqlalchemy import event
+from app.models.base import async_engine
+from app.models.chat import Chat, Message
+from tests.conftest import add, auth
+
+pytestmark = pytest.mark.anyio
+
+EXPLAINED = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+class StatementLog:
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(EXPLAINED):
+            self.statements.append((statement, parameters[0] if executemany else parameters))
+
+    def __enter__(self):
+        event.listen(async_engine.sync_engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(async_engine.sync_engine, "before_cursor_execute", self)
+
+async def full_scans(statement: str, parameters) -> list:
+    """Plan steps of a statement that read a whole table"""
+    async with async_engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            await conn.exec_driver_sql("SET enable_seqscan = off")
+            plan = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            nodes, scans = [plan[0]["Plan"]], []
+            while nodes:
+                node = nodes.pop()
+                if node["Node Type"] == "Seq Scan":
+                    scans.append(f"Seq Scan on {node['Relation Name']}")
+                nodes.extend(node.get("Plans", []))
+            return scans
+        rows = (await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)).all()
+        return [
+            detail for _, _, _, detail in rows
+            if detail.startswith("SCAN ") and "USING" not in detail and not detail.startswith(("SCAN (", "SCAN CONSTANT"))
+        ]
+
+@pytest.fixture
+async def activity(client, db, marketplace):
+    """A few orders and a chat with messages, so relationship loads run too"""
+    m = marketplace
+    for quantity in (1, 2):
+        response = await client.post(
+            "/api/v1/orders/", params={"consumer_staff_id": m["consumer_staff"].StaffID},
+            json={
+                "supplier_id": m["supplier_a"].SupplierID, "consumer_id": m["consumer"].ConsumerID,
+                "items": [{"product_id": m["product_a"].ProductID, "quantity": quantity}],
+            }
+        )
+        assert response.status_code == 201, response.text
+    (chat,) = await add(db, Chat(LinkID=m["link"].LinkID))
+    await add(db, *[Message(ChatID=chat.ChatID, UserID=m["supplier_user"].UserID, Content="Hello") for _ in range(3)])
+    return {**m, "chat": chat, "order_id": response.json()["OrderID"]}
+
+CASES = {
+    "orders by supplier": lambda a: ("GET", "/api/v1/orders/", {"params": {"supplier_id": a["supplier_a"].SupplierID}}),
+    "orders by consumer": lambda a: ("GET", "/api/v1/orders/", {"params": {"consumer_id": a["consumer"].ConsumerID}}),
+    "order": lambda a: ("GET", f"/api/v1/orders/{a['order_id']}", {}),
+    "place order": lambda a: ("POST", "/api/v1/orders/", {
+        "params": {"consumer_staff_id": a["consumer_staff"].StaffID},
+        "json": {
+            "supplier_id": a["supplier_a"].SupplierID, "consumer_id": a["consumer"].ConsumerID,
+            "items": [{"product_id": a["product_a"].ProductID, "quantity": 1}],
+        },
+    }),
+    "accept order": lambda a: ("PATCH", f"/api/v1/orders/{a['order_id']}", {"json": {"status": "Accepted"}}),
+    "products by supplier": lambda a: ("GET", "/api/v1/products/", {"params": {"supplier_id": a["supplier_a"].SupplierID}}),
+    "complaints by order": lambda a: ("GET", "/api/v1/complaints/", {"params": {"order_id": a["order_id"]}}),
+    "chat for link": lambda a: ("GET", f"/api/v1/chat/link/{a['link'].LinkID}", {}),
+    "chat messages": lambda a: ("GET", f"/api/v1/chat/{a['chat'].ChatID}/messages", {}),
+    "unread count": lambda a: ("GET", f"/api/v1/chat/{a['chat'].ChatID}/unread", {"headers": auth(a["consumer_user"])}),
+    "read receipt": lambda a: ("POST", f"/api/v1/chat/{a['chat'].ChatID}/read", {"headers": auth(a["consumer_user"])}),
+    "supplier sales": lambda a: ("GET", f"/api/v1/suppliers/{a['supplier_a'].SupplierID}/sales/daily", {}),
+}
+
+@pytest.mark.parametrize("case", sorted(CASES))
+async def test_no_full_table_scans(client, activity, case):
+    method, url, options = CASES[case](activity)
+    with StatementLog() as log:
+        response = await client.request(method, url, **options)
+    assert response.status_code < 400, response.text
+    assert log.statements
+    scans = {}
+    for statement, parameters in log.statements:
+        found = await full_scans(statement, parameters)
+        if found:
+            scans[statement] = found
+    assert not scans, scans
@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy import select, update
+from app.models.sales import SupplierProductSalesDaily, SupplierSalesDaily
+from app.services import sales_stats
+
+pytestmark = pytest.mark.anyio
+
+async def summaries(db):
+    daily = (await db.execute(select(
+        SupplierSalesDaily.SupplierID, SupplierSalesDaily.Status, SupplierSalesDaily.OrderCount, SupplierSalesDaily.Revenue
+    ).order_by(SupplierSalesDaily.SupplierID, SupplierSalesDaily.Status))).all()
+    per_product = (await db.execute(select(
+        SupplierProductSalesDaily.ProductID, SupplierProductSalesDaily.Quantity, SupplierProductSalesDaily.Revenue
+    ).order_by(SupplierProductSalesDaily.ProductID))).all()
+    return daily, per_product
+
+async def test_reconcile_repairs_drift(client, db, marketplace):
+    m = marketplace
+    for quantity in (2, 3):
+        response = await client.post(
+            "/api/v1/orders/", params={"consumer_staff_id": m["consumer_staff"].StaffID},
+            json={
+                "supplier_id": m["supplier_a"].SupplierID, "consumer_id": m["consumer"].ConsumerID,
+                "items": [{"product_id": m["product_a"].ProductID, "quantity": quantity}],
+            }
+        )
+        assert response.status_code == 201, response.text
+    maintained = await summaries(db)
+    daily, per_product = maintained
+    assert [(row.OrderCount, str(row.Revenue)) for row in daily] == [(2, "12.50")]
+    assert [(row.Quantity, str(row.Revenue)) for row in per_product] == [(5, "12.50")]
+
+    # Drift, e.g. from a write that bypassed the incremental path
+    await db.execute(update(SupplierSalesDaily).values(OrderCount=7))
+    await db.execute(update(SupplierProductSalesDaily).values(Quantity=0))
+    await db.commit()
+
+    assert await sales_stats.reconcile_recent(2)
+    db.expire_all()
+    assert await summaries(db) == maintained
@@ -0,0 +1,62 @@
+import asyncio
+import httpx
+import pytest
+from sqlalchemy import func, select
+from app.main import app
+from app.models.inventory import ProductStockShard, StockReservation
+from app.models.order import Order
+
+pytestmark = pytest.mark.anyio
+
+CLIENTS = 40
+
+async def place(client, m, quantity):
+    return await client.post(
+        "/api/v1/orders/", params={"consumer_staff_id": m["consumer_staff"].StaffID},
+        json={
+            "supplier_id": m["supplier_a"].SupplierID,
+            "consumer_id": m["consumer"].ConsumerID,
+            "items": [{"product_id": m["product_a"].ProductID, "quantity": quantity}],
+        }
+    )
+
+async def hammer(m, quantity):
+    """Place CLIENTS orders for the hot product at once, each on its own client"""
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    clients = [httpx.AsyncClient(transport=transport, base_url="http://test") for _ in range(CLIENTS)]
+    try:
+        return await asyncio.gather(*(place(client, m, quantity) for client in clients))
+    finally:
+        await asyncio.gather(*(client.aclose() for client in clients))
+
+async def check_no_oversell(db, m, responses, quantity):
+    placed = [response for response in responses if response.status_code == 201]
+    refused = [response for response in responses if response.status_code == 400]
+    assert len(placed) + len(refused) == CLIENTS, {response.status_code for response in responses}
+    product = m["product_a"]
+    await db.refresh(product)
+    if product.StockShards:
+        # Sharded stock is only folded back into Product.Stock by the sweeper
+        shards = (await db.scalars(select(ProductStockShard.Stock).where(ProductStockShard.ProductID == product.ProductID))).all()
+        assert len(shards) == product.StockShards
+    else:
+        shards = [product.Stock]
+    assert min(shards) >= 0
+    # Every unit that left stock belongs to exactly one placed order
+    assert sum(shards) == 100 - len(placed) * quantity
+    assert await db.scalar(select(func.count()).select_from(Order)) == len(placed)
+    held = await db.scalar(select(func.sum(StockReservation.Quantity)).where(StockReservation.ProductID == product.ProductID))
+    assert (held or 0) == len(placed) * quantity
+    return placed
+
+async def test_hot_sku_never_oversold(db, marketplace):
+    responses = await hammer(marketplace, 7)
+    placed = await check_no_oversell(db, marketplace, responses, 7)
+    assert len(placed) == 100 // 7
+
+async def test_hot_sku_with_sharded_stock_never_oversold(client, db, marketplace):
+    m = marketplace
+    response = await client.put(f"/api/v1/products/{m['product_a'].ProductID}/stock-shards", json={"shards": 8})
+    assert response.status_code == 200, response.text
+    responses = await hammer(m, 7)
+    await check_no_oversell(db, m, responses, 7)
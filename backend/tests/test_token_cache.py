@@ -0,0 +1,53 @@
+import asyncio
+from datetime import timedelta
+import pytest
+from app.core.security import create_access_token
+from app.core.token_cache import TokenCache
+from app.services.broker import broker
+
+pytestmark = pytest.mark.anyio
+
+def token(email: str, minutes: float = 30) -> str:
+    return create_access_token({"sub": email, "user_id": 1}, timedelta(minutes=minutes))
+
+async def test_revoked_token_is_rejected():
+    cache = TokenCache(10)
+    revoked, other = token("a@example.test"), token("b@example.test")
+    assert cache.verify(revoked)["sub"] == "a@example.test"
+    await cache.revoke(revoked)
+    assert cache.verify(revoked) is None
+    assert cache.verify(other)["sub"] == "b@example.test"
+
+async def test_expired_revocations_are_dropped():
+    cache = TokenCache(10)
+    expired = token("a@example.test", minutes=-1)
+    await cache.revoke(expired)
+    await cache.revoke(token("b@example.test"))
+    assert cache._digest(expired) not in cache._revoked
+    assert len(cache._revoked) == 1
+
+async def test_revocations_reach_other_workers(monkeypatch):
+    monkeypatch.setattr(type(broker), "shared", True)
+    workers = [TokenCache(10), TokenCache(10)]
+    for cache in workers:
+        await cache.start()
+    tasks = [asyncio.create_task(cache.run()) for cache in workers]
+    try:
+        revoked = token("a@example.test")
+        assert workers[1].verify(revoked) is not None
+        await workers[0].revoke(revoked)
+        await asyncio.sleep(0.01)
+        assert workers[1].verify(revoked) is None
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+async def test_logout_revokes_the_token(client, marketplace):
+    # Not auth(): the app-wide cache would keep rejecting its token in later tests
+    user = marketplace["consumer_user"]
+    logged_in = create_access_token({"sub": user.Email, "user_id": user.UserID, "role": None}, timedelta(minutes=7))
+    headers = {"Authorization": f"Bearer {logged_in}"}
+    assert (await client.get("/api/v1/auth/me", headers=headers)).status_code == 200
+    assert (await client.post("/api/v1/auth/logout", headers=headers)).status_code == 204
+    assert (await client.get("/api/v1/auth/me", headers=headers)).status_code == 401